@@ -0,0 +1,86 @@
+"""
+Рекомендации по парку: запрос на автомобиль против пакетных запросов
+
+API моделируется задержкой: фиксированная часть на запрос (сеть,
+очередь, обработка промпта) плюс время генерации на автомобиль.
+Токены считаются по реальным промптам: в пакете системный промпт
+отправляется один раз на много автомобилей.
+
+Запуск: python benchmarks/bench_batch.py [автомобилей] [задержка запроса, мс]
+"""
+
+import json
+import sys
+import os
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.ai_assistant import AIAssistant
+from tesla_app.tokens import count_message_tokens
+from tests.test_models import make_vehicle_data
+
+# Время генерации ответа для одного автомобиля, с
+GENERATION_SECONDS = 0.02
+ANSWER_TOKENS = 120
+
+
+class SimulatedCompletions:
+    def __init__(self, request_seconds: float):
+        self.request_seconds = request_seconds
+
+    def create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        ids = [line[4:] for line in prompt.splitlines() if line.startswith("### ")]
+        count = max(1, len(ids))
+        time.sleep(self.request_seconds + GENERATION_SECONDS * count)
+        prompt_tokens = sum(count_message_tokens(m) for m in kwargs["messages"])
+        usage = Mock(total_tokens=prompt_tokens + ANSWER_TOKENS * count)
+        function = Mock(arguments=json.dumps({"vehicles": [{"id": i, "text": "Зарядите до 80%."} for i in ids]}))
+        function.name = "report"
+        message = Mock(content="Зарядите до 80%.", tool_calls=[Mock(function=function)])
+        return Mock(choices=[Mock(message=message)], usage=usage)
+
+
+def make_assistant(request_seconds: float) -> AIAssistant:
+    assistant = AIAssistant(api_key="bench")
+    assistant.client = Mock(chat=Mock(completions=SimulatedCompletions(request_seconds)))
+    return assistant
+
+
+def sequential(vehicles, request_seconds: float):
+    assistant = make_assistant(request_seconds)
+    tokens = 0
+    started = time.perf_counter()
+    for state in vehicles.values():
+        assistant.history.clear()
+        tokens += assistant.generate_response(
+            f"Дай 2-3 рекомендации.\n\n{assistant._vehicle_context(state)}"
+        ).tokens_used
+    elapsed = time.perf_counter() - started
+    return len(vehicles) / elapsed, tokens / len(vehicles), len(vehicles)
+
+
+def batched(vehicles, request_seconds: float, concurrency: int):
+    assistant = make_assistant(request_seconds)
+    stats = assistant.get_advice_batch(vehicles, max_concurrency=concurrency).stats
+    return stats.vehicles_per_second, stats.tokens_per_vehicle, stats.batches
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    request_seconds = (float(sys.argv[2]) if len(sys.argv) > 2 else 400) / 1000
+    vehicles = {str(i): make_vehicle_data() for i in range(count)}
+
+    print(f"{count} автомобилей, задержка запроса {request_seconds * 1000:.0f} мс")
+    print(f"{'режим':>22} | {'запросов':>8} | {'авто/с':>7} | {'токенов/авто':>12}")
+    rows = [("по одному", sequential(vehicles, request_seconds))]
+    for concurrency in (1, 4):
+        rows.append((f"пакетами, {concurrency} поток(а)", batched(vehicles, request_seconds, concurrency)))
+    for name, (rate, tokens, requests) in rows:
+        print(f"{name:>22} | {requests:8d} | {rate:7.1f} | {tokens:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
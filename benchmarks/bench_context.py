@@ -0,0 +1,84 @@
+"""
+Размер контекста автомобиля в промпте: str(vehicle_data) против build_context
+
+Запуск: python benchmarks/bench_context.py [бюджет в токенах]
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.context import build_context
+from tesla_app.tokens import count_tokens
+from tests.test_models import make_vehicle_data
+
+# Поля настоящего ответа vehicle_data, которых нет в тестовом наборе:
+# без них str() заметно меньше, чем в реальном промпте
+EXTRA_FIELDS = {
+    "charge_state": (
+        "battery_heater_on", "charge_amps", "charge_current_request", "charge_current_request_max",
+        "charge_enable_request", "charge_energy_added", "charge_limit_soc_max", "charge_limit_soc_min",
+        "charge_limit_soc_std", "charge_miles_added_ideal", "charge_miles_added_rated",
+        "charge_port_cold_weather_mode", "charge_port_color", "charge_port_latch", "charger_phases",
+        "charger_pilot_current", "conn_charge_cable", "fast_charger_brand", "fast_charger_present",
+        "fast_charger_type", "ideal_battery_range", "managed_charging_active", "minutes_to_full_charge",
+        "not_enough_power_to_heat", "off_peak_charging_enabled", "preconditioning_enabled",
+        "scheduled_charging_mode", "scheduled_charging_pending", "trip_charging", "usable_battery_level",
+    ),
+    "climate_state": (
+        "battery_heater", "bioweapon_mode", "cabin_overheat_protection", "climate_keeper_mode",
+        "defrost_mode", "is_front_defroster_on", "is_rear_defroster_on", "left_temp_direction",
+        "max_avail_temp", "min_avail_temp", "remote_heater_control_enabled", "right_temp_direction",
+        "seat_heater_left", "seat_heater_right", "seat_heater_rear_left", "seat_heater_rear_right",
+        "side_mirror_heaters", "steering_wheel_heater", "wiper_blade_heater",
+    ),
+    "vehicle_state": (
+        "api_version", "autopark_state_v2", "calendar_supported", "center_display_state",
+        "fd_window", "fp_window", "rd_window", "rp_window", "homelink_nearby", "is_user_present",
+        "notifications_supported", "parsed_calendar_supported", "remote_start", "remote_start_enabled",
+        "remote_start_supported", "sentry_mode_available", "smart_summon_available", "valet_mode",
+        "vehicle_name", "webcam_available",
+    ),
+    "vehicle_config": (
+        "can_accept_navigation_requests", "can_actuate_trunks", "car_special_type", "car_type",
+        "charge_port_type", "eu_vehicle", "exterior_color", "has_air_suspension", "has_ludicrous_mode",
+        "motorized_charge_port", "plg", "rear_seat_heaters", "rhd", "roof_color", "spoiler_type",
+        "third_row_seats", "trim_badging", "wheel_type",
+    ),
+    "gui_settings": (
+        "gui_24_hour_time", "gui_charge_rate_units", "gui_distance_units", "gui_range_display",
+        "gui_temperature_units", "show_range_units",
+    ),
+}
+
+QUERIES = [
+    "Сколько осталось заряда?",
+    "Какая температура в салоне?",
+    "Где сейчас машина?",
+    "Закрыты ли двери?",
+    "Дай рекомендации",
+]
+
+
+def main():
+    budget = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    data = make_vehicle_data(1)
+    for section, names in EXTRA_FIELDS.items():
+        data.setdefault(section, {}).update({name: False for name in names})
+    full = count_tokens(str(data))
+    print(f"str(vehicle_data): {full} tokens")
+
+    for query in QUERIES:
+        started = time.perf_counter()
+        context = build_context(data, query=query, budget=budget)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{query:<30} {context.tokens:4d} tokens  saved {context.saved:5d} "
+            f"({context.saved / full:4.0%})  {elapsed * 1e6:6.0f} us  topics: {', '.join(context.topics)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
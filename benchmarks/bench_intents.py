@@ -0,0 +1,80 @@
+"""
+Точность и задержка локального распознавания команд
+
+Прогоняет размеченный корпус tests/intent_corpus.jsonl через
+intents.classify: доля запросов, решенных без LLM, точность среди них
+и время одного распознавания (холодный и теплый кеш слов).
+
+Запуск: python benchmarks/bench_intents.py [повторов]
+"""
+
+import json
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app import intents
+from tesla_app.intents import DEFAULT_THRESHOLD, classify
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "intent_corpus.jsonl")
+
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def quality(corpus):
+    in_domain = [c for c in corpus if not c["command"].startswith("unknown")]
+    local = correct = false_positives = 0
+    for case in corpus:
+        intent = classify(case["text"])
+        if intent.confidence < DEFAULT_THRESHOLD:
+            continue
+        if case["command"].startswith("unknown"):
+            false_positives += 1
+            continue
+        local += 1
+        correct += intent.command == case["command"] and intent.parameters == case.get("parameters", intent.parameters)
+    print(f"Корпус: {len(corpus)} запросов, {len(in_domain)} команд")
+    print(f"Решено локально: {local}/{len(in_domain)} ({local / len(in_domain):.0%})")
+    print(f"Точность среди решенных: {correct}/{local}")
+    print(f"Вне домена принято за команду: {false_positives}")
+
+
+def latency(corpus, repeats: int):
+    texts = [c["text"] for c in corpus]
+
+    cold = []
+    for text in texts:
+        intents._match_token.cache_clear()
+        started = time.perf_counter()
+        classify(text)
+        cold.append(time.perf_counter() - started)
+
+    warm = []
+    for _ in range(repeats):
+        for text in texts:
+            started = time.perf_counter()
+            classify(text)
+            warm.append(time.perf_counter() - started)
+
+    for name, samples in (("холодный кеш", cold), ("теплый кеш", warm)):
+        samples.sort()
+        p50 = statistics.median(samples) * 1e6
+        p99 = samples[int(len(samples) * 0.99) - 1] * 1e6
+        print(f"{name:>13}: p50 {p50:7.1f} мкс, p99 {p99:7.1f} мкс")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    corpus = load_corpus()
+    quality(corpus)
+    latency(corpus, repeats)
+
+
+if __name__ == "__main__":
+    main()
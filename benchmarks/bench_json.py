@@ -0,0 +1,106 @@
+"""
+Доля декодирования JSON в CPU на запрос при опросе парка автомобилей
+
+Сервер с ответами vehicle_data запускается в отдельном процессе, чтобы
+в замер CPU попадала только клиентская сторона.
+
+Запуск: python benchmarks/bench_json.py [число автомобилей]
+"""
+
+import json
+import multiprocessing
+import sys
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app import json_backend
+from tesla_app.json_backend import BACKENDS, JSONBackend, load_backend
+from tesla_app.tesla_client import TeslaAPIClient
+from tests.test_models import make_vehicle_data
+
+
+def make_payload() -> bytes:
+    """Полный ответ vehicle_data (~10 КБ, как у реального автомобиля)"""
+    data = make_vehicle_data()
+    for section in ("charge_state", "climate_state", "vehicle_state", "vehicle_config"):
+        data[section].update({f"{section}_field_{i}": i * 1.5 for i in range(60)})
+    data["vehicle_state"]["media_info"] = {"now_playing_title": "Track " * 10, "audio_volume": 2.3}
+    return json.dumps({"response": data}).encode()
+
+
+def serve(port_queue):
+    body = make_payload()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def sweep(base_url: str, backend: JSONBackend, count: int):
+    """CPU на запрос и CPU декодирования на запрос для одного бэкенда"""
+    decode_cpu = 0.0
+    loads = backend.loads
+
+    def timed_loads(data):
+        nonlocal decode_cpu
+        started = time.thread_time()
+        try:
+            return loads(data)
+        finally:
+            decode_cpu += time.thread_time() - started
+
+    json_backend._current = JSONBackend(backend.name, timed_loads, backend.dumps)
+    client = TeslaAPIClient("token", base_url=base_url)
+    client.get_vehicle_state("warmup")
+
+    decode_cpu = 0.0
+    started = time.thread_time()
+    for i in range(count):
+        client.get_vehicle_state(f"v{i}")
+    total_cpu = time.thread_time() - started
+    return total_cpu / count, decode_cpu / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(ports,), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{ports.get()}"
+
+    print(f"vehicles: {count}, payload: {len(make_payload())} bytes")
+    print(f"{'backend':<8} {'CPU/request':>12} {'decode':>10} {'share':>7}")
+    try:
+        for name in BACKENDS:
+            try:
+                backend = load_backend(name)
+            except ImportError:
+                print(f"{name:<8} not installed")
+                continue
+            per_request, decode = sweep(base_url, backend, count)
+            print(
+                f"{name:<8} {per_request * 1e6:10.0f}us {decode * 1e6:8.0f}us "
+                f"{decode / per_request:6.1%}"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
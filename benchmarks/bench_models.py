@@ -0,0 +1,60 @@
+"""
+Замер памяти на автомобиль: дерево словарей против VehicleData
+
+Запуск: python benchmarks/bench_models.py [число автомобилей]
+"""
+
+import gc
+import json
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.models import VehicleData
+from tests.test_models import make_vehicle_data
+
+
+def measure(build):
+    """Память (байт) и время построения набора состояний"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - started
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    payloads = [json.dumps({"response": make_vehicle_data(i)}).encode() for i in range(count)]
+
+    def as_dicts():
+        return [json.loads(p)["response"] for p in payloads]
+
+    def as_models():
+        # Копия тела ответа учитывается: VehicleData удерживает его в памяти.
+        # Типичный дашборд читает заряд и местоположение
+        models = [VehicleData(bytes(bytearray(p))) for p in payloads]
+        for data in models:
+            data.charge_state, data.drive_state
+        return models
+
+    dict_bytes, dict_time = measure(as_dicts)
+    model_bytes, model_time = measure(as_models)
+
+    print(f"vehicles: {count}, payload: {len(payloads[0])} bytes")
+    print(f"dict:        {dict_bytes / count:8.0f} B/vehicle  {dict_time * 1000:8.1f} ms")
+    print(f"VehicleData: {model_bytes / count:8.0f} B/vehicle  {model_time * 1000:8.1f} ms")
+    print(f"reduction:   {dict_bytes / model_bytes:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Пропускная способность приема потоковой телеметрии
+
+Несколько локальных отправителей шлют записи в TelemetryReceiver;
+замеряется число записей в секунду при разном числе записей в кадре.
+
+Запуск: python benchmarks/bench_streaming.py [записей] [отправителей]
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.streaming import TelemetryReceiver, TelemetrySender, make_record
+
+
+async def run(total: int, senders: int, per_frame: int) -> float:
+    received = 0
+
+    def count(record):
+        nonlocal received
+        received += 1
+
+    async with TelemetryReceiver(max_queue=1) as receiver:
+        receiver.on_record(count)
+        frames = [
+            [make_record(f"VIN{i:05d}", BatteryLevel=50 + i % 50, VehicleSpeed=i % 120,
+                         Location=(55.7 + i / 1e5, 37.6), Odometer=10000.0 + i)
+             for i in range(start, start + per_frame)]
+            for start in range(0, total // senders, per_frame)
+        ]
+
+        async def send():
+            async with TelemetrySender(receiver.url) as sender:
+                for frame in frames:
+                    await sender.send(frame if per_frame > 1 else frame[0])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(senders)))
+        while received < len(frames) * per_frame * senders:
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        batches = receiver.stats.batches
+    print(
+        f"records/frame {per_frame:4d}: {received / elapsed:10.0f} records/s, "
+        f"{received / batches:7.1f} records/decode"
+    )
+    return received / elapsed
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    senders = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"records: {total}, senders: {senders}")
+    for per_frame in (1, 10, 100):
+        asyncio.run(run(total, senders, per_frame))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,142 @@ Tesla AI Assistant - основной пакет
 __version__ = "1.0.0"
 __author__ = "Tesla AI Team"
 
-from .tesla_client import TeslaAPIClient, TeslaVehicle
-from .ai_assistant import AIAssistant, AIResponse
+import importlib
+from typing import TYPE_CHECKING
+
+# Экспортируемое имя -> модуль пакета. Модули импортируются при первом
+# обращении к имени: скрипту, которому нужен только TeslaAPIClient,
+# не приходится загружать openai, aiohttp и прочие тяжелые зависимости.
+_EXPORTS = {
+    "TeslaAPIClient": ".tesla_client",
+    "TeslaVehicle": ".tesla_client",
+    "FleetResult": ".tesla_client",
+    "TransportStats": ".tesla_client",
+    "AsyncTeslaAPIClient": ".async_client",
+    "ChargeState": ".models",
+    "DriveState": ".models",
+    "ClimateState": ".models",
+    "VehicleState": ".models",
+    "VehicleData": ".models",
+    "ResponseCache": ".cache",
+    "CacheStats": ".cache",
+    "TelemetryStore": ".telemetry_store",
+    "Bucket": ".telemetry_store",
+    "DeltaEngine": ".delta",
+    "FieldChange": ".delta",
+    "TelemetryReceiver": ".streaming",
+    "TelemetryRecord": ".streaming",
+    "TelemetrySender": ".streaming",
+    "StreamStats": ".streaming",
+    "WakeManager": ".wake",
+    "WakeResult": ".wake",
+    "VehicleAsleepError": ".wake",
+    "CommandScheduler": ".commands",
+    "SchedulerStats": ".commands",
+    "RateLimiter": ".ratelimit",
+    "Priority": ".ratelimit",
+    "priority_scope": ".ratelimit",
+    "PollScheduler": ".polling",
+    "PollStats": ".polling",
+    "VehicleRegistry": ".registry",
+    "Intent": ".intents",
+    "ParseCache": ".parse_cache",
+    "ToolCall": ".tools",
+    "VehicleContext": ".context",
+    "build_context": ".context",
+    "count_tokens": ".tokens",
+    "ChatHistory": ".history",
+    "BatchResult": ".batch",
+    "BatchStats": ".batch",
+    "AIAssistant": ".ai_assistant",
+    "AIResponse": ".ai_assistant",
+    "AIStream": ".ai_assistant",
+    "AsyncAIAssistant": ".async_assistant",
+    "Conversation": ".async_assistant",
+}
+
+if TYPE_CHECKING:
+    from .tesla_client import TeslaAPIClient, TeslaVehicle, FleetResult, TransportStats
+    from .async_client import AsyncTeslaAPIClient
+    from .models import ChargeState, DriveState, ClimateState, VehicleState, VehicleData
+    from .cache import ResponseCache, CacheStats
+    from .telemetry_store import TelemetryStore, Bucket
+    from .delta import DeltaEngine, FieldChange
+    from .streaming import TelemetryReceiver, TelemetryRecord, TelemetrySender, StreamStats
+    from .wake import WakeManager, WakeResult, VehicleAsleepError
+    from .commands import CommandScheduler, SchedulerStats
+    from .ratelimit import RateLimiter, Priority, priority_scope
+    from .polling import PollScheduler, PollStats
+    from .registry import VehicleRegistry
+    from .intents import Intent
+    from .parse_cache import ParseCache
+    from .tools import ToolCall
+    from .context import VehicleContext, build_context
+    from .tokens import count_tokens
+    from .history import ChatHistory
+    from .batch import BatchResult, BatchStats
+    from .ai_assistant import AIAssistant, AIResponse, AIStream
+    from .async_assistant import AsyncAIAssistant, Conversation
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Следующие обращения идут мимо __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "TeslaAPIClient",
     "TeslaVehicle", 
+    "FleetResult",
+    "TransportStats",
+    "AsyncTeslaAPIClient",
+    "ChargeState",
+    "DriveState",
+    "ClimateState",
+    "VehicleState",
+    "VehicleData",
+    "ResponseCache",
+    "CacheStats",
+    "TelemetryStore",
+    "Bucket",
+    "DeltaEngine",
+    "FieldChange",
+    "TelemetryReceiver",
+    "TelemetryRecord",
+    "TelemetrySender",
+    "StreamStats",
+    "WakeManager",
+    "WakeResult",
+    "VehicleAsleepError",
+    "CommandScheduler",
+    "SchedulerStats",
+    "RateLimiter",
+    "Priority",
+    "priority_scope",
+    "PollScheduler",
+    "PollStats",
+    "VehicleRegistry",
+    "Intent",
+    "ParseCache",
+    "ToolCall",
+    "VehicleContext",
+    "build_context",
+    "count_tokens",
+    "ChatHistory",
+    "BatchResult",
+    "BatchStats",
     "AIAssistant",
-    "AIResponse"
+    "AIResponse",
+    "AIStream",
+    "AsyncAIAssistant",
+    "Conversation"
 ]
@@ -3,10 +3,56 @@ AI Assistant Module - интеграция с OpenAI API
 """
 
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Callable, Iterator, List, Mapping, Union
 from openai import OpenAI
 from dataclasses import dataclass
 
+from .batch import BatchResult, run_batches
+from .context import DEFAULT_BUDGET, build_context
+from .history import HISTORY_BUDGET, ChatHistory
+from .intents import DEFAULT_THRESHOLD, classify_all
+from .parse_cache import ParseCache
+from .tools import TOOLS, validate_call
+
+
+# Системный промпт по умолчанию
+DEFAULT_SYSTEM_PROMPT = """Ты AI ассистент для управления автомобилем Tesla. 
+Ты помогаешь пользователю выполнять команды, отвечать на вопросы о состоянии автомобиля 
+и предоставлять информацию. Отвечай кратко, информативно и на русском языке."""
+
+
+def build_messages(
+    prompt: str,
+    history: List[Dict[str, str]],
+    system_prompt: Optional[str] = None,
+    vehicle_context: Optional[Any] = None,
+    context_budget: int = DEFAULT_BUDGET
+) -> List[Dict[str, str]]:
+    """
+    Собрать сообщения запроса: системный промпт, история, запрос пользователя
+    
+    Args:
+        prompt: Запрос пользователя
+        history: История разговора
+        system_prompt: Системный промпт (заменяет промпт по умолчанию)
+        vehicle_context: Контекст для промпта по умолчанию: готовый текст или
+            ответ vehicle_data (из него берутся поля, относящиеся к запросу)
+        context_budget: Бюджет контекста автомобиля в токенах
+        
+    Returns:
+        Список сообщений для chat.completions
+    """
+    default_system = DEFAULT_SYSTEM_PROMPT
+    if vehicle_context and not isinstance(vehicle_context, str):
+        vehicle_context = build_context(vehicle_context, query=prompt, budget=context_budget).text or str(vehicle_context)
+    if vehicle_context:
+        default_system += f"\n\nТекущее состояние автомобиля:\n{vehicle_context}"
+    
+    messages = [{"role": "system", "content": system_prompt or default_system}]
+    messages.extend(history)
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
 
 @dataclass
 class AIResponse:
@@ -16,16 +62,105 @@ class AIResponse:
     model: str
 
 
+class AIStream:
+    """
+    Потоковый ответ AI: итерация выдает фрагменты текста по мере генерации
+
+    После завершения итерации response содержит полный ответ и число
+    токенов, а запрос и ответ записаны в историю разговора. Если поток
+    прерван до конца, история не меняется.
+    """
+    
+    def __init__(self, assistant: "AIAssistant", prompt: str, messages: List[Dict[str, str]]):
+        self._assistant = assistant
+        self._prompt = prompt
+        self._messages = messages
+        self._stream = None
+        self._parts: List[str] = []
+        self._tokens_used = 0
+        self._failed = False
+        self.response: Optional[AIResponse] = None
+    
+    @property
+    def content(self) -> str:
+        """Текст, полученный к текущему моменту"""
+        return "".join(self._parts)
+    
+    def __iter__(self) -> Iterator[str]:
+        if self.response is not None:
+            raise RuntimeError("AI stream has already been consumed")
+        assistant = self._assistant
+        try:
+            self._stream = assistant.client.chat.completions.create(
+                model=assistant.model,
+                messages=self._messages,
+                temperature=0.7,
+                max_tokens=1000,
+                stream=True,
+                # Последний фрагмент потока содержит usage без choices
+                stream_options={"include_usage": True}
+            )
+            for chunk in self._stream:
+                if chunk.usage:
+                    self._tokens_used = chunk.usage.total_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    self._parts.append(delta)
+                    yield delta
+        except Exception as e:
+            # Как и generate_response: ошибка становится текстом ответа
+            self._failed = True
+            error = f"Ошибка при генерации ответа: {str(e)}"
+            if self._parts:
+                error = "\n\n" + error
+            self._parts.append(error)
+            yield error
+        finally:
+            self.close()
+        
+        content = self.content
+        if not self._failed:
+            assistant.add_to_history("user", self._prompt)
+            assistant.add_to_history("assistant", content)
+        self.response = AIResponse(
+            content=content,
+            tokens_used=0 if self._failed else self._tokens_used,
+            model=assistant.model
+        )
+    
+    def close(self):
+        """Закрыть HTTP-поток (например, если чтение прервано)"""
+        stream, self._stream = self._stream, None
+        if stream is not None and hasattr(stream, "close"):
+            stream.close()
+
+
 class AIAssistant:
     """AI ассистент для работы с Tesla через естественный язык"""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4",
+        intent_threshold: Optional[float] = DEFAULT_THRESHOLD,
+        parse_cache: Optional[ParseCache] = None,
+        context_budget: int = DEFAULT_BUDGET,
+        history_budget: int = HISTORY_BUDGET
+    ):
         """
         Инициализация AI ассистента
         
         Args:
             api_key: OpenAI API ключ
             model: Модель GPT для использования
+            intent_threshold: Уверенность локального распознавания команд, с которой
+                parse_commands обходится без LLM (None - всегда спрашивать LLM)
+            parse_cache: Кеш результатов parse_commands, полученных от LLM
+            context_budget: Бюджет в токенах для состояния автомобиля в промпте
+            history_budget: Бюджет в токенах для истории разговора в промпте;
+                старые сообщения сверх него сворачиваются в краткую сводку
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -33,14 +168,21 @@ class AIAssistant:
         
         self.client = OpenAI(api_key=self.api_key)
         self.model = model
-        self.conversation_history: List[Dict[str, str]] = []
+        self.intent_threshold = intent_threshold
+        self.parse_cache = parse_cache
+        self.context_budget = context_budget
+        # Сколько токенов сэкономлено сжатием состояния автомобиля в промптах
+        self.tokens_saved = 0
+        self.history = ChatHistory(budget=history_budget, model=model)
+    
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        """Сообщения истории, еще не свернутые в сводку"""
+        return self.history.messages
     
     def add_to_history(self, role: str, content: str):
         """Добавить сообщение в историю разговора"""
-        self.conversation_history.append({"role": role, "content": content})
-        # Ограничиваем историю последними 10 сообщениями
-        if len(self.conversation_history) > 10:
-            self.conversation_history = self.conversation_history[-10:]
+        self.history.add(role, content)
     
     def generate_response(
         self, 
@@ -59,26 +201,7 @@ class AIAssistant:
         Returns:
             AIResponse объект с ответом
         """
-        messages = []
-        
-        # Системный промпт по умолчанию
-        default_system = """Ты AI ассистент для управления автомобилем Tesla. 
-Ты помогаешь пользователю выполнять команды, отвечать на вопросы о состоянии автомобиля 
-и предоставлять информацию. Отвечай кратко, информативно и на русском языке."""
-        
-        if vehicle_context:
-            default_system += f"\n\nТекущее состояние автомобиля:\n{vehicle_context}"
-        
-        messages.append({
-            "role": "system", 
-            "content": system_prompt or default_system
-        })
-        
-        # Добавляем историю
-        messages.extend(self.conversation_history)
-        
-        # Добавляем текущий запрос
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(prompt, system_prompt, vehicle_context)
         
         try:
             response = self.client.chat.completions.create(
@@ -108,53 +231,134 @@ class AIAssistant:
                 model=self.model
             )
     
-    def parse_command(self, user_input: str, vehicle_state: Dict[str, Any]) -> Dict[str, Any]:
+    def _build_messages(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        vehicle_context: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        """Собрать сообщения запроса с историей этого ассистента"""
+        if vehicle_context:
+            vehicle_context = self._vehicle_context(vehicle_context, query=prompt)
+        return build_messages(prompt, self.history.as_messages(), system_prompt, vehicle_context)
+    
+    def _vehicle_context(self, data: Any, query: Optional[str] = None) -> str:
+        """Поля состояния, относящиеся к запросу, в пределах context_budget"""
+        context = build_context(data, query=query, budget=self.context_budget, model=self.model)
+        self.tokens_saved += context.saved
+        # Данные без известных разделов vehicle_data передаются как есть
+        return context.text or str(data)
+    
+    def stream_response(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        vehicle_context: Optional[Dict[str, Any]] = None
+    ) -> AIStream:
+        """
+        Генерировать ответ от AI потоком
+        
+        Запрос отправляется при начале итерации; текст появляется по мере
+        генерации, а не после полного ответа.
+        
+        Args:
+            prompt: Запрос пользователя
+            system_prompt: Системный промпт
+            vehicle_context: Контекст данных автомобиля
+            
+        Returns:
+            AIStream; итерация выдает фрагменты текста, затем response - AIResponse
+        """
+        return AIStream(self, prompt, self._build_messages(prompt, system_prompt, vehicle_context))
+    
+    def parse_commands(
+        self,
+        user_input: str,
+        vehicle_state: Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
         """
-        Парсить естественный язык в команду для Tesla
+        Парсить естественный язык в команды для Tesla
+        
+        Запрос может содержать несколько команд ("заблокируй машину и
+        включи климат на 21"). Сначала он разбирается локально
+        (intents.classify_all), затем ищется в parse_cache; иначе модель
+        за один запрос возвращает вызовы инструментов из tools.TOOLS,
+        каждый из которых проверяется (validate_call).
         
         Args:
             user_input: Ввод пользователя на естественном языке
-            vehicle_state: Текущее состояние автомобиля
+            vehicle_state: Текущее состояние автомобиля или функция, возвращающая
+                его (вызывается только перед обращением к LLM)
             
         Returns:
-            Словарь с командой и параметрами
+            Список словарей с командой и параметрами в порядке запроса;
+            пустой, если команд не найдено
         """
-        prompt = f"""
-На основе запроса пользователя определи, какую команду Tesla нужно выполнить.
-Верни ответ в формате JSON с полями:
-- command: название команды (например: 'honk', 'lock', 'unlock', 'start_climate', 'stop_climate', 'flash_lights', 'get_status')
-- parameters: объект с параметрами команды (если нужны)
-- confidence: уверенность от 0 до 1
+        if self.intent_threshold is not None:
+            intents = classify_all(user_input)
+            if all(intent.confidence >= self.intent_threshold for intent in intents):
+                return [intent.to_dict() for intent in intents]
+        
+        if self.parse_cache is not None:
+            cached = self.parse_cache.get(user_input, self.model)
+            if cached is not None:
+                return cached["calls"]
+        
+        if callable(vehicle_state):
+            vehicle_state = vehicle_state()
+        
+        system_prompt = f"""Ты парсер команд для Tesla. Вызови инструменты для всех команд из запроса \
+пользователя в том порядке, в котором они названы. Если запрос не содержит команд, \
+не вызывай инструменты.
 
 Текущее состояние автомобиля:
-{vehicle_state}
-
-Запрос пользователя: "{user_input}"
-
-Примеры:
-- "Побибикай" -> {{"command": "honk", "parameters": {{}}, "confidence": 0.95}}
-- "Заблокируй двери" -> {{"command": "lock", "parameters": {{}}, "confidence": 0.98}}
-- "Включи кондиционер на 23 градуса" -> {{"command": "start_climate", "parameters": {{"temperature": 23}}, "confidence": 0.9}}
-- "Какой заряд батареи?" -> {{"command": "get_status", "parameters": {{"what": "battery"}}, "confidence": 0.95}}
-
-Верни только JSON, без дополнительного текста.
-"""
-        
-        response = self.generate_response(prompt, system_prompt="Ты парсер команд для Tesla.")
+{self._vehicle_context(vehicle_state, query=user_input)}"""
         
         try:
-            import json
-            # Извлекаем JSON из ответа
-            content = response.content.strip()
-            # Находим JSON в ответе
-            start = content.find('{')
-            end = content.rfind('}') + 1
-            if start != -1 and end != -1:
-                json_str = content[start:end]
-                return json.loads(json_str)
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_input},
+                ],
+                tools=TOOLS,
+                tool_choice="auto",
+                temperature=0
+            )
+            tool_calls = response.choices[0].message.tool_calls or []
         except Exception:
-            pass
+            return []
+        
+        calls = []
+        for tool_call in tool_calls:
+            try:
+                calls.append(validate_call(tool_call.function.name, tool_call.function.arguments).to_dict())
+            except ValueError:
+                # Некорректный вызов пропускаем, остальные команды выполнимы
+                continue
+        # Пустой ответ может быть следствием сбоя - его не запоминаем
+        if calls and self.parse_cache is not None:
+            self.parse_cache.set(user_input, {"calls": calls}, self.model)
+        return calls
+    
+    def parse_command(
+        self,
+        user_input: str,
+        vehicle_state: Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Парсить естественный язык в одну команду для Tesla
         
+        Args:
+            user_input: Ввод пользователя на естественном языке
+            vehicle_state: Текущее состояние автомобиля или функция, возвращающая его
+            
+        Returns:
+            Первая команда parse_commands или команда "unknown"
+        """
+        calls = self.parse_commands(user_input, vehicle_state)
+        if calls:
+            return calls[0]
         return {
             "command": "unknown",
             "parameters": {},
@@ -174,7 +378,7 @@ class AIAssistant:
         prompt = f"""
 Объясни следующие данные об автомобиле Tesla простыми словами на русском языке:
 
-{data}
+{self._vehicle_context(data)}
 
 Сделай объяснение понятным для обычного пользователя, выдели важную информацию.
 """
@@ -196,9 +400,54 @@ class AIAssistant:
 Учитывай уровень заряда, местоположение, климат и другие факторы.
 
 Состояние автомобиля:
-{vehicle_state}
+{self._vehicle_context(vehicle_state)}
 
 Дай 2-3 конкретные рекомендации.
 """
         response = self.generate_response(prompt)
         return response.content
+    
+    def get_advice_batch(self, vehicles: Mapping[str, Any], max_concurrency: int = 4) -> BatchResult:
+        """
+        Получить рекомендации для многих автомобилей
+        
+        Состояния упаковываются по нескольку в один запрос (см. batch.run_batches),
+        поэтому утренний обход парка - это несколько запросов вместо одного на
+        автомобиль. История разговора не используется и не пополняется.
+        
+        Args:
+            vehicles: ID автомобиля -> состояние (ответ vehicle_data)
+            max_concurrency: Максимум одновременных запросов к API
+            
+        Returns:
+            BatchResult с рекомендациями по ID и статистикой пропускной способности
+        """
+        return self._run_batch(
+            "На основе состояния автомобиля дай полезные рекомендации владельцу. "
+            "Учитывай уровень заряда, местоположение, климат и другие факторы. "
+            "Дай 2-3 конкретные рекомендации на русском языке.",
+            vehicles,
+            max_concurrency
+        )
+    
+    def explain_vehicle_data_batch(self, vehicles: Mapping[str, Any], max_concurrency: int = 4) -> BatchResult:
+        """
+        Объяснить данные многих автомобилей простыми словами
+        
+        Args:
+            vehicles: ID автомобиля -> данные (ответ vehicle_data)
+            max_concurrency: Максимум одновременных запросов к API
+            
+        Returns:
+            BatchResult с объяснениями по ID и статистикой пропускной способности
+        """
+        return self._run_batch(
+            "Объясни данные об автомобиле Tesla простыми словами на русском языке. "
+            "Сделай объяснение понятным для обычного пользователя, выдели важную информацию.",
+            vehicles,
+            max_concurrency
+        )
+    
+    def _run_batch(self, instructions: str, vehicles: Mapping[str, Any], max_concurrency: int) -> BatchResult:
+        contexts = {str(vehicle_id): self._vehicle_context(data) for vehicle_id, data in vehicles.items()}
+        return run_batches(self.client, self.model, instructions, contexts, max_concurrency=max_concurrency)
@@ -0,0 +1,259 @@
+"""
+Async AI Assistant - асинхронный AI ассистент на AsyncOpenAI
+"""
+
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Optional, Dict, Any, AsyncIterator, List
+
+from openai import AsyncOpenAI
+
+from .ai_assistant import AIResponse, build_messages
+from .history import HISTORY_BUDGET, ChatHistory
+
+
+class Conversation(ChatHistory):
+    """
+    История одного разговора (пользователя или сессии бота)
+
+    Запросы в рамках разговора выполняются по очереди, чтобы ответы
+    ложились в историю в порядке вопросов; разные разговоры не блокируют
+    друг друга. Размер истории ограничен бюджетом токенов, как у ChatHistory.
+    """
+
+    def __init__(
+        self,
+        history: Optional[List[Dict[str, str]]] = None,
+        budget: int = HISTORY_BUDGET,
+        **kwargs: Any
+    ):
+        super().__init__(budget=budget, **kwargs)
+        self._lock: Optional[asyncio.Lock] = None
+        for message in history or []:
+            self.add(message["role"], message["content"])
+
+    @property
+    def history(self) -> List[Dict[str, str]]:
+        """Сообщения, еще не свернутые в сводку"""
+        return self.messages
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Создается внутри работающего event loop (требование Python 3.9)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+
+class AsyncAIAssistant:
+    """
+    Асинхронный AI ассистент для обслуживания многих пользователей
+
+    В отличие от AIAssistant не хранит общую историю: каждый запрос
+    либо без истории, либо с переданным Conversation. Одновременных
+    запросов к API не больше max_concurrency, остальные ждут в очереди
+    event loop без отдельного потока на запрос.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4",
+        max_concurrency: int = 16,
+        max_sessions: int = 10000,
+        client: Optional[AsyncOpenAI] = None,
+        history_budget: int = HISTORY_BUDGET
+    ):
+        """
+        Инициализация асинхронного AI ассистента
+
+        Args:
+            api_key: OpenAI API ключ
+            model: Модель GPT для использования
+            max_concurrency: Максимум одновременных запросов к API
+            max_sessions: Сколько разговоров хранит session() (самые давние вытесняются)
+            client: Готовый AsyncOpenAI клиент (по умолчанию создается по api_key)
+            history_budget: Бюджет в токенах истории разговоров, созданных session()
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if client is None and not self.api_key:
+            raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable.")
+
+        self.client = client or AsyncOpenAI(api_key=self.api_key)
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_sessions = max_sessions
+        self.history_budget = history_budget
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+
+    async def __aenter__(self) -> "AsyncAIAssistant":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Закрыть HTTP клиент OpenAI"""
+        await self.client.close()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def session(self, session_id: str) -> Conversation:
+        """
+        Разговор по идентификатору сессии (создается при первом обращении)
+
+        Args:
+            session_id: Идентификатор пользователя или чата
+
+        Returns:
+            Conversation этой сессии
+        """
+        conversation = self._sessions.get(session_id)
+        if conversation is None:
+            conversation = self._sessions[session_id] = Conversation(budget=self.history_budget, model=self.model)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return conversation
+
+    def end_session(self, session_id: str):
+        """Забыть разговор сессии"""
+        self._sessions.pop(session_id, None)
+
+    async def generate_response(
+        self,
+        prompt: str,
+        conversation: Optional[Conversation] = None,
+        system_prompt: Optional[str] = None,
+        vehicle_context: Optional[Dict[str, Any]] = None
+    ) -> AIResponse:
+        """
+        Генерировать ответ от AI
+
+        Args:
+            prompt: Запрос пользователя
+            conversation: История разговора (None - запрос без истории)
+            system_prompt: Системный промпт
+            vehicle_context: Контекст данных автомобиля
+
+        Returns:
+            AIResponse объект с ответом
+        """
+        try:
+            if conversation is None:
+                return await self._complete(build_messages(prompt, [], system_prompt, vehicle_context))
+
+            async with conversation.lock:
+                messages = build_messages(prompt, conversation.as_messages(), system_prompt, vehicle_context)
+                response = await self._complete(messages)
+                conversation.add("user", prompt)
+                conversation.add("assistant", response.content)
+                return response
+        except Exception as e:
+            return AIResponse(
+                content=f"Ошибка при генерации ответа: {str(e)}",
+                tokens_used=0,
+                model=self.model
+            )
+
+    async def stream_response(
+        self,
+        prompt: str,
+        conversation: Optional[Conversation] = None,
+        system_prompt: Optional[str] = None,
+        vehicle_context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Генерировать ответ от AI потоком
+
+        Фрагменты текста выдаются по мере генерации; история разговора
+        пополняется, только если поток дочитан до конца без ошибок.
+        Разговор занят, пока поток не дочитан или не закрыт (aclose).
+
+        Args:
+            prompt: Запрос пользователя
+            conversation: История разговора (None - запрос без истории)
+            system_prompt: Системный промпт
+            vehicle_context: Контекст данных автомобиля
+
+        Yields:
+            Фрагменты текста ответа
+        """
+        lock = conversation.lock if conversation is not None else None
+        if lock is not None:
+            await lock.acquire()
+        try:
+            history = conversation.as_messages() if conversation is not None else []
+            messages = build_messages(prompt, history, system_prompt, vehicle_context)
+            parts: List[str] = []
+            async with self.semaphore:
+                try:
+                    stream = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=1000,
+                        stream=True
+                    )
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                except Exception as e:
+                    yield f"Ошибка при генерации ответа: {str(e)}"
+                    return
+            if conversation is not None:
+                conversation.add("user", prompt)
+                conversation.add("assistant", "".join(parts))
+        finally:
+            if lock is not None:
+                lock.release()
+
+    async def generate_many(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        vehicle_context: Optional[Dict[str, Any]] = None
+    ) -> List[AIResponse]:
+        """
+        Сгенерировать ответы на независимые запросы одновременно
+
+        Args:
+            prompts: Запросы (каждый без истории)
+            system_prompt: Общий системный промпт
+            vehicle_context: Общий контекст автомобиля
+
+        Returns:
+            Ответы в порядке запросов
+        """
+        return list(await asyncio.gather(*(
+            self.generate_response(prompt, system_prompt=system_prompt, vehicle_context=vehicle_context)
+            for prompt in prompts
+        )))
+
+    async def _complete(self, messages: List[Dict[str, str]]) -> AIResponse:
+        async with self.semaphore:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1000
+            )
+        return AIResponse(
+            content=response.choices[0].message.content,
+            tokens_used=response.usage.total_tokens if response.usage else 0,
+            model=self.model
+        )
@@ -0,0 +1,296 @@
+"""
+Async Tesla API Client - асинхронный клиент Tesla API на aiohttp
+"""
+
+from typing import Optional, Dict, Any, List, Sequence
+
+import aiohttp
+
+from .json_backend import JSONBackend, get_backend, load_backend
+from .tesla_client import (
+    SUMMARY_ENDPOINTS,
+    TeslaVehicle,
+    _endpoints_params,
+    _format_summary,
+    _parse_vehicle,
+)
+
+
+class AsyncTeslaAPIClient:
+    """
+    Асинхронный клиент для работы с Tesla API
+
+    Повторяет набор методов TeslaAPIClient, но все запросы выполняются
+    в одном event loop через общий пул соединений aiohttp. Это позволяет
+    опрашивать сотни автомобилей без отдельного потока на каждую машину.
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        base_url: str = "https://owner-api.teslamotors.com",
+        max_concurrency: int = 100,
+        timeout: float = 30.0,
+        session: Optional[aiohttp.ClientSession] = None,
+        json_backend: Optional[str] = None
+    ):
+        """
+        Инициализация асинхронного Tesla API клиента
+
+        Args:
+            access_token: OAuth токен доступа
+            base_url: Базовый URL API
+            max_concurrency: Максимум одновременных запросов (размер пула соединений)
+            timeout: Общий таймаут одного запроса в секундах
+            session: Готовая aiohttp сессия (по умолчанию создается при первом запросе)
+            json_backend: Декодер ответов: "orjson", "msgspec" или "json"
+                (по умолчанию - самый быстрый из установленных)
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        self.access_token = access_token
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._json: Optional[JSONBackend] = load_backend(json_backend) if json_backend else None
+        self.headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        self._session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self) -> "AsyncTeslaAPIClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Общая aiohttp сессия; создается лениво внутри работающего event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.max_concurrency
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Закрыть сессию и освободить соединения пула"""
+        if self._session is not None and self._owns_session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _decode(self, body: bytes) -> Any:
+        # response.json() aiohttp сначала декодирует тело в str; разбираем байты напрямую
+        return (self._json or get_backend()).loads(body)
+
+    async def _get(self, path: str, params: Optional[Dict[str, str]] = None) -> Any:
+        async with self.session.get(f"{self.base_url}{path}", params=params) as response:
+            response.raise_for_status()
+            return self._decode(await response.read())
+
+    async def _post(self, path: str, json: Optional[Dict[str, Any]] = None) -> aiohttp.ClientResponse:
+        async with self.session.post(f"{self.base_url}{path}", json=json) as response:
+            # Читаем тело до выхода из контекста, чтобы соединение вернулось в пул
+            await response.read()
+            return response
+
+    async def get_vehicles(self) -> List[TeslaVehicle]:
+        """
+        Получить список всех автомобилей пользователя
+
+        Returns:
+            Список объектов TeslaVehicle
+        """
+        data = await self._get("/api/1/vehicles")
+        return [_parse_vehicle(v) for v in data.get("response", [])]
+
+    async def get_vehicle_data(self, vehicle_id: str) -> Dict[str, Any]:
+        """
+        Получить полные данные об автомобиле
+
+        Args:
+            vehicle_id: ID автомобиля (id_s)
+
+        Returns:
+            Словарь с данными автомобиля
+        """
+        data = await self._get(f"/api/1/vehicles/{vehicle_id}/data")
+        return data.get("response", {})
+
+    async def get_vehicle_state(
+        self,
+        vehicle_id: str,
+        endpoints: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Получить текущее состояние автомобиля
+
+        Args:
+            vehicle_id: ID автомобиля
+            endpoints: Разделы vehicle_data для запроса (по умолчанию все)
+
+        Returns:
+            Словарь с состоянием автомобиля
+        """
+        data = await self._get(
+            f"/api/1/vehicles/{vehicle_id}/vehicle_data",
+            params=_endpoints_params(endpoints)
+        )
+        return data.get("response", {})
+
+    async def get_charge_state(self, vehicle_id: str) -> Dict[str, Any]:
+        """
+        Получить состояние зарядки
+
+        Args:
+            vehicle_id: ID автомобиля
+
+        Returns:
+            Словарь с состоянием зарядки
+        """
+        data = await self._get(f"/api/1/vehicles/{vehicle_id}/charge_state")
+        return data.get("response", {})
+
+    async def get_climate_state(self, vehicle_id: str) -> Dict[str, Any]:
+        """
+        Получить состояние климат-контроля
+
+        Args:
+            vehicle_id: ID автомобиля
+
+        Returns:
+            Словарь с состоянием климат-контроля
+        """
+        data = await self._get(f"/api/1/vehicles/{vehicle_id}/climate_state")
+        return data.get("response", {})
+
+    async def get_drive_state(self, vehicle_id: str) -> Dict[str, Any]:
+        """
+        Получить информацию о местоположении и движении
+
+        Args:
+            vehicle_id: ID автомобиля
+
+        Returns:
+            Словарь с данными о движении
+        """
+        data = await self._get(f"/api/1/vehicles/{vehicle_id}/drive_state")
+        return data.get("response", {})
+
+    async def get_vehicle_summary(self, vehicle_id: str) -> str:
+        """
+        Получить текстовую сводку об автомобиле
+
+        Args:
+            vehicle_id: ID автомобиля
+
+        Returns:
+            Форматированная строка с информацией
+        """
+        try:
+            vehicle_data = await self.get_vehicle_state(vehicle_id, endpoints=SUMMARY_ENDPOINTS)
+            return _format_summary(vehicle_data)
+        except Exception as e:
+            return f"Error getting vehicle summary: {str(e)}"
+
+    async def honk_horn(self, vehicle_id: str) -> bool:
+        """
+        Побибикать клаксоном
+
+        Args:
+            vehicle_id: ID автомобиля
+
+        Returns:
+            True если успешно
+        """
+        try:
+            response = await self._post(f"/api/1/vehicles/{vehicle_id}/command/honk_horn")
+            return response.status == 200
+        except Exception:
+            return False
+
+    async def _command(self, vehicle_id: str, command: str, json: Optional[Dict[str, Any]] = None) -> bool:
+        async with self.session.post(
+            f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/{command}", json=json
+        ) as response:
+            data = self._decode(await response.read())
+        return data.get("response", False)
+
+    async def lock_doors(self, vehicle_id: str, lock: bool = True) -> bool:
+        """
+        Заблокировать/разблокировать двери
+
+        Args:
+            vehicle_id: ID автомобиля
+            lock: True - заблокировать, False - разблокировать
+
+        Returns:
+            True если успешно
+        """
+        try:
+            command = "lock" if lock else "unlock"
+            return await self._command(vehicle_id, f"{command}_doors")
+        except Exception:
+            return False
+
+    async def start_climate(self, vehicle_id: str, temperature: float = 22.0) -> bool:
+        """
+        Включить климат-контроль
+
+        Args:
+            vehicle_id: ID автомобиля
+            temperature: Желаемая температура в градусах Цельсия
+
+        Returns:
+            True если успешно
+        """
+        try:
+            response = await self._post(
+                f"/api/1/vehicles/{vehicle_id}/command/set_temps",
+                json={"driver_temp": temperature, "passenger_temp": temperature}
+            )
+            if response.status == 200:
+                return await self._command(vehicle_id, "auto_condition_air")
+            return False
+        except Exception:
+            return False
+
+    async def stop_climate(self, vehicle_id: str) -> bool:
+        """
+        Выключить климат-контроль
+
+        Args:
+            vehicle_id: ID автомобиля
+
+        Returns:
+            True если успешно
+        """
+        try:
+            return await self._command(vehicle_id, "auto_condition_air_off")
+        except Exception:
+            return False
+
+    async def flash_lights(self, vehicle_id: str) -> bool:
+        """
+        Мигнуть фарами
+
+        Args:
+            vehicle_id: ID автомобиля
+
+        Returns:
+            True если успешно
+        """
+        try:
+            return await self._command(vehicle_id, "flash_lights")
+        except Exception:
+            return False
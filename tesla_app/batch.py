@@ -0,0 +1,239 @@
+"""
+Batch - ответы AI сразу для многих автомобилей в одном запросе
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable, List, Mapping, Sequence, Tuple
+
+from .tokens import count_tokens
+
+
+# Размер контекстного окна моделей в токенах (по самому длинному совпавшему префиксу)
+CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-0125": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1000000,
+    "gpt-3.5-turbo": 16385,
+}
+
+# Окно для неизвестных моделей
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Предел длины ответа (max_tokens) одного запроса у большинства моделей
+MAX_OUTPUT_TOKENS = 4096
+
+# Сколько токенов ответа резервируется на один автомобиль
+DEFAULT_OUTPUT_TOKENS = 250
+
+# Запас на разметку сообщений и схему инструмента
+_OVERHEAD_TOKENS = 200
+
+# Инструмент для структурированного ответа: текст по каждому автомобилю
+REPORT_TOOL: Dict[str, Any] = {
+    "type": "function",
+    "function": {
+        "name": "report",
+        "description": "Ответ по каждому автомобилю из запроса",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "vehicles": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string", "description": "ID автомобиля из заголовка"},
+                            "text": {"type": "string", "description": "Ответ для этого автомобиля"},
+                        },
+                        "required": ["id", "text"],
+                    },
+                },
+            },
+            "required": ["vehicles"],
+        },
+    },
+}
+
+
+def context_window(model: str) -> int:
+    """Контекстное окно модели в токенах"""
+    matches = [prefix for prefix in CONTEXT_WINDOWS if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+@dataclass
+class BatchStats:
+    """Счетчики пакетной обработки"""
+    vehicles: int = 0
+    batches: int = 0
+    failed: int = 0
+    tokens_used: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def vehicles_per_second(self) -> float:
+        """Пропускная способность: автомобилей в секунду"""
+        return self.vehicles / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def tokens_per_vehicle(self) -> float:
+        """Токенов API (запрос + ответ) на один автомобиль"""
+        return self.tokens_used / self.vehicles if self.vehicles else 0.0
+
+
+@dataclass
+class BatchResult:
+    """Ответы по автомобилям, ошибки и счетчики"""
+    results: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    stats: BatchStats = field(default_factory=BatchStats)
+
+
+def _block(vehicle_id: str, context: str) -> str:
+    return f"### {vehicle_id}\n{context}"
+
+
+def plan_batches(
+    sizes: Sequence[Tuple[str, int]],
+    capacity: int,
+    output_tokens: int = DEFAULT_OUTPUT_TOKENS,
+    max_output_tokens: int = MAX_OUTPUT_TOKENS
+) -> List[List[str]]:
+    """
+    Разложить автомобили по пакетам, помещающимся в контекстное окно
+
+    Пакет заполняется по порядку, пока его контексты и резерв ответа
+    (output_tokens на автомобиль) помещаются в capacity, а резерв ответа -
+    в max_output_tokens. Автомобиль, не помещающийся даже один, идет
+    отдельным пакетом.
+
+    Args:
+        sizes: (ID автомобиля, токенов его блока в запросе) в порядке обработки
+        capacity: Токенов окна, доступных для блоков и ответа
+        output_tokens: Резерв ответа на автомобиль
+        max_output_tokens: Предел длины ответа одного запроса
+
+    Returns:
+        Списки ID автомобилей по пакетам
+    """
+    per_batch = max(1, max_output_tokens // output_tokens)
+    batches: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for vehicle_id, tokens in sizes:
+        cost = tokens + output_tokens
+        if current and (used + cost > capacity or len(current) >= per_batch):
+            batches.append(current)
+            current, used = [], 0
+        current.append(vehicle_id)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_report(message: Any, expected: Sequence[str]) -> Dict[str, str]:
+    """Тексты по автомобилям из вызова report; чужие ID отбрасываются"""
+    texts: Dict[str, str] = {}
+    for tool_call in message.tool_calls or []:
+        if tool_call.function.name != "report":
+            continue
+        arguments = json.loads(tool_call.function.arguments)
+        for item in arguments.get("vehicles", []):
+            vehicle_id = str(item.get("id", "")).strip()
+            if vehicle_id in expected and item.get("text"):
+                texts[vehicle_id] = item["text"]
+    return texts
+
+
+def run_batches(
+    client: Any,
+    model: str,
+    instructions: str,
+    contexts: Mapping[str, str],
+    max_concurrency: int = 4,
+    output_tokens: int = DEFAULT_OUTPUT_TOKENS,
+    window: Optional[int] = None,
+    clock: Callable[[], float] = time.perf_counter
+) -> BatchResult:
+    """
+    Получить ответы для многих автомобилей пакетными запросами
+
+    Контексты автомобилей упаковываются в запросы так, чтобы каждый
+    помещался в контекстное окно модели; модель отвечает вызовом
+    инструмента report со списком {id, text}. Одновременно выполняется
+    не больше max_concurrency запросов.
+
+    Args:
+        client: OpenAI клиент
+        model: Модель GPT
+        instructions: Задание для каждого автомобиля (системный промпт)
+        contexts: ID автомобиля -> компактный контекст (build_context)
+        max_concurrency: Максимум одновременных запросов к API
+        output_tokens: Резерв ответа на автомобиль
+        window: Контекстное окно (по умолчанию - по модели)
+        clock: Источник времени для статистики
+
+    Returns:
+        BatchResult; автомобили, для которых нет ответа, - в errors
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+
+    started = clock()
+    system_prompt = (
+        f"{instructions}\n\nНиже состояния нескольких автомобилей, каждое под заголовком "
+        "\"### <ID>\". Ответь отдельно для каждого автомобиля и верни все ответы одним "
+        "вызовом report."
+    )
+    window = window or context_window(model)
+    capacity = window - count_tokens(system_prompt, model) - _OVERHEAD_TOKENS
+    sizes = [(vehicle_id, count_tokens(_block(vehicle_id, context), model) + 1)
+             for vehicle_id, context in contexts.items()]
+    batches = plan_batches(sizes, capacity, output_tokens)
+
+    def request(vehicle_ids: List[str]) -> Tuple[Dict[str, str], Optional[str], int]:
+        prompt = "\n\n".join(_block(vehicle_id, contexts[vehicle_id]) for vehicle_id in vehicle_ids)
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                tools=[REPORT_TOOL],
+                tool_choice={"type": "function", "function": {"name": "report"}},
+                max_tokens=min(MAX_OUTPUT_TOKENS, output_tokens * len(vehicle_ids)),
+                temperature=0.7
+            )
+            tokens = response.usage.total_tokens if response.usage else 0
+            return _parse_report(response.choices[0].message, vehicle_ids), None, tokens
+        except Exception as e:
+            return {}, str(e), 0
+
+    result = BatchResult()
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as executor:
+            outcomes = list(executor.map(request, batches))
+        for vehicle_ids, (texts, error, tokens) in zip(batches, outcomes):
+            result.stats.tokens_used += tokens
+            for vehicle_id in vehicle_ids:
+                if vehicle_id in texts:
+                    result.results[vehicle_id] = texts[vehicle_id]
+                else:
+                    result.errors[vehicle_id] = error or "No answer in model response"
+
+    result.stats.vehicles = len(contexts)
+    result.stats.batches = len(batches)
+    result.stats.failed = len(result.errors)
+    result.stats.elapsed = clock() - started
+    return result
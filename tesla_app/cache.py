@@ -0,0 +1,218 @@
+"""
+Response Cache - кеш ответов Tesla API с TTL по эндпоинтам
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Iterable, Hashable, Tuple
+
+
+# TTL в секундах по эндпоинтам/разделам vehicle_data
+DEFAULT_TTLS: Dict[str, float] = {
+    "vehicles": 300.0,
+    "drive_state": 5.0,
+    "location_data": 5.0,
+    "charge_state": 60.0,
+    "climate_state": 30.0,
+    "closures_state": 30.0,
+    "vehicle_state": 30.0,
+    "gui_settings": 3600.0,
+    "vehicle_config": 3600.0,
+}
+
+# Эндпоинты, чей ответ содержит все разделы vehicle_data
+COMPOSITE_ENDPOINTS = ("data", "vehicle_data")
+
+# Ключ кеша: (ID автомобиля, эндпоинт, разделы фильтра или None, ...);
+# дополнительные элементы различают представления одного ответа
+CacheKey = Tuple[Any, ...]
+
+MISS = object()
+
+
+@dataclass
+class CacheStats:
+    """Счетчики кеша ответов"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля обращений, обслуженных из кеша"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _estimate_size(value: Any) -> int:
+    return len(json.dumps(value, default=str, separators=(",", ":")))
+
+
+class ResponseCache:
+    """
+    Потокобезопасный LRU-кеш ответов с TTL для каждого эндпоинта
+
+    Размер ограничен и числом записей, и суммарным объемом ответов в байтах.
+    Значения отдаются без копирования, поэтому их не следует изменять.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 30.0,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Инициализация кеша
+
+        Args:
+            ttls: TTL по эндпоинтам, дополняют и переопределяют DEFAULT_TTLS
+            default_ttl: TTL для эндпоинтов, которых нет в таблице
+            max_entries: Максимальное число записей
+            max_bytes: Максимальный суммарный размер ответов
+            clock: Источник времени (для тестов)
+        """
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be >= 1")
+
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, value); порядок - от давно использованных к свежим
+        self._entries: "OrderedDict[CacheKey, Tuple[float, int, Any]]" = OrderedDict()
+        self._by_vehicle: Dict[Optional[str], set] = {}
+        # Счетчики сбросов: по автомобилю (invalidate) и общий (clear)
+        self._generations: Dict[Optional[str], int] = {}
+        self._epoch = 0
+        self._stats = CacheStats()
+
+    def ttl_for(self, endpoint: str, sections: Optional[Iterable[str]] = None) -> float:
+        """
+        TTL записи: для составного ответа - минимальный среди входящих разделов
+
+        Args:
+            endpoint: Имя эндпоинта
+            sections: Разделы фильтра vehicle_data (None - все разделы)
+        """
+        if endpoint in COMPOSITE_ENDPOINTS:
+            names = list(sections) if sections else list(DEFAULT_TTLS)
+            names = [n for n in names if n != "vehicles"]
+            return min(self.ttls.get(n, self.default_ttl) for n in names)
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key: CacheKey) -> Any:
+        """Вернуть значение или MISS, если записи нет или она устарела"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return entry[2]
+                self._remove(key)
+            self._stats.misses += 1
+            return MISS
+
+    def generation(self, vehicle_id: Optional[str]) -> int:
+        """
+        Номер поколения записей автомобиля
+
+        Растет при каждом invalidate() автомобиля и clear(). Номер,
+        полученный до запроса к API, передается в set(): если за время
+        запроса записи сбрасывались, ответ мог устареть и не сохраняется.
+        """
+        with self._lock:
+            return self._epoch + self._generations.get(vehicle_id, 0)
+
+    def set(self, key: CacheKey, value: Any, size: Optional[int] = None,
+            generation: Optional[int] = None):
+        """
+        Сохранить ответ
+
+        Args:
+            key: Ключ (vehicle_id, endpoint, sections, ...)
+            value: Декодированный ответ
+            size: Размер ответа в байтах (по умолчанию оценивается по JSON)
+            generation: generation() автомобиля до запроса; если с тех пор
+                записи сбрасывались, ответ не сохраняется
+        """
+        vehicle_id, endpoint, sections = key[:3]
+        ttl = self.ttl_for(endpoint, sections)
+        if ttl <= 0:
+            return
+        if size is None:
+            size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._epoch + self._generations.get(vehicle_id, 0):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + ttl, size, value)
+            self._by_vehicle.setdefault(vehicle_id, set()).add(key)
+            self._stats.bytes += size
+            while len(self._entries) > self.max_entries or self._stats.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def invalidate(self, vehicle_id: Optional[str], sections: Optional[Iterable[str]] = None):
+        """
+        Удалить записи автомобиля, затронутые изменением состояния
+
+        Args:
+            vehicle_id: ID автомобиля
+            sections: Измененные разделы (None - все записи автомобиля)
+        """
+        changed = set(sections) if sections is not None else None
+        with self._lock:
+            self._generations[vehicle_id] = self._generations.get(vehicle_id, 0) + 1
+            for key in list(self._by_vehicle.get(vehicle_id, ())):
+                _, endpoint, filtered = key[:3]
+                if (
+                    changed is None
+                    or endpoint in changed
+                    or (endpoint in COMPOSITE_ENDPOINTS and (filtered is None or changed & set(filtered)))
+                ):
+                    self._remove(key)
+
+    def clear(self):
+        """Очистить кеш (счетчики попаданий сохраняются)"""
+        with self._lock:
+            self._entries.clear()
+            self._by_vehicle.clear()
+            self._stats.bytes = 0
+            self._epoch += 1
+
+    @property
+    def stats(self) -> CacheStats:
+        """Снимок счетчиков кеша"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._entries),
+                bytes=self._stats.bytes
+            )
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._stats.bytes -= size
+        keys = self._by_vehicle.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_vehicle[key[0]]
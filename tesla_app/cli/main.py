@@ -6,20 +6,65 @@ Tesla AI Assistant - CLI интерфейс для управления Tesla с
 import cmd
 import sys
 import os
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple, TYPE_CHECKING
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.markdown import Markdown
 
 # Добавляем родительскую директорию в путь
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tesla_app.tesla_client import TeslaAPIClient, TeslaVehicle
-from tesla_app.ai_assistant import AIAssistant
+from tesla_app.cache import ResponseCache
+from tesla_app.commands import COMMANDS as CLIENT_COMMANDS
+from tesla_app.intents import DEFAULT_THRESHOLD, classify_all
+from tesla_app.parse_cache import ParseCache, default_path as parse_cache_path
+from tesla_app.registry import VehicleRegistry, default_path
+from tesla_app.tools import execution_plan
+
+if TYPE_CHECKING:
+    # openai и разметка rich загружаются только когда нужны (см. main и команды AI)
+    from tesla_app.ai_assistant import AIAssistant
 
 console = Console()
 
+# Разделы vehicle_data для рекомендаций по парку
+ADVICE_ENDPOINTS = ("charge_state", "climate_state", "drive_state", "vehicle_state")
+
+
+def _print_markdown(text: str, title: str, border_style: str):
+    """Вывести ответ AI в рамке; разметка rich импортируется при первом ответе"""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+    
+    console.print(Panel.fit(Markdown(text), title=title, border_style=border_style))
+
+
+def _stream_markdown(stream: Iterable[str], title: str, border_style: str) -> str:
+    """
+    Выводить ответ AI по мере генерации
+    
+    Панель перерисовывается не чаще refresh_per_second: разбор Markdown
+    всего текста на каждый фрагмент был бы квадратичным по длине ответа.
+    
+    Returns:
+        Полный текст ответа
+    """
+    from rich.live import Live
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+    
+    def render(text: str):
+        return Panel.fit(Markdown(text or "…"), title=title, border_style=border_style)
+    
+    parts: List[str] = []
+    with Live(render(""), console=console, refresh_per_second=8, transient=False) as live:
+        for delta in stream:
+            parts.append(delta)
+            live.update(render("".join(parts)))
+        live.update(render("".join(parts)), refresh=True)
+    return "".join(parts)
+
 
 class TeslaAICLI(cmd.Cmd):
     """Интерактивный CLI для управления Tesla с AI"""
@@ -42,7 +87,7 @@ class TeslaAICLI(cmd.Cmd):
   flash           - Мигнуть фарами
   ask <вопрос>    - Спросить у AI о состоянии автомобиля
   chat <текст>    - Поговорить с AI ассистентом
-  advice          - Получить рекомендации
+  advice [all]    - Получить рекомендации (all - для всего парка)
   help            - Показать эту справку
   exit            - Выйти
 
@@ -51,26 +96,101 @@ class TeslaAICLI(cmd.Cmd):
 """
     
     prompt = "\n[tesla]> "
+    stale_prompt = "\n[tesla · кеш]> "
     
-    def __init__(self, tesla_client: TeslaAPIClient, ai_assistant: Optional[AIAssistant] = None):
+    def __init__(
+        self,
+        tesla_client: TeslaAPIClient,
+        ai_assistant: Optional["AIAssistant"] = None,
+        registry: Optional[VehicleRegistry] = None,
+        ai_factory: Optional[Callable[[], "AIAssistant"]] = None,
+        intent_threshold: Optional[float] = DEFAULT_THRESHOLD
+    ):
         super().__init__()
         self.tesla = tesla_client
-        self.ai = ai_assistant
+        self._ai = ai_assistant
+        # Ассистент создается при первой команде AI: импорт openai занимает ~1 с
+        self._ai_factory = ai_factory
+        # Порог локального распознавания, пока ассистента нет (None - всегда через AI)
+        self.intent_threshold = intent_threshold
+        self.registry = registry if registry is not None else VehicleRegistry()
         self.current_vehicle: Optional[TeslaVehicle] = None
         self.vehicles: List[TeslaVehicle] = []
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_error: Optional[Exception] = None
+    
+    @property
+    def ai(self) -> Optional["AIAssistant"]:
+        """AI ассистент; при заданной ai_factory создается при первом обращении"""
+        if self._ai is None and self._ai_factory is not None:
+            factory, self._ai_factory = self._ai_factory, None
+            try:
+                with console.status("[bold cyan]Подключаю AI ассистента...", spinner="dots"):
+                    self._ai = factory()
+                console.print("[green]✓ AI ассистент подключен[/green]")
+            except Exception as e:
+                console.print(f"[yellow]⚠ AI ассистент не настроен: {e}[/yellow]")
+        return self._ai
+    
+    @ai.setter
+    def ai(self, assistant: Optional["AIAssistant"]):
+        self._ai = assistant
+        self._ai_factory = None
+    
+    @property
+    def _intent_threshold(self) -> Optional[float]:
+        """Порог локального распознавания: как у ассистента, чтобы CLI и parse_commands не расходились"""
+        if self._ai is not None:
+            return self._ai.intent_threshold
+        return self.intent_threshold
     
     def preloop(self):
-        """Действия перед началом цикла команд"""
-        try:
-            self.vehicles = self.tesla.get_vehicles()
-            if self.vehicles:
-                self.current_vehicle = self.vehicles[0]
+        """Действия перед началом цикла команд: старт с сохраненного реестра, обновление в фоне"""
+        if self.registry.load() and len(self.registry):
+            self._apply_registry()
+            console.print(f"[green]✓ Загружено {len(self.vehicles)} автомобилей (из кеша, обновляется...)[/green]")
+            console.print(f"[cyan]Выбран: {self.current_vehicle.display_name} ({self.current_vehicle.vin})[/cyan]")
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_registry, name="tesla-registry", daemon=True
+        )
+        self._refresh_thread.start()
+        if not self.vehicles:
+            # Сохраненного реестра нет - показать пустой список бессмысленно, ждем API
+            self._refresh_thread.join()
+            if self._refresh_error is not None:
+                console.print(f"[red]✗ Ошибка загрузки автомобилей: {self._refresh_error}[/red]")
+            elif self.vehicles:
                 console.print(f"[green]✓ Загружено {len(self.vehicles)} автомобилей[/green]")
                 console.print(f"[cyan]Выбран: {self.current_vehicle.display_name} ({self.current_vehicle.vin})[/cyan]")
             else:
                 console.print("[yellow]⚠ Автомобили не найдены[/yellow]")
+        self._update_prompt()
+    
+    def postcmd(self, stop, line):
+        """После каждой команды обновляем признак устаревших данных в приглашении"""
+        self._update_prompt()
+        return stop
+    
+    def _refresh_registry(self):
+        try:
+            self.registry.refresh(self.tesla)
         except Exception as e:
-            console.print(f"[red]✗ Ошибка загрузки автомобилей: {e}[/red]")
+            self._refresh_error = e
+            return
+        self._refresh_error = None
+        self._apply_registry()
+    
+    def _apply_registry(self):
+        """Взять список автомобилей из реестра, сохранив выбранный автомобиль"""
+        self.vehicles = self.registry.vehicles
+        current = self.current_vehicle
+        if current is not None:
+            self.current_vehicle = self.registry.by_id_s(current.id_s) or current
+        elif self.vehicles:
+            self.current_vehicle = self.vehicles[0]
+    
+    def _update_prompt(self):
+        self.prompt = self.stale_prompt if self.registry.is_stale else type(self).prompt
     
     def do_status(self, arg):
         """Показать статус текущего автомобиля"""
@@ -79,6 +199,8 @@ class TeslaAICLI(cmd.Cmd):
             return
         
         try:
+            from rich.panel import Panel
+            
             summary = self.tesla.get_vehicle_summary(self.current_vehicle.id_s)
             console.print(Panel.fit(summary, title="📊 Статус автомобиля", border_style="cyan"))
         except Exception as e:
@@ -87,7 +209,10 @@ class TeslaAICLI(cmd.Cmd):
     def do_vehicles(self, arg):
         """Показать список автомобилей"""
         try:
-            self.vehicles = self.tesla.get_vehicles()
+            self.registry.refresh(self.tesla)
+            self._apply_registry()
+            
+            from rich.table import Table
             
             table = Table(title="🚗 Ваши автомобили Tesla")
             table.add_column("ID", style="cyan")
@@ -118,20 +243,20 @@ class TeslaAICLI(cmd.Cmd):
             console.print("[red]✗ Укажите ID или индекс автомобиля[/red]")
             return
         
-        try:
-            idx = int(arg) - 1
-            if 0 <= idx < len(self.vehicles):
-                self.current_vehicle = self.vehicles[idx]
-                console.print(f"[green]✓ Выбран: {self.current_vehicle.display_name}[/green]")
-            else:
-                console.print("[red]✗ Неверный индекс[/red]")
-        except ValueError:
-            # Ищем по id_s или display_name
-            for v in self.vehicles:
-                if v.id_s == arg or v.display_name == arg:
-                    self.current_vehicle = v
-                    console.print(f"[green]✓ Выбран: {v.display_name}[/green]")
-                    return
+        arg = arg.strip()
+        if arg.isdigit() and 0 < int(arg) <= len(self.vehicles):
+            self.current_vehicle = self.vehicles[int(arg) - 1]
+            console.print(f"[green]✓ Выбран: {self.current_vehicle.display_name}[/green]")
+            return
+        
+        # Ищем по id_s, VIN, имени или id
+        vehicle = self.registry.find(arg)
+        if vehicle is not None:
+            self.current_vehicle = vehicle
+            console.print(f"[green]✓ Выбран: {vehicle.display_name}[/green]")
+        elif arg.isdigit():
+            console.print("[red]✗ Неверный индекс или ID[/red]")
+        else:
             console.print("[red]✗ Автомобиль не найден[/red]")
     
     def do_honk(self, arg):
@@ -242,15 +367,11 @@ class TeslaAICLI(cmd.Cmd):
             return
         
         try:
-            with console.status("[bold cyan]Думаю...", spinner="dots"):
+            with console.status("[bold cyan]Получаю состояние...", spinner="dots"):
                 state = self.tesla.get_vehicle_state(self.current_vehicle.id_s)
-                response = self.ai.generate_response(arg, vehicle_context=state)
             
-            console.print(Panel.fit(
-                Markdown(response.content),
-                title="🤖 AI Ответ",
-                border_style="green"
-            ))
+            stream = self.ai.stream_response(arg, vehicle_context=state)
+            _stream_markdown(stream, title="🤖 AI Ответ", border_style="green")
         except Exception as e:
             console.print(f"[red]✗ Ошибка: {e}[/red]")
     
@@ -265,23 +386,21 @@ class TeslaAICLI(cmd.Cmd):
             return
         
         try:
-            with console.status("[bold cyan]Думаю...", spinner="dots"):
-                response = self.ai.generate_response(arg)
-            
-            console.print(Panel.fit(
-                Markdown(response.content),
-                title="🤖 AI",
-                border_style="green"
-            ))
+            stream = self.ai.stream_response(arg)
+            _stream_markdown(stream, title="🤖 AI", border_style="green")
         except Exception as e:
             console.print(f"[red]✗ Ошибка: {e}[/red]")
     
     def do_advice(self, arg):
-        """Получить рекомендации от AI"""
+        """Получить рекомендации от AI (advice all - для всех автомобилей в сети)"""
         if not self.ai:
             console.print("[red]✗ AI ассистент не настроен (нужен OPENAI_API_KEY)[/red]")
             return
         
+        if arg.strip() == "all":
+            self._fleet_advice()
+            return
+        
         if not self.current_vehicle:
             console.print("[red]✗ Сначала выберите автомобиль[/red]")
             return
@@ -291,11 +410,43 @@ class TeslaAICLI(cmd.Cmd):
                 state = self.tesla.get_vehicle_state(self.current_vehicle.id_s)
                 advice = self.ai.get_advice(state)
             
-            console.print(Panel.fit(
-                Markdown(advice),
-                title="💡 Рекомендации",
-                border_style="yellow"
-            ))
+            _print_markdown(advice, title="💡 Рекомендации", border_style="yellow")
+        except Exception as e:
+            console.print(f"[red]✗ Ошибка: {e}[/red]")
+    
+    def _fleet_advice(self):
+        """Рекомендации для всех автомобилей в сети пакетными запросами"""
+        if self.registry.is_stale:
+            # Состояния из сохраненного реестра могут быть старыми
+            try:
+                self.registry.refresh(self.tesla)
+                self._apply_registry()
+            except Exception as e:
+                console.print(f"[yellow]⚠ Не удалось обновить список автомобилей: {e}[/yellow]")
+        # Спящие автомобили не опрашиваются и не будятся, чтобы не будить весь парк
+        online = {v.id_s: v for v in self.vehicles if v.state == "online"}
+        if not online:
+            console.print("[yellow]⚠ Нет автомобилей в сети[/yellow]")
+            return
+        
+        try:
+            with console.status("[bold cyan]Анализирую парк...", spinner="dots"):
+                fleet = self.tesla.get_fleet_data(list(online), endpoints=ADVICE_ENDPOINTS, wake=False)
+                states = {r.vehicle_id: r.data for r in fleet if r.error is None}
+                batch = self.ai.get_advice_batch(states)
+            
+            for vehicle_id, vehicle in online.items():
+                if vehicle_id in batch.results:
+                    _print_markdown(batch.results[vehicle_id], title=f"💡 {vehicle.display_name}", border_style="yellow")
+                else:
+                    error = batch.errors.get(vehicle_id, "нет данных автомобиля")
+                    console.print(f"[red]✗ {vehicle.display_name}: {error}[/red]")
+            
+            stats = batch.stats
+            console.print(
+                f"[cyan]{stats.vehicles} авто, {stats.batches} запрос(ов) за {stats.elapsed:.1f} с: "
+                f"{stats.vehicles_per_second:.2f} авто/с, {stats.tokens_per_vehicle:.0f} токенов на автомобиль[/cyan]"
+            )
         except Exception as e:
             console.print(f"[red]✗ Ошибка: {e}[/red]")
     
@@ -305,57 +456,81 @@ class TeslaAICLI(cmd.Cmd):
         return True
     
     def default(self, line):
-        """Обработка неизвестных команд - попытка интерпретировать через AI"""
-        if self.ai and line.strip():
-            console.print("[yellow]Неизвестная команда. Пробую интерпретировать через AI...[/yellow]")
-            try:
-                if not self.current_vehicle:
-                    console.print("[red]✗ Сначала выберите автомобиль[/red]")
-                    return
-                
-                state = self.tesla.get_vehicle_state(self.current_vehicle.id_s)
-                parsed = self.ai.parse_command(line, state)
-                
-                command = parsed.get("command")
-                confidence = parsed.get("confidence", 0)
-                
-                if confidence > 0.7:
-                    self._execute_parsed_command(command, parsed.get("parameters", {}))
-                else:
-                    console.print(f"[yellow]⚠ Низкая уверенность ({confidence:.2f}). Используйте явные команды.[/yellow]")
-            except Exception as e:
-                console.print(f"[red]✗ Ошибка: {e}[/red]")
-        else:
+        """Обработка неизвестных команд - локальное распознавание, затем AI"""
+        if not line.strip():
+            return
+        
+        threshold = self._intent_threshold
+        intents = classify_all(line)
+        confident = threshold is not None and all(intent.confidence >= threshold for intent in intents)
+        if not confident and not self.ai:
             console.print(f"[red]✗ Неизвестная команда: {line}[/red]")
+            return
+        if not self.current_vehicle:
+            console.print("[red]✗ Сначала выберите автомобиль[/red]")
+            return
+        
+        if confident:
+            self._execute_parsed_commands([intent.to_dict() for intent in intents])
+            return
+        
+        console.print("[yellow]Неизвестная команда. Пробую интерпретировать через AI...[/yellow]")
+        try:
+            vehicle_id = self.current_vehicle.id_s
+            # Состояние читается, только если команды нет в кеше разбора
+            calls = self.ai.parse_commands(line, lambda: self.tesla.get_vehicle_state(vehicle_id))
+            
+            if calls:
+                self._execute_parsed_commands(calls)
+            else:
+                console.print("[yellow]⚠ Команда не распознана. Используйте явные команды.[/yellow]")
+        except Exception as e:
+            console.print(f"[red]✗ Ошибка: {e}[/red]")
     
-    def _execute_parsed_command(self, command: str, params: Dict[str, Any]):
-        """Выполнить распарсенную команду"""
-        commands = {
-            'honk': lambda: self.tesla.honk_horn(self.current_vehicle.id_s),
-            'lock': lambda: self.tesla.lock_doors(self.current_vehicle.id_s, lock=True),
-            'unlock': lambda: self.tesla.lock_doors(self.current_vehicle.id_s, lock=False),
-            'start_climate': lambda: self.tesla.start_climate(
-                self.current_vehicle.id_s, 
-                temperature=params.get('temperature', 22.0)
-            ),
-            'stop_climate': lambda: self.tesla.stop_climate(self.current_vehicle.id_s),
-            'flash_lights': lambda: self.tesla.flash_lights(self.current_vehicle.id_s),
-            'get_status': lambda: self.tesla.get_vehicle_summary(self.current_vehicle.id_s)
-        }
+    def _execute_parsed_commands(self, calls: List[Dict[str, Any]]):
+        """
+        Выполнить несколько распарсенных команд
         
-        if command in commands:
-            try:
-                result = commands[command]()
-                if isinstance(result, str):
-                    console.print(result)
-                elif result:
-                    console.print(f"[green]✓ Команда '{command}' выполнена[/green]")
-                else:
-                    console.print(f"[yellow]⚠ Команда '{command}' не выполнена[/yellow]")
-            except Exception as e:
-                console.print(f"[red]✗ Ошибка выполнения: {e}[/red]")
-        else:
+        Независимые команды (например, lock и start_climate) выполняются
+        параллельно, конфликтующие - по порядку (см. tools.execution_plan).
+        Результаты выводятся в порядке запроса.
+        """
+        for stage in execution_plan(calls):
+            if len(stage) == 1:
+                outcomes = [self._run_parsed_command(stage[0]["command"], stage[0].get("parameters", {}))]
+            else:
+                with ThreadPoolExecutor(max_workers=len(stage)) as executor:
+                    outcomes = list(executor.map(
+                        lambda call: self._run_parsed_command(call["command"], call.get("parameters", {})),
+                        stage
+                    ))
+            for call, (result, error) in zip(stage, outcomes):
+                self._report_command(call["command"], result, error)
+    
+    def _run_parsed_command(self, command: str, params: Dict[str, Any]) -> Tuple[Any, Optional[Exception]]:
+        """Вызвать клиент для команды; возвращает (результат, ошибка)"""
+        vehicle_id = self.current_vehicle.id_s
+        try:
+            if command == 'get_status':
+                return self.tesla.get_vehicle_summary(vehicle_id), None
+            if command in CLIENT_COMMANDS:
+                return CLIENT_COMMANDS[command](self.tesla, vehicle_id, params), None
+        except Exception as e:
+            return None, e
+        return None, None
+    
+    def _report_command(self, command: str, result: Any, error: Optional[Exception]):
+        """Вывести результат команды"""
+        if command != 'get_status' and command not in CLIENT_COMMANDS:
             console.print(f"[yellow]⚠ Неизвестная команда: {command}[/yellow]")
+        elif error is not None:
+            console.print(f"[red]✗ Ошибка выполнения: {error}[/red]")
+        elif isinstance(result, str):
+            console.print(result)
+        elif result:
+            console.print(f"[green]✓ Команда '{command}' выполнена[/green]")
+        else:
+            console.print(f"[yellow]⚠ Команда '{command}' не выполнена[/yellow]")
 
 
 def main():
@@ -366,6 +541,9 @@ def main():
     parser.add_argument("--token", help="Tesla API access token")
     parser.add_argument("--openai-key", help="OpenAI API key")
     parser.add_argument("--model", default="gpt-4", help="OpenAI model (default: gpt-4)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable Tesla API response cache")
+    parser.add_argument("--no-registry", action="store_true", help="Do not persist the vehicle list between runs")
+    parser.add_argument("--no-parse-cache", action="store_true", help="Do not persist parsed commands between runs")
     args = parser.parse_args()
     
     # Инициализация Tesla клиента
@@ -375,25 +553,32 @@ def main():
         console.print("[cyan]Или установите переменную окружения TESLA_ACCESS_TOKEN[/cyan]")
         sys.exit(1)
     
-    tesla_client = TeslaAPIClient(access_token=args.token)
+    tesla_client = TeslaAPIClient(
+        access_token=args.token,
+        cache=None if args.no_cache else ResponseCache(),
+        auto_wake=True
+    )
     
-    # Инициализация AI ассистента (опционально)
-    ai_assistant = None
-    if args.openai_key or os.getenv("OPENAI_API_KEY"):
-        try:
-            ai_assistant = AIAssistant(
-                api_key=args.openai_key or os.getenv("OPENAI_API_KEY"),
-                model=args.model
+    # AI ассистент (опционально) создается при первой команде, которой он нужен,
+    # чтобы импорт openai не задерживал первое приглашение
+    ai_factory = None
+    api_key = args.openai_key or os.getenv("OPENAI_API_KEY")
+    if api_key:
+        def ai_factory():
+            from tesla_app.ai_assistant import AIAssistant
+            
+            return AIAssistant(
+                api_key=api_key,
+                model=args.model,
+                parse_cache=ParseCache(None if args.no_parse_cache else parse_cache_path())
             )
-            console.print("[green]✓ AI ассистент подключен[/green]")
-        except Exception as e:
-            console.print(f"[yellow]⚠ AI ассистент не настроен: {e}[/yellow]")
     else:
         console.print("[yellow]⚠ AI ассистент отключен (нужен OPENAI_API_KEY)[/yellow]")
     
     # Запуск CLI
     try:
-        cli = TeslaAICLI(tesla_client, ai_assistant)
+        registry = VehicleRegistry(None if args.no_registry else default_path(args.token))
+        cli = TeslaAICLI(tesla_client, registry=registry, ai_factory=ai_factory)
         cli.cmdloop()
     except KeyboardInterrupt:
         console.print("\n[cyan]До свидания! 👋[/cyan]")
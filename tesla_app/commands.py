@@ -0,0 +1,200 @@
+"""
+Command Scheduler - очередь команд по автомобилям с схлопыванием
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Deque, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .tesla_client import TeslaAPIClient
+
+
+# Команды планировщика и вызовы клиента, которые их выполняют
+COMMANDS: Dict[str, Callable[["TeslaAPIClient", str, Dict[str, Any]], Any]] = {
+    "honk": lambda client, vehicle_id, params: client.honk_horn(vehicle_id),
+    "flash_lights": lambda client, vehicle_id, params: client.flash_lights(vehicle_id),
+    "lock": lambda client, vehicle_id, params: client.lock_doors(vehicle_id, lock=True),
+    "unlock": lambda client, vehicle_id, params: client.lock_doors(vehicle_id, lock=False),
+    "start_climate": lambda client, vehicle_id, params: client.start_climate(
+        vehicle_id, temperature=params.get("temperature", 22.0)
+    ),
+    "stop_climate": lambda client, vehicle_id, params: client.stop_climate(vehicle_id),
+    "set_temps": lambda client, vehicle_id, params: client.set_temps(vehicle_id, **params),
+}
+
+# Команды одной группы задают одно и то же состояние: ожидающая команда
+# отменяется новой командой группы, выполняется только последняя
+SUPERSEDE_GROUPS = {
+    "lock": "doors",
+    "unlock": "doors",
+    "start_climate": "climate",
+    "stop_climate": "climate",
+}
+
+# Повторные ожидающие команды сливаются в одну с последними параметрами;
+# значение - группа, команды которой, стоящие после ожидающей, запрещают
+# слияние (иначе новая команда обогнала бы их и нарушила FIFO)
+MERGEABLE = {"set_temps": "climate"}
+
+
+@dataclass
+class SchedulerStats:
+    """Счетчики планировщика команд"""
+    submitted: int = 0
+    executed: int = 0
+    superseded: int = 0
+    merged: int = 0
+
+
+class _Pending:
+    """Ожидающая команда и все futures, которые получат ее результат"""
+
+    __slots__ = ("command", "params", "futures")
+
+    def __init__(self, command: str, params: Dict[str, Any], future: Future):
+        self.command = command
+        self.params = params
+        self.futures: List[Future] = [future]
+
+
+class CommandScheduler:
+    """
+    Планировщик команд: строгий FIFO для каждого автомобиля, параллельно между автомобилями
+
+    Для каждого автомобиля в пуле выполняется не больше одной команды
+    одновременно. Ожидающие команды схлопываются: из lock -> unlock
+    отправляется только unlock (future lock отменяется), повторные
+    set_temps сливаются в один запрос.
+    """
+
+    def __init__(self, client: "TeslaAPIClient", max_workers: int = 8):
+        """
+        Инициализация планировщика
+
+        Args:
+            client: Tesla API клиент
+            max_workers: Число автомобилей, команды которым выполняются одновременно
+        """
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tesla-cmd")
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Pending]] = {}
+        self._active: set = set()
+        self._stats = SchedulerStats()
+        self._closed = False
+
+    def __enter__(self) -> "CommandScheduler":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def submit(self, vehicle_id: str, command: str, **params: Any) -> Future:
+        """
+        Поставить команду в очередь автомобиля
+
+        Args:
+            vehicle_id: ID автомобиля
+            command: Имя команды из COMMANDS
+            **params: Параметры команды (например, temperature)
+
+        Returns:
+            Future с результатом вызова клиента; отменяется, если команду
+            вытеснила более поздняя команда той же группы
+        """
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown command: {command}")
+
+        future: Future = Future()
+        superseded: List[Future] = []
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("CommandScheduler is shut down")
+            self._stats.submitted += 1
+            queue = self._queues.setdefault(vehicle_id, deque())
+
+            if command in MERGEABLE:
+                for pending in reversed(queue):
+                    if pending.command == command:
+                        pending.params = params
+                        pending.futures.append(future)
+                        self._stats.merged += 1
+                        return future
+                    if SUPERSEDE_GROUPS.get(pending.command) == MERGEABLE[command]:
+                        break
+
+            group = SUPERSEDE_GROUPS.get(command)
+            if group is not None:
+                for pending in [p for p in queue if SUPERSEDE_GROUPS.get(p.command) == group]:
+                    queue.remove(pending)
+                    superseded.extend(pending.futures)
+                    self._stats.superseded += 1
+
+            queue.append(_Pending(command, params, future))
+            if vehicle_id not in self._active:
+                self._active.add(vehicle_id)
+                self._executor.submit(self._run_next, vehicle_id)
+
+        for old in superseded:
+            old.cancel()
+        return future
+
+    def pending(self, vehicle_id: Optional[str] = None) -> int:
+        """Число ожидающих команд (для автомобиля или всего)"""
+        with self._lock:
+            if vehicle_id is not None:
+                return len(self._queues.get(vehicle_id, ()))
+            return sum(len(q) for q in self._queues.values())
+
+    @property
+    def stats(self) -> SchedulerStats:
+        """Снимок счетчиков планировщика"""
+        with self._lock:
+            return SchedulerStats(**vars(self._stats))
+
+    def shutdown(self, wait: bool = True):
+        """
+        Остановить планировщик
+
+        Новые команды не принимаются; уже поставленные в очередь
+        выполняются до конца (их futures не зависают).
+
+        Args:
+            wait: Дождаться выполнения очередей
+        """
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait)
+
+    def _run_next(self, vehicle_id: str):
+        while True:
+            with self._lock:
+                pending = self._queues[vehicle_id].popleft()
+
+            futures = [f for f in pending.futures if f.set_running_or_notify_cancel()]
+            if futures:
+                try:
+                    result = COMMANDS[pending.command](self.client, vehicle_id, pending.params)
+                except Exception as e:
+                    for future in futures:
+                        future.set_exception(e)
+                else:
+                    for future in futures:
+                        future.set_result(result)
+                with self._lock:
+                    self._stats.executed += 1
+
+            with self._lock:
+                if not self._queues[vehicle_id]:
+                    del self._queues[vehicle_id]
+                    self._active.discard(vehicle_id)
+                    return
+                if not self._closed:
+                    # Следующая команда автомобиля встает в конец общей очереди пула,
+                    # чтобы длинная очередь одной машины не задерживала остальные
+                    self._executor.submit(self._run_next, vehicle_id)
+                    return
+            # После shutdown пул не принимает задачи: очередь дорабатывается здесь
@@ -0,0 +1,169 @@
+"""
+Vehicle Context - компактное описание состояния автомобиля для промпта AI
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+
+from .tokens import count_tokens
+
+
+# Бюджет контекста в токенах по умолчанию
+DEFAULT_BUDGET = 300
+
+# Тема -> (основы слов запроса, поля "раздел.поле" в порядке важности)
+TOPICS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "charge": (
+        ("заряд", "батаре", "аккумул", "запас", "kwh", "battery", "charg", "range"),
+        (
+            "charge_state.battery_level", "charge_state.battery_range", "charge_state.charging_state",
+            "charge_state.charge_limit_soc", "charge_state.time_to_full_charge",
+            "charge_state.charge_rate", "charge_state.charger_power",
+            "charge_state.est_battery_range", "charge_state.charge_port_door_open",
+        ),
+    ),
+    "climate": (
+        ("климат", "температур", "тепл", "холод", "жар", "мороз", "кондиц", "печк", "обогрев", "салон",
+         "climate", "temp", "heat", "cool", "warm", "cold", "hot", "cabin"),
+        (
+            "climate_state.inside_temp", "climate_state.outside_temp", "climate_state.is_climate_on",
+            "climate_state.driver_temp_setting", "climate_state.passenger_temp_setting",
+            "climate_state.is_preconditioning", "climate_state.is_auto_conditioning_on",
+            "climate_state.fan_status",
+        ),
+    ),
+    "location": (
+        ("где", "местополож", "находит", "координат", "адрес", "скорост", "едет", "парков",
+         "where", "location", "speed", "driv", "park"),
+        (
+            "drive_state.latitude", "drive_state.longitude", "drive_state.shift_state",
+            "drive_state.speed", "drive_state.heading", "drive_state.power",
+        ),
+    ),
+    "security": (
+        ("замк", "замок", "блок", "закр", "откр", "двер", "охран", "безопас", "окн", "багаж",
+         "lock", "door", "secur", "sentry", "window", "trunk"),
+        (
+            "vehicle_state.locked", "vehicle_state.sentry_mode", "vehicle_state.is_user_present",
+            "vehicle_state.df", "vehicle_state.dr", "vehicle_state.pf", "vehicle_state.pr",
+            "vehicle_state.ft", "vehicle_state.rt",
+        ),
+    ),
+    "vehicle": (
+        ("пробег", "верси", "прошивк", "обновлен", "odometer", "mileage", "version", "software", "update"),
+        ("vehicle_state.odometer", "vehicle_state.car_version"),
+    ),
+}
+
+
+@dataclass
+class VehicleContext:
+    """Контекст для промпта и сколько токенов он сэкономил"""
+    text: str
+    tokens: int
+    full_tokens: int
+    topics: List[str] = field(default_factory=list)
+
+    @property
+    def saved(self) -> int:
+        """На сколько токенов контекст короче полного ответа vehicle_data"""
+        return max(0, self.full_tokens - self.tokens)
+
+
+def relevant_topics(query: Optional[str]) -> List[str]:
+    """
+    Темы, о которых спрашивает запрос
+
+    Returns:
+        Темы по убыванию числа совпавших основ; пустой список, если
+        запрос не относится ни к одной теме
+    """
+    if not query:
+        return []
+    text = query.lower().replace("ё", "е")
+    hits = {
+        topic: sum(1 for stem in stems if stem in text)
+        for topic, (stems, _) in TOPICS.items()
+    }
+    return sorted((t for t, n in hits.items() if n), key=lambda t: -hits[t])
+
+
+def _format(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return f"{value:.4f}".rstrip("0").rstrip(".") if abs(value) < 1000 else f"{value:.0f}"
+    return str(value)
+
+
+def build_context(
+    data: Any,
+    query: Optional[str] = None,
+    budget: int = DEFAULT_BUDGET,
+    topics: Optional[Iterable[str]] = None,
+    model: Optional[str] = None
+) -> VehicleContext:
+    """
+    Собрать компактный контекст состояния автомобиля
+
+    Поля тем, к которым относится запрос, идут первыми и полностью; от
+    остальных тем берется по одному главному полю (если запрос ни к
+    одной теме не относится - все поля всех тем). Поля добавляются, пока
+    помещаются в бюджет. Формат - строка на тему вида
+    "charge: battery_level=80 charging_state=Charging".
+
+    Args:
+        data: Ответ vehicle_data (словарь или VehicleData)
+        query: Запрос пользователя для выбора тем
+        budget: Максимум токенов контекста
+        topics: Темы вместо определяемых по запросу (остальные не включаются)
+        model: Модель для подсчета токенов
+
+    Returns:
+        VehicleContext; text пустой, если в данных нет известных полей
+    """
+    if hasattr(data, "to_dict"):
+        data = data.to_dict()
+    data = data or {}
+
+    if topics is not None:
+        relevant = [t for t in topics if t in TOPICS]
+        order = relevant
+    else:
+        relevant = relevant_topics(query)
+        order = relevant + [t for t in TOPICS if t not in relevant]
+
+    lines: List[str] = []
+    used = 0
+    included: List[str] = []
+    for topic in order:
+        items: List[str] = []
+        header = count_tokens(f"{topic}:", model) + 1
+        # Если запрос о конкретных темах, от остальных остается главное поле
+        paths = TOPICS[topic][1] if not relevant or topic in relevant else TOPICS[topic][1][:1]
+        for path in paths:
+            section, name = path.split(".")
+            value = _format((data.get(section) or {}).get(name))
+            if value is None:
+                continue
+            item = f"{name}={value}"
+            cost = count_tokens(" " + item, model) + (0 if items else header)
+            if used + cost > budget:
+                break
+            items.append(item)
+            used += cost
+        if items:
+            lines.append(f"{topic}: " + " ".join(items))
+            included.append(topic)
+        if used >= budget:
+            break
+
+    text = "\n".join(lines)
+    return VehicleContext(
+        text=text,
+        tokens=count_tokens(text, model),
+        full_tokens=count_tokens(str(data), model),
+        topics=included,
+    )
@@ -0,0 +1,178 @@
+"""
+Delta Engine - пополевые изменения между снимками vehicle_data
+"""
+
+import fnmatch
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
+
+
+@dataclass
+class FieldChange:
+    """Изменение одного поля; None в old/new - поле отсутствовало"""
+    path: str
+    old: Any
+    new: Any
+
+
+def diff(old: Any, new: Any, prefix: str = "") -> List[FieldChange]:
+    """
+    Пополевое сравнение двух ответов
+
+    Вложенные словари сравниваются рекурсивно, остальные значения (включая
+    списки) - целиком. Равные поддеревья отсекаются одним сравнением ==,
+    поэтому работа пропорциональна изменившейся части, а не всему ответу.
+
+    Args:
+        old: Предыдущее значение
+        new: Новое значение
+        prefix: Путь к сравниваемому значению
+
+    Returns:
+        Изменения с путями вида "charge_state.battery_level"
+    """
+    changes: List[FieldChange] = []
+    _diff(old, new, prefix, changes)
+    return changes
+
+
+def _diff(old: Any, new: Any, prefix: str, changes: List[FieldChange]):
+    if old is new or old == new:
+        return
+    # Появившийся или пропавший раздел раскладывается по листьям
+    if old is None and isinstance(new, dict):
+        old = {}
+    elif new is None and isinstance(old, dict):
+        new = {}
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in list(new) + [k for k in old if k not in new]:
+            _diff(old.get(key), new.get(key), f"{prefix}.{key}" if prefix else key, changes)
+    else:
+        changes.append(FieldChange(prefix, old, new))
+
+
+class Subscription:
+    """Подписка на изменения полей, подходящих под шаблоны"""
+
+    __slots__ = ("patterns", "callback", "_engine", "_matches")
+
+    def __init__(self, engine: "DeltaEngine", patterns: Tuple[str, ...], callback: Callable[[str, List[FieldChange]], None]):
+        self.patterns = patterns
+        self.callback = callback
+        self._engine = engine
+        # Путь -> подходит ли он под шаблоны; набор путей ответа ограничен
+        self._matches: Dict[str, bool] = {}
+
+    def matches(self, path: str) -> bool:
+        """Путь совпадает с шаблоном или вложен в него ("charge_state" - весь раздел)"""
+        result = self._matches.get(path)
+        if result is None:
+            result = any(
+                path == p or path.startswith(p + ".") or fnmatch.fnmatchcase(path, p)
+                for p in self.patterns
+            )
+            self._matches[path] = result
+        return result
+
+    def unsubscribe(self):
+        """Отписаться от изменений"""
+        self._engine._unsubscribe(self)
+
+
+class DeltaEngine:
+    """
+    Хранит последний снимок каждого автомобиля и выдает изменения
+
+    update() сравнивает новый ответ с предыдущим снимком и возвращает
+    только изменившиеся поля; подписчики получают изменения полей,
+    на которые подписаны. Снимки не копируются и не должны изменяться.
+    """
+
+    def __init__(self, ignore: Iterable[str] = ()):
+        """
+        Инициализация движка
+
+        Args:
+            ignore: Шаблоны путей, изменения которых не выдаются
+                (например, "*.timestamp" для меток времени каждого опроса)
+        """
+        self.ignore = tuple(ignore)
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._subscriptions: List[Subscription] = []
+        self._ignored: Dict[str, bool] = {}
+
+    def update(self, vehicle_id: str, data: Any, partial: bool = False) -> List[FieldChange]:
+        """
+        Учесть новый ответ автомобиля
+
+        Args:
+            vehicle_id: ID автомобиля
+            data: Ответ vehicle_data (словарь или VehicleData)
+            partial: Ответ содержит только часть разделов: сравниваются и
+                обновляются только присутствующие верхнеуровневые ключи
+
+        Returns:
+            Изменения относительно прошлого снимка; для первого снимка -
+            все поля ответа (old=None)
+        """
+        if hasattr(data, "to_dict"):
+            data = data.to_dict()
+        with self._lock:
+            previous = self._snapshots.get(vehicle_id) or {}
+            if partial:
+                snapshot = dict(previous)
+                snapshot.update(data)
+                previous = {key: previous.get(key) for key in data}
+            else:
+                snapshot = data
+            self._snapshots[vehicle_id] = snapshot
+            subscriptions = list(self._subscriptions)
+            changes = [c for c in diff(previous, data) if not self._is_ignored(c.path)]
+
+        for subscription in subscriptions:
+            selected = [c for c in changes if subscription.matches(c.path)]
+            if selected:
+                subscription.callback(vehicle_id, selected)
+        return changes
+
+    def subscribe(self, patterns: Iterable[str], callback: Callable[[str, List[FieldChange]], None]) -> Subscription:
+        """
+        Подписаться на изменения полей
+
+        Args:
+            patterns: Пути ("drive_state.speed"), разделы ("charge_state")
+                или шаблоны fnmatch ("*.locked")
+            callback: Вызывается как callback(vehicle_id, changes) после
+                update(), если изменилось хотя бы одно подходящее поле
+
+        Returns:
+            Subscription; unsubscribe() отменяет подписку
+        """
+        subscription = Subscription(self, tuple(patterns), callback)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def snapshot(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        """Последний снимок автомобиля"""
+        with self._lock:
+            return self._snapshots.get(vehicle_id)
+
+    def forget(self, vehicle_id: str):
+        """Удалить снимок: следующий update() выдаст все поля"""
+        with self._lock:
+            self._snapshots.pop(vehicle_id, None)
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def _is_ignored(self, path: str) -> bool:
+        result = self._ignored.get(path)
+        if result is None:
+            result = any(fnmatch.fnmatchcase(path, p) for p in self.ignore)
+            self._ignored[path] = result
+        return result
@@ -0,0 +1,172 @@
+"""
+Chat History - история разговора в пределах бюджета токенов
+"""
+
+import re
+from typing import Optional, Dict, Callable, List
+
+from .tokens import count_message_tokens, count_tokens
+
+
+# Бюджет истории в токенах (сводка + сообщения) по умолчанию
+HISTORY_BUDGET = 1500
+
+# Доля бюджета истории, которую может занимать сводка старых сообщений
+SUMMARY_SHARE = 0.2
+
+# Сколько токенов сводки приходится на одно свернутое сообщение
+_LINE_TOKENS = 40
+
+_ROLES = {"user": "Пользователь", "assistant": "Ассистент"}
+_SENTENCE = re.compile(r"(?<=[.!?])\s")
+
+Summarizer = Callable[[str, List[Dict[str, str]]], str]
+
+
+def _shorten(text: str, max_tokens: int) -> str:
+    """Первое предложение текста, обрезанное до max_tokens"""
+    text = " ".join(text.split())
+    text = _SENTENCE.split(text, 1)[0]
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Бинарный поиск длины префикса по числу токенов
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens - 1:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip() + "…"
+
+
+def local_summary(previous: str, messages: List[Dict[str, str]]) -> str:
+    """
+    Сводка без обращения к LLM: по строке на сообщение
+
+    Каждое свернутое сообщение сокращается до первого предложения;
+    строки добавляются к предыдущей сводке.
+    """
+    lines = [previous] if previous else []
+    for message in messages:
+        content = message.get("content") or ""
+        if content:
+            role = _ROLES.get(message.get("role"), message.get("role"))
+            lines.append(f"{role}: {_shorten(content, _LINE_TOKENS)}")
+    return "\n".join(lines)
+
+
+class ChatHistory:
+    """
+    История разговора с ограничением по токенам, а не по числу сообщений
+
+    Когда сообщения вместе со сводкой превышают budget, самые старые
+    сообщения сворачиваются в сводку (summarizer), а сводка обрезается
+    до summary_budget с начала. Поэтому размер истории в промпте
+    ограничен при любой длине разговора: короткие реплики хранятся
+    долго, одно длинное сообщение не раздувает все последующие запросы.
+    """
+
+    def __init__(
+        self,
+        budget: int = HISTORY_BUDGET,
+        summary_budget: Optional[int] = None,
+        summarizer: Optional[Summarizer] = None,
+        model: Optional[str] = None
+    ):
+        """
+        Инициализация истории
+
+        Args:
+            budget: Максимум токенов истории в промпте (сводка + сообщения)
+            summary_budget: Максимум токенов сводки (часть budget; по умолчанию
+                SUMMARY_SHARE от budget)
+            summarizer: Функция (предыдущая сводка, свернутые сообщения) -> новая
+                сводка; по умолчанию local_summary. Может вызывать LLM
+            model: Модель для подсчета токенов
+        """
+        if summary_budget is None:
+            summary_budget = int(budget * SUMMARY_SHARE)
+        if not 0 <= summary_budget < budget:
+            raise ValueError("summary_budget must be >= 0 and less than budget")
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.summarizer = summarizer or local_summary
+        self.model = model
+        self.messages: List[Dict[str, str]] = []
+        self.summary = ""
+        self._sizes: List[int] = []
+        self._summary_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    @property
+    def tokens(self) -> int:
+        """Токенов истории в промпте"""
+        return self._summary_tokens + sum(self._sizes)
+
+    def add(self, role: str, content: str):
+        """Добавить сообщение; при превышении бюджета свернуть старые"""
+        message = {"role": role, "content": content}
+        self.messages.append(message)
+        self._sizes.append(count_message_tokens(message, self.model))
+        if self.tokens > self.budget:
+            self._fold()
+
+    def as_messages(self) -> List[Dict[str, str]]:
+        """Сообщения для chat.completions: сводка (если есть) и последние реплики"""
+        if not self.summary:
+            return list(self.messages)
+        return [self._summary_message()] + self.messages
+
+    def clear(self):
+        """Очистить историю и сводку"""
+        self.messages.clear()
+        self._sizes.clear()
+        self.summary = ""
+        self._summary_tokens = 0
+
+    def _summary_message(self) -> Dict[str, str]:
+        return {"role": "system", "content": f"Краткое содержание предыдущего разговора:\n{self.summary}"}
+
+    def _fold(self):
+        # Сворачиваем с начала, пока сообщения не поместятся в бюджет
+        # вместе со сводкой максимального размера
+        limit = self.budget - self.summary_budget
+        folded = 0
+        total = sum(self._sizes)
+        while folded < len(self.messages) and total > limit:
+            total -= self._sizes[folded]
+            folded += 1
+        # Реплики пользователя и ответа сворачиваются вместе
+        if (
+            folded < len(self.messages)
+            and self.messages[folded]["role"] == "assistant"
+            and folded > 0 and self.messages[folded - 1]["role"] == "user"
+        ):
+            folded += 1
+        if not folded:
+            return
+
+        old = self.messages[:folded]
+        del self.messages[:folded]
+        del self._sizes[:folded]
+        self.summary = self._trim(self.summarizer(self.summary, old))
+        self._summary_tokens = count_message_tokens(self._summary_message(), self.model) if self.summary else 0
+
+    def _trim(self, summary: str) -> str:
+        """Оставить последние строки сводки, помещающиеся в summary_budget"""
+        overhead = count_message_tokens(
+            {"content": "Краткое содержание предыдущего разговора:\n"}, self.model
+        )
+        lines = summary.splitlines()
+        kept: List[str] = []
+        used = overhead
+        for line in reversed(lines):
+            cost = count_tokens(line + "\n", self.model)
+            if used + cost > self.summary_budget:
+                break
+            kept.append(line)
+            used += cost
+        return "\n".join(reversed(kept))
@@ -0,0 +1,337 @@
+"""
+Intents - локальное распознавание команд Tesla без обращения к LLM
+"""
+
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
+
+
+# Команды, которые распознаются локально (совпадают с командами parse_command)
+COMMANDS = ("honk", "lock", "unlock", "start_climate", "stop_climate", "flash_lights", "get_status")
+
+# Уверенность, начиная с которой результат используется без LLM
+DEFAULT_THRESHOLD = 0.8
+
+# Признак -> основы слов. Основа совпадает с началом слова, основа от 4 букв -
+# также после глагольной приставки ("побибикай"), но не внутри чужого слова
+# ("clock", "block" - не lock). Из нескольких совпавших основ побеждает самая
+# длинная ("unlock" сильнее "lock", "разблок" - "блокир").
+_LEXICON: Dict[str, Tuple[str, ...]] = {
+    "lock": ("заблок", "блокир", "запер", "запри", "закр", "lock"),
+    "unlock": ("разблок", "отпер", "отопр", "откр", "unlock", "open"),
+    "honk": ("бибик", "бибип", "посигн", "сигнал", "гудок", "гудн", "клаксон", "honk", "beep", "horn", "toot"),
+    "flash_lights": ("мигн", "помига", "моргн", "поморга", "flash", "blink"),
+    # Фары без глагола "мигнуть": "включи фары" - не flash_lights
+    "lights": ("фар", "headlight", "lights"),
+    "climate": ("климат", "кондиц", "кондей", "печк", "обогрев", "отоплен", "climate", "ac", "hvac", "aircon", "heater", "heating"),
+    "climate_verb": ("прогре", "нагре", "охлад", "preheat", "precondition", "warm", "cool"),
+    "temperature": ("температур", "temperature", "temp"),
+    "on": ("включ", "запуст", "вруби", "start", "on", "enable"),
+    "off": ("выключ", "отключ", "останов", "выруби", "стоп", "off", "stop", "disable"),
+    "status:battery": ("заряд", "батаре", "аккумул", "запас", "battery", "charge", "range"),
+    "status:location": ("где", "местополож", "находит", "where", "location", "locate"),
+    "status:odometer": ("пробег", "odometer", "mileage"),
+    "status:all": ("статус", "состоян", "status", "state", "report"),
+    "question": ("какой", "какая", "какое", "сколько", "what", "how", "is"),
+    "degree": ("градус", "degree", "цельс", "celsius"),
+    "fahrenheit": ("фаренгейт", "fahrenheit"),
+    "object": ("машин", "автомоб", "тачк", "тесл", "двер", "замк", "замок", "car", "tesla", "vehicle", "door"),
+    # Цели, которые эти команды не покрывают: "открой багажник" - не unlock
+    "blocker": (
+        "багаж", "фрунк", "окн", "окош", "люк", "зеркал", "сиден", "руль", "руля", "музык",
+        "радио", "навигац", "маршрут", "порт", "охран", "камер",
+        "trunk", "frunk", "window", "sunroof", "mirror", "seat", "wheel", "music", "radio",
+        "navigat", "route", "port", "sentry", "camera", "valet",
+    ),
+}
+
+# Приставки, после которых основа от 4 букв все еще совпадает
+_PREFIXES = frozenset((
+    "по", "за", "на", "вы", "до", "от", "об", "с", "у", "в", "при", "про", "пере", "под", "раз", "рас",
+))
+
+# Слова без смысла для команды: не снижают уверенность
+_STOPWORDS = frozenset((
+    "пожалуйста", "плиз", "плз", "мне", "на", "в", "во", "и", "а", "ну", "бы", "ли", "давай", "можешь",
+    "можно", "быстро", "сейчас", "у", "с", "до", "салон", "салоне", "все", "всё", "эй", "ка",
+    "мой", "моя", "мою", "моей", "нажми", "дай", "покажи", "скажи", "уровень", "осталось",
+    "please", "pls", "the", "a", "an", "my", "to", "can", "you", "could", "would", "me", "of", "in",
+    "it", "for", "up", "now", "hey", "and", "set", "turn", "cabin", "inside", "sound", "show",
+    "tell", "level", "left",
+))
+
+# Отрицание: "не блокируй" - не lock, решение остается за LLM
+_NEGATIONS = frozenset(("не", "нет", "нельзя", "not", "don't", "dont", "no", "never"))
+
+_WORD = re.compile(r"[a-zа-я']+|\d+(?:[.,]\d+)?|[?°]")
+# Границы команд в запросе "заблокируй машину и включи климат"
+_CLAUSE = re.compile(
+    r"\s*(?:,\s*|;\s*|\s)(?:(?:а|и|and)\s+)?(?:потом|затем|после этого|then)\s+|\s*[;,]\s+|\s+(?:и|and)\s+",
+    re.IGNORECASE
+)
+_NUMBER = re.compile(r"^\d+(?:[.,]\d+)?$")
+# Состояние замков, а не команда: "машина открыта?", "is the car locked?"
+_LOCK_STATE = re.compile(
+    r"^(?:(?:за|раз)блокирован|(?:за|от)крыт|(?:за|от)перт)[аоы]?$|^(?:un)?locked$"
+)
+
+# Вес точного и нечеткого (одна опечатка) совпадения основы
+_EXACT = 1.0
+_FUZZY = 0.7
+_FUZZY_MIN = 6
+# Допустимая температура климата Tesla, °C
+_TEMPERATURE_RANGE = (15.0, 28.0)
+
+_STEMS: List[Tuple[str, str]] = sorted(
+    ((stem, feature) for feature, stems in _LEXICON.items() for stem in set(stems)),
+    key=lambda item: -len(item[0])
+)
+
+
+@dataclass
+class Intent:
+    """Распознанная команда"""
+    command: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    confidence: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь в формате ответа parse_command"""
+        return {
+            "command": self.command,
+            "parameters": dict(self.parameters),
+            "confidence": round(self.confidence, 3),
+        }
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Строки отличаются не больше чем на одну вставку, удаление или замену"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+@lru_cache(maxsize=4096)
+def _match_token(token: str) -> Tuple[Tuple[str, float], ...]:
+    """Признаки слова с весами; результат кешируется по слову"""
+    best = 0
+    features: List[str] = []
+    for stem, feature in _STEMS:
+        if len(stem) < best:
+            break
+        if len(stem) < 4:
+            matched = token.startswith(stem) and len(token) <= len(stem) + 3
+        else:
+            position = token.find(stem)
+            matched = position == 0 or token[:position] in _PREFIXES
+        if matched:
+            best = len(stem)
+            if feature not in features:
+                features.append(feature)
+    if features:
+        return tuple((feature, _EXACT) for feature in features)
+
+    # Опечатка в приставке: "пабибикай". Приставка короче 2 букв не
+    # сравнивается: иначе любая буква перед основой ("clock") сошла бы за "с"
+    for stem, feature in _STEMS:
+        if len(stem) < 4:
+            break
+        position = token.find(stem)
+        if position >= 2 and any(_within_one_edit(token[:position], prefix) for prefix in _PREFIXES):
+            return ((feature, _FUZZY),)
+
+    # Опечатка: сравниваем основы от 6 букв с началом слова (с учетом
+    # приставок вроде "по-", "за-" - со сдвигом до 3 букв). Короткие основы
+    # не сравниваются: "there" отличается от "where" одной буквой.
+    if len(token) < _FUZZY_MIN:
+        return ()
+    for stem, feature in _STEMS:
+        if len(stem) < _FUZZY_MIN:
+            break
+        for start in range(min(4, len(token) - len(stem) + 2)):
+            for size in (len(stem) - 1, len(stem), len(stem) + 1):
+                if _within_one_edit(token[start:start + size], stem):
+                    return ((feature, _FUZZY),)
+    return ()
+
+
+def _tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower().replace("ё", "е"))
+
+
+def _temperature(tokens: List[str], fahrenheit: bool) -> Tuple[Optional[float], bool]:
+    """
+    Температура из чисел запроса
+
+    Returns:
+        (температура в °C или None, было ли число вне допустимого диапазона)
+    """
+    for token in tokens:
+        if not _NUMBER.match(token):
+            continue
+        value = float(token.replace(",", "."))
+        if fahrenheit or value > 50:
+            value = round((value - 32) * 5 / 9, 1)
+        low, high = _TEMPERATURE_RANGE
+        if low <= value <= high:
+            return value, False
+        return None, True
+    return None, False
+
+
+def split_clauses(text: str) -> List[str]:
+    """
+    Разбить запрос на части по союзам и запятым
+
+    "Заблокируй машину и включи климат на 21" -> ["Заблокируй машину",
+    "включи климат на 21"]. Пустые части отбрасываются.
+    """
+    return [part for part in (p.strip() for p in _CLAUSE.split(text)) if part]
+
+
+def classify_all(text: str) -> List[Intent]:
+    """
+    Распознать все команды запроса, по одной на часть (split_clauses)
+
+    Повторяющиеся подряд одинаковые команды объединяются. Если какая-то
+    часть не распознана ("открой, пожалуйста, машину"), запрос
+    распознается целиком как одна команда.
+    """
+    parts = split_clauses(text)
+    if len(parts) < 2:
+        return [classify(text)]
+    intents: List[Intent] = []
+    for part in parts:
+        intent = classify(part)
+        if intent.command == "unknown":
+            return [classify(text)]
+        previous = intents[-1] if intents else None
+        if previous is not None and previous.command == intent.command and (
+            previous.parameters == intent.parameters or intent.command == "get_status"
+        ):
+            # "Какой заряд и где машина?" - одна сводка состояния
+            if previous.parameters != intent.parameters:
+                previous.parameters = {"what": "all"}
+            previous.confidence = min(previous.confidence, intent.confidence)
+            continue
+        intents.append(intent)
+    return intents
+
+
+def classify(text: str) -> Intent:
+    """
+    Распознать команду в запросе на русском или английском
+
+    Слова сопоставляются с основами ключевых слов (с допуском одной
+    опечатки), затем команды получают баллы. Уверенность растет с баллом
+    лучшей команды и падает, если вторая близка к ней, если часть слов
+    запроса не распознана, при отрицании или упоминании неподдерживаемой
+    цели (багажник, окна). Неуверенный результат стоит проверить через LLM.
+
+    Args:
+        text: Запрос пользователя
+
+    Returns:
+        Intent; command == "unknown", если ничего не распознано
+    """
+    tokens = _tokenize(text)
+    weights: Dict[str, float] = defaultdict(float)
+    content = matched = 0
+    negated = False
+    for token in tokens:
+        if token in _NEGATIONS:
+            negated = True
+            continue
+        if token in _STOPWORDS or token == "°" or _NUMBER.match(token):
+            continue
+        content += 1
+        if token == "?":
+            weights["question"] += _EXACT
+            matched += 1
+            continue
+        features = _match_token(token)
+        if features:
+            matched += 1
+        for feature, weight in features:
+            weights[feature] += weight
+
+    scores: Dict[str, float] = defaultdict(float)
+    parameters: Dict[str, Any] = {}
+
+    # Вопрос: "?", "ли" или вопросительное слово
+    asked = bool(weights["question"]) or "ли" in tokens
+    lock_state = any(_LOCK_STATE.match(token) for token in tokens)
+    for command in ("lock", "unlock", "honk", "flash_lights"):
+        if weights[command]:
+            scores[command] = weights[command]
+            if command in ("lock", "unlock") and weights["object"]:
+                scores[command] += 0.3
+    if lock_state and (weights["lock"] or weights["unlock"]):
+        # "Двери закрыты?" - вопрос о состоянии, а не команда
+        scores["get_status"] += scores.pop("lock", 0.0) + scores.pop("unlock", 0.0)
+        parameters["what"] = "security"
+    if weights["lights"]:
+        scores["flash_lights"] += weights["lights"]
+
+    temperature, out_of_range = _temperature(tokens, weights["fahrenheit"] > 0)
+    if temperature is not None and not (weights["degree"] or weights["fahrenheit"] or weights["climate"]
+                                        or weights["climate_verb"] or weights["temperature"]):
+        # Число без упоминания климата или градусов - не температура
+        temperature = None
+    switch = weights["on"] or weights["off"]
+    climate = weights["climate"] + weights["climate_verb"] + 0.6 * weights["temperature"]
+    if climate or temperature is not None:
+        if weights["question"] and not switch and temperature is None:
+            # "Какая температура в салоне?" - вопрос о состоянии
+            scores["get_status"] += climate + 0.4
+            parameters["what"] = "climate"
+        elif weights["off"] and not weights["on"]:
+            scores["stop_climate"] = climate + 0.3
+        else:
+            scores["start_climate"] = climate + 0.3 * bool(switch) + (0.5 if temperature is not None else 0.0)
+
+    aspects = [f for f in ("status:battery", "status:location", "status:odometer", "status:all") if weights[f]]
+    if aspects:
+        scores["get_status"] += 0.8 * sum(weights[f] for f in aspects) + 0.4 * bool(weights["question"])
+        if "what" not in parameters:
+            parameters["what"] = "all" if len(aspects) > 1 else aspects[0].split(":")[1]
+
+    if not scores:
+        return Intent("unknown", {}, 0.0)
+
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    command, best = ranked[0]
+    second = ranked[1][1] if len(ranked) > 1 else 0.0
+    coverage = matched / content if content else 1.0
+
+    confidence = (1 - math.exp(-2.5 * best)) * (1 - second / best) * (0.6 + 0.4 * coverage)
+    if negated:
+        confidence *= 0.3
+    if weights["blocker"]:
+        confidence *= 0.3
+    if out_of_range and command == "start_climate":
+        confidence *= 0.5
+    if command in ("lock", "unlock") and asked:
+        # "Can you lock the car?" - скорее всего просьба, но ошибка здесь
+        # открывает машину: решение остается за LLM
+        confidence *= 0.5
+    if command == "flash_lights" and not weights["flash_lights"] and switch:
+        # Включить или выключить фары - другая, неподдерживаемая команда
+        confidence *= 0.3
+
+    if command == "start_climate":
+        parameters = {"temperature": temperature} if temperature is not None else {}
+    elif command != "get_status":
+        parameters = {}
+    return Intent(command, parameters, min(confidence, 0.99))
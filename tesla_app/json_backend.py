@@ -0,0 +1,108 @@
+"""
+JSON Backend - выбор быстрого декодера JSON для ответов API
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+Decoder = Callable[[Union[bytes, bytearray, memoryview, str]], Any]
+Encoder = Callable[[Any], bytes]
+
+
+class JSONBackend:
+    """Пара функций декодирования и кодирования JSON одной библиотеки"""
+
+    __slots__ = ("name", "loads", "dumps")
+
+    def __init__(self, name: str, loads: Decoder, dumps: Encoder):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self) -> str:
+        return f"JSONBackend({self.name!r})"
+
+
+def _orjson() -> JSONBackend:
+    import orjson
+
+    # orjson разбирает bytes/memoryview напрямую, без промежуточной строки
+    return JSONBackend("orjson", orjson.loads, orjson.dumps)
+
+
+def _msgspec() -> JSONBackend:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+    return JSONBackend("msgspec", decoder.decode, encoder.encode)
+
+
+def _stdlib() -> JSONBackend:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    # json.loads принимает bytes, но внутри все равно декодирует их в str
+    return JSONBackend("json", json.loads, dumps)
+
+
+# Порядок предпочтения при автоматическом выборе
+BACKENDS: Dict[str, Callable[[], JSONBackend]] = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": _stdlib,
+}
+
+_current: Optional[JSONBackend] = None
+
+
+def load_backend(name: Optional[str] = None) -> JSONBackend:
+    """
+    Загрузить бэкенд JSON
+
+    Args:
+        name: "orjson", "msgspec" или "json"; None - первый установленный
+
+    Returns:
+        JSONBackend
+
+    Raises:
+        ValueError: Неизвестное имя бэкенда
+        ImportError: Запрошенная библиотека не установлена
+    """
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend: {name}")
+        return BACKENDS[name]()
+
+    for factory in BACKENDS.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+    raise AssertionError("stdlib json backend is always available")
+
+
+def get_backend() -> JSONBackend:
+    """Бэкенд по умолчанию (выбирается при первом обращении)"""
+    global _current
+    if _current is None:
+        _current = load_backend()
+    return _current
+
+
+def set_backend(name: Optional[str]) -> JSONBackend:
+    """Сменить бэкенд по умолчанию для всего пакета"""
+    global _current
+    _current = load_backend(name)
+    return _current
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Декодировать JSON бэкендом по умолчанию"""
+    return get_backend().loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Закодировать объект в компактный JSON (bytes) бэкендом по умолчанию"""
+    return get_backend().dumps(obj)
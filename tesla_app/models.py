@@ -0,0 +1,209 @@
+"""
+State Models - компактные типизированные модели состояния автомобиля
+"""
+
+from typing import Optional, Dict, Any, Iterator, Tuple, Type, TypeVar
+
+from . import json_backend
+
+M = TypeVar("M", bound="StateModel")
+
+
+class StateModel:
+    """
+    Базовая модель раздела vehicle_data на __slots__
+
+    Хранит только известные поля раздела. Полный исходный словарь остается
+    доступен через [] / get() / to_dict(), если модель создана из VehicleData:
+    он декодируется из сырого ответа по требованию.
+    """
+
+    __slots__ = ("_parent",)
+
+    SECTION = ""
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, parent: Optional["VehicleData"] = None, **fields: Any):
+        self._parent = parent
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls: Type[M], data: Dict[str, Any], parent: Optional["VehicleData"] = None) -> M:
+        """Создать модель из словаря раздела"""
+        model = cls.__new__(cls)
+        model._parent = parent
+        for name in cls.FIELDS:
+            setattr(model, name, data.get(name))
+        return model
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Исходный словарь раздела (или известные поля, если исходника нет)"""
+        if self._parent is not None:
+            return self._parent.section(self.SECTION)
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return self.to_dict()[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Доступ как у словаря: известные поля без декодирования, прочие - из исходника"""
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS or key in self.to_dict()
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.FIELDS)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.FIELDS if getattr(self, n) is not None)
+        return f"{type(self).__name__}({fields})"
+
+
+class ChargeState(StateModel):
+    """Состояние зарядки"""
+
+    SECTION = "charge_state"
+    FIELDS = (
+        "battery_level", "battery_range", "est_battery_range", "charging_state",
+        "charge_limit_soc", "charge_rate", "charger_power", "charger_voltage",
+        "charger_actual_current", "time_to_full_charge", "charge_port_door_open",
+        "timestamp",
+    )
+    __slots__ = FIELDS
+
+
+class DriveState(StateModel):
+    """Местоположение и движение"""
+
+    SECTION = "drive_state"
+    FIELDS = (
+        "latitude", "longitude", "heading", "speed", "power", "shift_state",
+        "gps_as_of", "timestamp",
+    )
+    __slots__ = FIELDS
+
+
+class ClimateState(StateModel):
+    """Состояние климат-контроля"""
+
+    SECTION = "climate_state"
+    FIELDS = (
+        "inside_temp", "outside_temp", "driver_temp_setting", "passenger_temp_setting",
+        "is_climate_on", "is_auto_conditioning_on", "is_preconditioning", "fan_status",
+        "timestamp",
+    )
+    __slots__ = FIELDS
+
+
+class VehicleState(StateModel):
+    """Состояние кузова и систем автомобиля"""
+
+    SECTION = "vehicle_state"
+    FIELDS = (
+        "locked", "odometer", "sentry_mode", "car_version", "is_user_present",
+        "df", "dr", "pf", "pr", "ft", "rt", "timestamp",
+    )
+    __slots__ = FIELDS
+
+
+SECTION_MODELS: Dict[str, Type[StateModel]] = {
+    model.SECTION: model for model in (ChargeState, DriveState, ClimateState, VehicleState)
+}
+
+
+class VehicleData:
+    """
+    Ответ vehicle_data, хранящийся как сырые байты JSON
+
+    Байты ответа в несколько раз компактнее дерева словарей Python.
+    Ответ декодируется только при первом обращении к модели раздела,
+    разделы сохраняются как модели на __slots__; словарь целиком в памяти
+    не удерживается.
+    Доступ как к словарю (data["charge_state"], get, to_dict) сохранен
+    для совместимости и каждый раз декодирует исходный ответ.
+    """
+
+    __slots__ = ("_raw", "_charge_state", "_drive_state", "_climate_state", "_vehicle_state")
+
+    def __init__(self, raw: bytes):
+        """
+        Args:
+            raw: Тело HTTP-ответа vehicle_data вида {"response": {...}}
+        """
+        self._raw = raw
+        self._charge_state: Optional[ChargeState] = None
+        self._drive_state: Optional[DriveState] = None
+        self._climate_state: Optional[ClimateState] = None
+        self._vehicle_state: Optional[VehicleState] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VehicleData":
+        """Создать из уже декодированного словаря vehicle_data"""
+        return cls(json_backend.dumps({"response": data}))
+
+    @property
+    def raw(self) -> bytes:
+        """Сырое тело ответа"""
+        return self._raw
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Декодировать ответ целиком"""
+        return json_backend.loads(self._raw).get("response") or {}
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """Исходный словарь раздела (пустой, если раздела нет в ответе)"""
+        return self.to_dict().get(name) or {}
+
+    def _model(self, slot: str, model: Type[StateModel]) -> Any:
+        value = getattr(self, slot)
+        if value is None:
+            # Декодирование ответа дороже сборки моделей, поэтому за один
+            # проход разбираем все типизированные разделы
+            data = self.to_dict()
+            for name, cls in SECTION_MODELS.items():
+                if getattr(self, "_" + name) is None:
+                    setattr(self, "_" + name, cls.from_dict(data.get(name) or {}, parent=self))
+            value = getattr(self, slot)
+        return value
+
+    @property
+    def charge_state(self) -> ChargeState:
+        return self._model("_charge_state", ChargeState)
+
+    @property
+    def drive_state(self) -> DriveState:
+        return self._model("_drive_state", DriveState)
+
+    @property
+    def climate_state(self) -> ClimateState:
+        return self._model("_climate_state", ClimateState)
+
+    @property
+    def vehicle_state(self) -> VehicleState:
+        return self._model("_vehicle_state", VehicleState)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.to_dict()[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Доступ как у словаря к полям ответа"""
+        return self.to_dict().get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.to_dict()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"VehicleData({len(self._raw)} bytes)"
@@ -0,0 +1,178 @@
+"""
+Parse Cache - сохраняемый кеш разобранных команд на естественном языке
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from .cache import CacheStats
+
+
+# Версия формата файла кеша; файл другой версии игнорируется
+FORMAT_VERSION = 3
+
+# Слова вежливости и связки, не меняющие смысла команды: "ну побибикай
+# пожалуйста" и "побибикай" - один ключ, где бы ни стояли эти слова
+FILLERS = frozenset((
+    "пожалуйста", "плиз", "плз", "ну", "давай", "ка", "эй", "же", "уже", "быстренько", "быстро",
+    "можешь", "можно", "будь", "добр", "так", "слушай",
+    "please", "pls", "plz", "hey", "ok", "okay", "just", "quickly", "now", "kindly",
+    "can", "could", "would", "you",
+))
+
+_WORD = re.compile(r"[\w°]+(?:[.,]\d+)?|\?+")
+
+
+def normalize(text: str) -> str:
+    """
+    Ключ кеша для запроса
+
+    Регистр, "ё", пунктуация, лишние пробелы и слова-связки не влияют на
+    ключ; порядок значимых слов и числа сохраняются. Вопросительный знак
+    остается в ключе: "машина открыта?" - вопрос о состоянии, а не команда.
+    """
+    words = _WORD.findall(text.lower().replace("ё", "е"))
+    return " ".join("?" if w[0] == "?" else w.replace(",", ".") for w in words if w not in FILLERS)
+
+
+def default_path() -> str:
+    """Файл кеша в $XDG_CACHE_HOME/tesla_app (или ~/.cache/tesla_app)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "tesla_app", "parse_cache.json")
+
+
+class ParseCache:
+    """
+    LRU-кеш результатов parse_commands с TTL, сохраняемый между запусками
+
+    Ключ - нормализованный текст запроса и модель; состояние автомобиля
+    в ключ не входит: разбор команды от него не зависит, а значит
+    попадание остается верным, даже если машина с тех пор уехала или
+    зарядилась. Записи с истекшим TTL и сверх max_entries вытесняются.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 2048,
+        ttl: float = 7 * 24 * 3600.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Инициализация кеша
+
+        Args:
+            path: JSON-файл кеша (None - только в памяти); загружается сразу
+            max_entries: Максимальное число записей
+            ttl: Время жизни записи в секундах
+            clock: Источник времени (для тестов; время сохраняется в файл)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Ключ -> (время записи, результат разбора); конец - самые свежие
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats = CacheStats()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(text: str, model: str = "") -> str:
+        """Ключ записи: модель и нормализованный текст"""
+        return f"{model}\x00{normalize(text)}"
+
+    def get(self, text: str, model: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Результат разбора запроса из кеша
+
+        Returns:
+            Копия сохраненного словаря или None при промахе
+        """
+        key = self.key(text, model)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return json.loads(json.dumps(entry[1]))
+            if entry is not None:
+                del self._entries[key]
+                self._stats.evictions += 1
+            self._stats.misses += 1
+            return None
+
+    def set(self, text: str, parsed: Dict[str, Any], model: str = ""):
+        """Сохранить результат разбора и записать кеш на диск"""
+        key = self.key(text, model)
+        with self._lock:
+            self._entries[key] = (self._clock(), parsed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+        self.save()
+
+    def clear(self):
+        """Удалить все записи"""
+        with self._lock:
+            self._entries.clear()
+        self.save()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Снимок счетчиков кеша"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._entries),
+            )
+
+    def save(self):
+        """Атомарно записать кеш в файл"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "version": FORMAT_VERSION,
+                "entries": [[key, stamp, parsed] for key, (stamp, parsed) in self._entries.items()],
+            }
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".parse-cache-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+            return
+        now = self._clock()
+        for key, stamp, parsed in data.get("entries", [])[-self.max_entries:]:
+            if now - stamp <= self.ttl:
+                self._entries[key] = (stamp, parsed)
@@ -0,0 +1,294 @@
+"""
+Poll Scheduler - адаптивный опрос парка автомобилей по их состоянию
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, List, Sequence, Tuple, TYPE_CHECKING
+
+from .ratelimit import Priority, TokenBucket, priority_scope
+
+if TYPE_CHECKING:
+    from .tesla_client import TeslaAPIClient
+
+
+# Интервал опроса в секундах по активности автомобиля
+DEFAULT_INTERVALS: Dict[str, float] = {
+    "driving": 5.0,
+    "charging": 15.0,
+    "parked": 120.0,
+    # Долго стоящий автомобиль опрашивается редко, чтобы он мог уснуть
+    "idle": 900.0,
+}
+
+# Разделы, читаемые одним запросом vehicle_data при каждом опросе
+POLL_ENDPOINTS = ("charge_state", "drive_state", "location_data")
+
+# Состояния из списка автомобилей, при которых опрос не выполняется (он разбудил бы машину)
+NOT_POLLED = ("asleep", "offline")
+
+
+def classify(data: Dict[str, Any]) -> str:
+    """
+    Активность автомобиля по ответу vehicle_data
+
+    Returns:
+        "driving", "charging" или "parked"
+    """
+    drive = data.get("drive_state") or {}
+    if drive.get("shift_state") in ("D", "R", "N") or (drive.get("speed") or 0) > 0:
+        return "driving"
+    charge = data.get("charge_state") or {}
+    if charge.get("charging_state") in ("Charging", "Starting"):
+        return "charging"
+    return "parked"
+
+
+@dataclass
+class PollStats:
+    """Счетчики планировщика опроса"""
+    polls: int = 0
+    errors: int = 0
+    list_refreshes: int = 0
+    fell_asleep: int = 0
+    scheduled: int = 0
+
+
+class _VehicleState:
+    """Что планировщик знает об автомобиле"""
+
+    __slots__ = ("state", "activity", "parked_since", "due", "polling")
+
+    def __init__(self, state: str):
+        self.state = state
+        self.activity: Optional[str] = None
+        self.parked_since: Optional[float] = None
+        self.due: Optional[float] = None
+        self.polling = False
+
+
+class PollScheduler:
+    """
+    Планировщик опроса: куча автомобилей по времени следующего опроса
+
+    Интервал до следующего опроса зависит от последнего известного
+    состояния: едущие и заряжающиеся автомобили опрашиваются каждые
+    несколько секунд, стоящие - реже. Спящие автомобили не опрашиваются
+    вовсе: их состояние проверяется дешевым списком get_vehicles, и опрос
+    возобновляется, когда автомобиль появляется в нем как online.
+    Все запросы (включая список) проходят через общий лимит запросов в секунду.
+    """
+
+    def __init__(
+        self,
+        client: "TeslaAPIClient",
+        intervals: Optional[Dict[str, float]] = None,
+        max_rps: float = 10.0,
+        list_interval: float = 60.0,
+        idle_after: float = 900.0,
+        endpoints: Sequence[str] = POLL_ENDPOINTS,
+        max_workers: int = 8,
+        on_poll: Optional[Callable[[str, Dict[str, Any], str], None]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Инициализация планировщика
+
+        Args:
+            client: Tesla API клиент без auto_wake (опрос не должен будить автомобили)
+                и без кеша ответов (список и опросы должны приходить из API)
+            intervals: Интервалы по активности, дополняют DEFAULT_INTERVALS
+            max_rps: Общий лимит запросов в секунду
+            list_interval: Период обновления списка автомобилей
+            idle_after: Через сколько секунд стоянки автомобиль считается idle
+            endpoints: Разделы vehicle_data, читаемые при опросе
+            max_workers: Одновременных опросов (0 - опрос в потоке планировщика)
+            on_poll: Вызывается как on_poll(vehicle_id, data, activity) после опроса
+            clock: Источник времени (для тестов)
+        """
+        if client.wake_manager is not None:
+            raise ValueError("PollScheduler requires a client without auto_wake")
+        if client.cache is not None:
+            # Список в кеше живет дольше list_interval: смена состояния была бы не видна
+            raise ValueError("PollScheduler requires a client without a response cache")
+        self.client = client
+        self.intervals = dict(DEFAULT_INTERVALS)
+        self.intervals.update(intervals or {})
+        self.list_interval = list_interval
+        self.idle_after = idle_after
+        self.endpoints = tuple(endpoints)
+        self.on_poll = on_poll
+        self._clock = clock
+        self._bucket = TokenBucket(max_rps, max(1.0, max_rps))
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tesla-poll")
+            if max_workers > 0 else None
+        )
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._vehicles: Dict[str, _VehicleState] = {}
+        self._next_list = clock()
+        self._stopped = False
+        self.stats = PollStats()
+
+    def activity(self, vehicle_id: str) -> Optional[str]:
+        """Последняя известная активность автомобиля (или состояние из списка)"""
+        with self._lock:
+            vehicle = self._vehicles.get(vehicle_id)
+            if vehicle is None:
+                return None
+            return vehicle.activity if vehicle.state == "online" else vehicle.state
+
+    def scheduled(self) -> int:
+        """Число автомобилей, ожидающих опроса"""
+        with self._lock:
+            return sum(1 for v in self._vehicles.values() if v.due is not None)
+
+    def refresh_list(self):
+        """Обновить список автомобилей и их состояния через get_vehicles"""
+        vehicles = self.client.get_vehicles()
+        now = self._clock()
+        with self._lock:
+            self.stats.list_refreshes += 1
+            seen = set()
+            for vehicle in vehicles:
+                vehicle_id = vehicle.id_s
+                seen.add(vehicle_id)
+                known = self._vehicles.get(vehicle_id)
+                if known is None:
+                    known = self._vehicles[vehicle_id] = _VehicleState(vehicle.state)
+                if vehicle.state in NOT_POLLED:
+                    known.state = vehicle.state
+                    known.activity = None
+                    known.due = None
+                elif known.state != "online" or (known.due is None and not known.polling):
+                    # Проснулся или появился в списке: опрашиваем сразу
+                    known.state = "online"
+                    known.parked_since = None
+                    self._schedule(vehicle_id, known, now)
+            for vehicle_id in list(self._vehicles):
+                if vehicle_id not in seen:
+                    del self._vehicles[vehicle_id]
+            self._wakeup.notify_all()
+
+    def tick(self) -> float:
+        """
+        Запустить все опросы, срок которых наступил и на которые есть бюджет
+
+        Returns:
+            Через сколько секунд есть смысл вызвать tick() снова
+        """
+        now = self._clock()
+        if now >= self._next_list and self._take_token(now):
+            self._next_list = now + self.list_interval
+            try:
+                self.refresh_list()
+            except Exception:
+                with self._lock:
+                    self.stats.errors += 1
+
+        while True:
+            now = self._clock()
+            with self._lock:
+                due = self._pop_due(now)
+                if due is None:
+                    wait = self._heap[0][0] - now if self._heap else self.list_interval
+                    return max(0.0, min(wait, self._next_list - now))
+                if not self._take_token(now):
+                    # Возвращаем автомобиль в кучу с тем же сроком
+                    vehicle = self._vehicles[due]
+                    heapq.heappush(self._heap, (vehicle.due, next(self._seq), due))
+                    return self._bucket.delay(now)
+                vehicle = self._vehicles[due]
+                vehicle.due = None
+                vehicle.polling = True
+            if self._executor is not None:
+                self._executor.submit(self._poll, due)
+            else:
+                self._poll(due)
+
+    def run(self, stop: Optional[threading.Event] = None):
+        """Опрашивать парк, пока не установлен stop или не вызван shutdown()"""
+        stop = stop or threading.Event()
+        while not stop.is_set() and not self._stopped:
+            wait = self.tick()
+            with self._wakeup:
+                if wait > 0 and not self._stopped:
+                    self._wakeup.wait(min(wait, 1.0))
+
+    def shutdown(self, wait: bool = True):
+        """Остановить run() и дождаться текущих опросов"""
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def _take_token(self, now: float) -> bool:
+        if self._bucket.delay(now) > 0:
+            return False
+        self._bucket.tokens -= 1
+        return True
+
+    def _schedule(self, vehicle_id: str, vehicle: _VehicleState, due: float):
+        vehicle.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), vehicle_id))
+        self.stats.scheduled += 1
+
+    def _pop_due(self, now: float) -> Optional[str]:
+        # Устаревшие записи кучи (перенесенные или спящие автомобили) пропускаем
+        while self._heap and self._heap[0][0] <= now:
+            due, _, vehicle_id = heapq.heappop(self._heap)
+            vehicle = self._vehicles.get(vehicle_id)
+            if vehicle is not None and vehicle.due == due and vehicle.state == "online":
+                return vehicle_id
+        return None
+
+    def _poll(self, vehicle_id: str):
+        data: Optional[Dict[str, Any]] = None
+        asleep = False
+        try:
+            with priority_scope(Priority.BULK):
+                data = self.client.get_vehicle_state(vehicle_id, endpoints=self.endpoints)
+        except Exception as e:
+            # 408 - автомобиль уснул с момента последнего списка
+            asleep = getattr(getattr(e, "response", None), "status_code", None) == 408
+
+        now = self._clock()
+        with self._lock:
+            vehicle = self._vehicles.get(vehicle_id)
+            if vehicle is None:
+                return
+            vehicle.polling = False
+            if asleep:
+                self.stats.fell_asleep += 1
+                vehicle.state = "asleep"
+                vehicle.activity = None
+                return
+            if data is None:
+                self.stats.errors += 1
+                self._schedule(vehicle_id, vehicle, now + self.intervals["parked"])
+                self._wakeup.notify_all()
+                return
+            self.stats.polls += 1
+            activity = classify(data)
+            if activity == "parked":
+                if vehicle.parked_since is None:
+                    vehicle.parked_since = now
+                if now - vehicle.parked_since >= self.idle_after:
+                    activity = "idle"
+            else:
+                vehicle.parked_since = None
+            vehicle.activity = activity
+            if vehicle.state == "online":
+                self._schedule(vehicle_id, vehicle, now + self.intervals[activity])
+            self._wakeup.notify_all()
+
+        if self.on_poll is not None:
+            self.on_poll(vehicle_id, data, activity)
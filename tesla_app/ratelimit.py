@@ -0,0 +1,233 @@
+"""
+Rate Limiter - клиентское ограничение частоты запросов к Tesla API
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Optional, Dict, Callable, Iterator, List
+
+
+class Priority(IntEnum):
+    """Приоритет запроса: меньшее значение обслуживается раньше"""
+    HIGH = 0      # команды безопасности (lock/unlock)
+    NORMAL = 1    # интерактивные чтения и команды
+    BULK = 2      # массовый опрос телеметрии
+
+
+_current_priority: ContextVar[Priority] = ContextVar("tesla_request_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    """Выполнять запросы текущего потока/задачи с заданным приоритетом"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """Приоритет запросов в текущем контексте"""
+    return _current_priority.get()
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Разобрать заголовок Retry-After
+
+    Args:
+        value: Значение заголовка (секунды или HTTP-дата)
+        now: Текущее время UNIX (для тестов)
+
+    Returns:
+        Задержка в секундах или None, если заголовок отсутствует или некорректен
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+class TokenBucket:
+    """
+    Token bucket с адаптивной скоростью (AIMD)
+
+    После 429 скорость уменьшается вдвое и ведро блокируется на Retry-After,
+    каждый успешный ответ возвращает скорость к максимальной по чуть-чуть.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: Optional[float] = None,
+        increase: Optional[float] = None,
+        decrease: float = 0.5
+    ):
+        """
+        Инициализация ведра
+
+        Args:
+            rate: Максимальная скорость в запросах в секунду
+            capacity: Размер всплеска (емкость ведра)
+            min_rate: Нижняя граница скорости после 429 (по умолчанию rate / 10)
+            increase: Прирост скорости за успешный ответ (по умолчанию rate / 100)
+            decrease: Множитель скорости при 429
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be > 0 and capacity >= 1")
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.increase = increase if increase is not None else rate / 100
+        self.decrease = decrease
+        self.tokens = capacity
+        self.updated: Optional[float] = None
+        self.blocked_until = 0.0
+        self.waiters: List[tuple] = []
+
+    def refill(self, now: float):
+        if self.updated is None or now > self.updated:
+            if self.updated is not None:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд будет доступен токен (0 - доступен сейчас)"""
+        self.refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def throttled(self, now: float, retry_after: Optional[float]):
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.blocked_until = max(
+            self.blocked_until,
+            now + (retry_after if retry_after is not None else 1.0 / self.rate)
+        )
+        # После окна Retry-After пропускаем один пробный запрос, дальше - по новой скорости
+        self.tokens = 1.0
+        self.updated = self.blocked_until
+
+    def succeeded(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+class RateLimiter:
+    """
+    Ограничитель запросов с раздельными бюджетами чтений и команд
+
+    Ожидающие запросы одного бюджета обслуживаются по приоритету, а при
+    равном приоритете - в порядке поступления, поэтому lock/unlock проходят
+    раньше массового опроса телеметрии.
+    """
+
+    def __init__(
+        self,
+        read_rate: float = 10.0,
+        command_rate: float = 2.0,
+        read_burst: float = 20.0,
+        command_burst: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Инициализация ограничителя
+
+        Args:
+            read_rate: Чтений в секунду
+            command_rate: Команд в секунду
+            read_burst: Допустимый всплеск чтений
+            command_burst: Допустимый всплеск команд
+            clock: Источник времени (для тестов)
+        """
+        self.buckets: Dict[str, TokenBucket] = {
+            "read": TokenBucket(read_rate, read_burst),
+            "command": TokenBucket(command_rate, command_burst),
+        }
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self.throttled_count = 0
+
+    def acquire(self, kind: str = "read", priority: Optional[Priority] = None, timeout: Optional[float] = None) -> float:
+        """
+        Дождаться разрешения на запрос
+
+        Args:
+            kind: Бюджет: "read" или "command"
+            priority: Приоритет (по умолчанию из priority_scope)
+            timeout: Максимальное ожидание в секундах
+
+        Returns:
+            Время ожидания в секундах
+
+        Raises:
+            TimeoutError: Разрешение не получено за timeout
+        """
+        bucket = self.buckets[kind]
+        if priority is None:
+            priority = current_priority()
+        started = self._clock()
+        ticket = (int(priority), next(self._seq))
+
+        with self._cond:
+            heapq.heappush(bucket.waiters, ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    wait = None
+                    if bucket.waiters[0] == ticket:
+                        wait = bucket.delay(now)
+                        if wait == 0.0:
+                            bucket.tokens -= 1
+                            return now - started
+                    if timeout is not None:
+                        left = started + timeout - now
+                        if left <= 0:
+                            raise TimeoutError(f"Rate limiter: no {kind} budget within {timeout}s")
+                        wait = left if wait is None else min(wait, left)
+                    self._cond.wait(wait)
+            finally:
+                bucket.waiters.remove(ticket)
+                heapq.heapify(bucket.waiters)
+                self._cond.notify_all()
+
+    def on_response(self, kind: str, status_code: int, retry_after: Optional[float] = None):
+        """
+        Учесть ответ API: 429 замедляет бюджет, успешный ответ ускоряет
+
+        Args:
+            kind: Бюджет запроса
+            status_code: HTTP-код ответа
+            retry_after: Значение Retry-After в секундах
+        """
+        bucket = self.buckets[kind]
+        with self._cond:
+            if status_code == 429:
+                self.throttled_count += 1
+                bucket.throttled(self._clock(), retry_after)
+            elif status_code < 400:
+                bucket.succeeded()
+            self._cond.notify_all()
+
+    def current_rate(self, kind: str = "read") -> float:
+        """Текущая (адаптированная) скорость бюджета в запросах в секунду"""
+        with self._cond:
+            return self.buckets[kind].rate
@@ -0,0 +1,206 @@
+"""
+Vehicle Registry - сохраняемый на диске индекс автомобилей аккаунта
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional, Dict, Callable, Iterator, List, Union, TYPE_CHECKING
+
+from .tesla_client import TeslaVehicle, _parse_vehicle
+
+if TYPE_CHECKING:
+    from .tesla_client import TeslaAPIClient
+
+
+# Версия формата файла реестра; файл другой версии игнорируется
+FORMAT_VERSION = 1
+
+# Поля TeslaVehicle, сохраняемые на диск (tokens - короткоживущие токены стриминга)
+_STORED_FIELDS = ("id", "vin", "display_name", "color", "state", "in_service", "id_s", "vehicle_id")
+
+
+def default_path(access_token: str) -> str:
+    """
+    Путь файла реестра для аккаунта
+
+    Файл лежит в $XDG_CACHE_HOME/tesla_app (или ~/.cache/tesla_app);
+    в имени - хеш токена, сам токен не сохраняется.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    digest = hashlib.sha256(access_token.encode()).hexdigest()[:16]
+    return os.path.join(base, "tesla_app", f"vehicles-{digest}.json")
+
+
+class _Snapshot:
+    """Неизменяемый набор автомобилей с индексами"""
+
+    __slots__ = ("vehicles", "by_id", "by_id_s", "by_vin", "by_name")
+
+    def __init__(self, vehicles: List[TeslaVehicle]):
+        self.vehicles = vehicles
+        self.by_id: Dict[int, TeslaVehicle] = {v.id: v for v in vehicles if v.id is not None}
+        self.by_id_s: Dict[str, TeslaVehicle] = {v.id_s: v for v in vehicles if v.id_s}
+        self.by_vin: Dict[str, TeslaVehicle] = {v.vin.upper(): v for v in vehicles if v.vin}
+        self.by_name: Dict[str, TeslaVehicle] = {}
+        for v in reversed(vehicles):
+            # При одинаковых именах побеждает первый автомобиль списка
+            if v.display_name:
+                self.by_name[v.display_name.casefold()] = v
+
+
+class VehicleRegistry:
+    """
+    Реестр автомобилей с индексами по id, id_s, VIN и имени
+
+    Список хранится в JSON-файле, поэтому CLI может стартовать с
+    сохраненных данных, не дожидаясь get_vehicles. Обновление заменяет
+    набор атомарно и безопасно из фонового потока.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_age: float = 300.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Инициализация реестра
+
+        Args:
+            path: Файл реестра (None - только в памяти)
+            max_age: Через сколько секунд после обновления данные считаются устаревшими
+            clock: Источник времени (для тестов)
+        """
+        self.path = path
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot([])
+        self.updated_at: Optional[float] = None
+        # Данные получены из API в этом процессе, а не только загружены с диска
+        self.refreshed = False
+
+    def __len__(self) -> int:
+        return len(self._snapshot.vehicles)
+
+    def __iter__(self) -> Iterator[TeslaVehicle]:
+        return iter(self._snapshot.vehicles)
+
+    @property
+    def vehicles(self) -> List[TeslaVehicle]:
+        """Автомобили в порядке ответа API"""
+        return list(self._snapshot.vehicles)
+
+    @property
+    def is_stale(self) -> bool:
+        """Данные загружены с диска и еще не подтверждены API или старше max_age"""
+        if self.updated_at is None or not self.refreshed:
+            return True
+        return self._clock() - self.updated_at > self.max_age
+
+    def load(self) -> bool:
+        """
+        Загрузить реестр из файла
+
+        Returns:
+            True если файл найден и прочитан
+        """
+        if not self.path:
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+            return False
+
+        vehicles = [_parse_vehicle(v) for v in data.get("vehicles", [])]
+        with self._lock:
+            # Не затираем более свежие данные, если обновление уже прошло
+            if self.refreshed:
+                return True
+            self._snapshot = _Snapshot(vehicles)
+            self.updated_at = data.get("updated_at")
+        return True
+
+    def update(self, vehicles: List[TeslaVehicle]):
+        """Заменить набор автомобилей и сохранить реестр"""
+        with self._lock:
+            self._snapshot = _Snapshot(list(vehicles))
+            self.updated_at = self._clock()
+            self.refreshed = True
+        self.save()
+
+    def refresh(self, client: "TeslaAPIClient") -> List[TeslaVehicle]:
+        """Обновить реестр через get_vehicles"""
+        vehicles = client.get_vehicles()
+        self.update(vehicles)
+        return vehicles
+
+    def save(self):
+        """Атомарно записать реестр в файл"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "version": FORMAT_VERSION,
+                "updated_at": self.updated_at,
+                "vehicles": [
+                    {name: getattr(v, name) for name in _STORED_FIELDS}
+                    for v in self._snapshot.vehicles
+                ],
+            }
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".vehicles-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def by_id(self, vehicle_id: int) -> Optional[TeslaVehicle]:
+        """Автомобиль по числовому id"""
+        return self._snapshot.by_id.get(vehicle_id)
+
+    def by_id_s(self, id_s: str) -> Optional[TeslaVehicle]:
+        """Автомобиль по строковому id_s (используется в запросах API)"""
+        return self._snapshot.by_id_s.get(id_s)
+
+    def by_vin(self, vin: str) -> Optional[TeslaVehicle]:
+        """Автомобиль по VIN (без учета регистра)"""
+        return self._snapshot.by_vin.get(vin.upper())
+
+    def by_name(self, name: str) -> Optional[TeslaVehicle]:
+        """Автомобиль по отображаемому имени (без учета регистра)"""
+        return self._snapshot.by_name.get(name.casefold())
+
+    def find(self, key: Union[str, int]) -> Optional[TeslaVehicle]:
+        """
+        Найти автомобиль по id_s, VIN, имени или id
+
+        Args:
+            key: Любой из идентификаторов автомобиля
+
+        Returns:
+            TeslaVehicle или None
+        """
+        snapshot = self._snapshot
+        if isinstance(key, int):
+            return snapshot.by_id.get(key)
+        key = key.strip()
+        vehicle = (
+            snapshot.by_id_s.get(key)
+            or snapshot.by_vin.get(key.upper())
+            or snapshot.by_name.get(key.casefold())
+        )
+        if vehicle is None and key.isdigit():
+            vehicle = snapshot.by_id.get(int(key))
+        return vehicle
@@ -0,0 +1,72 @@
+"""
+Single-flight - объединение одинаковых одновременных запросов
+"""
+
+import threading
+from typing import Optional, Dict, Any, Callable, Hashable
+
+
+class _Call:
+    """Выполняющийся вызов, результат которого ждут остальные"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Выполняет не более одного вызова на ключ одновременно
+
+    Потоки, пришедшие с тем же ключом, пока вызов выполняется, не делают
+    своего запроса, а ждут и получают тот же результат или ту же ошибку.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Выполнить fn или присоединиться к уже выполняющемуся вызову
+
+        Args:
+            key: Ключ идентичности запроса
+            fn: Функция, выполняющая запрос
+
+        Returns:
+            Результат fn (общий для всех ожидавших потоков)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Число выполняющихся сейчас вызовов"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,428 @@
+"""
+Streaming - прием телеметрии, которую автомобили отправляют по websocket
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Iterable, List, Tuple, Union
+
+import aiohttp
+from aiohttp import web
+
+from .json_backend import JSONBackend, get_backend, load_backend
+from .models import SECTION_MODELS, StateModel, VehicleData
+
+
+# Поля Fleet Telemetry и соответствующие им поля разделов vehicle_data
+FIELD_MAP: Dict[str, Tuple[str, str]] = {
+    "BatteryLevel": ("charge_state", "battery_level"),
+    "Soc": ("charge_state", "battery_level"),
+    "RatedRange": ("charge_state", "battery_range"),
+    "EstBatteryRange": ("charge_state", "est_battery_range"),
+    "ChargeLimitSoc": ("charge_state", "charge_limit_soc"),
+    "ChargeState": ("charge_state", "charging_state"),
+    "ACChargingPower": ("charge_state", "charger_power"),
+    "TimeToFullCharge": ("charge_state", "time_to_full_charge"),
+    "VehicleSpeed": ("drive_state", "speed"),
+    "Gear": ("drive_state", "shift_state"),
+    "GpsHeading": ("drive_state", "heading"),
+    "InsideTemp": ("climate_state", "inside_temp"),
+    "OutsideTemp": ("climate_state", "outside_temp"),
+    "Odometer": ("vehicle_state", "odometer"),
+    "Locked": ("vehicle_state", "locked"),
+    "SentryMode": ("vehicle_state", "sentry_mode"),
+    "Version": ("vehicle_state", "car_version"),
+}
+
+# Типизированные обертки значений в JSON-представлении Fleet Telemetry
+_VALUE_KEYS = (
+    "stringValue", "intValue", "longValue", "floatValue", "doubleValue",
+    "booleanValue", "locationValue",
+)
+
+
+def _unwrap(value: Any) -> Any:
+    if isinstance(value, dict):
+        for key in _VALUE_KEYS:
+            if key in value:
+                return value[key]
+        if value.get("invalid"):
+            return None
+    return value
+
+
+def _parse_time(value: Any) -> float:
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        # Миллисекунды, если значение явно больше секунд UNIX
+        return value / 1000.0 if value > 1e11 else float(value)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+class TelemetryRecord:
+    """
+    Одна запись телеметрии автомобиля
+
+    Поддерживаются записи Fleet Telemetry в JSON
+    ({"vin", "createdAt", "data": [{"key", "value": {"doubleValue": ...}}]})
+    и упрощенная форма с "data" в виде словаря поле -> значение.
+    """
+
+    __slots__ = ("vin", "created_at", "values")
+
+    def __init__(self, vin: str, created_at: float, values: Dict[str, Any]):
+        self.vin = vin
+        self.created_at = created_at
+        self.values = values
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TelemetryRecord":
+        """Разобрать декодированную запись"""
+        items = data.get("data") or {}
+        if isinstance(items, list):
+            values = {item["key"]: _unwrap(item.get("value")) for item in items}
+        else:
+            values = {key: _unwrap(value) for key, value in items.items()}
+        return cls(
+            vin=data["vin"],
+            created_at=_parse_time(data.get("createdAt", data.get("created_at"))),
+            values=values
+        )
+
+    def sections(self) -> Dict[str, Dict[str, Any]]:
+        """Значения записи, разложенные по разделам vehicle_data"""
+        result: Dict[str, Dict[str, Any]] = {}
+        for key, value in self.values.items():
+            if key == "Location" and isinstance(value, dict):
+                drive = result.setdefault("drive_state", {})
+                drive["latitude"] = value.get("latitude")
+                drive["longitude"] = value.get("longitude")
+            elif key in FIELD_MAP:
+                section, field = FIELD_MAP[key]
+                result.setdefault(section, {})[field] = value
+        stamp = int(self.created_at * 1000)
+        for section in result.values():
+            section["timestamp"] = stamp
+        return result
+
+    def models(self) -> Dict[str, StateModel]:
+        """Модели разделов (только поля, пришедшие в записи; прочие - None)"""
+        return {
+            name: SECTION_MODELS[name].from_dict(section)
+            for name, section in self.sections().items()
+            if name in SECTION_MODELS
+        }
+
+    def __repr__(self) -> str:
+        return f"TelemetryRecord(vin={self.vin!r}, created_at={self.created_at}, fields={len(self.values)})"
+
+
+@dataclass
+class StreamStats:
+    """Счетчики приемника телеметрии"""
+    connections: int = 0
+    frames: int = 0
+    dropped_frames: int = 0
+    batches: int = 0
+    records: int = 0
+    dropped: int = 0
+    errors: int = 0
+
+
+RecordCallback = Callable[[TelemetryRecord], None]
+
+
+class TelemetryReceiver:
+    """
+    Websocket-сервер, принимающий телеметрию от автомобилей
+
+    Кадры складываются в очередь и декодируются пачками: все накопившиеся
+    кадры склеиваются в один JSON-массив и разбираются одним вызовом
+    декодера. Кадр может содержать одну запись или массив записей.
+
+    Записи доступны как асинхронный итератор (async for record in receiver)
+    и через обратные вызовы on_record(). Приемник также собирает последнее
+    состояние каждого автомобиля (state(vin) - VehicleData, как у REST).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: str = "/telemetry",
+        batch_size: int = 256,
+        max_queue: int = 10000,
+        max_frames: int = 10000,
+        json_backend: Optional[str] = None
+    ):
+        """
+        Инициализация приемника
+
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 - выбрать свободный)
+            path: Путь websocket-эндпоинта
+            batch_size: Максимум кадров в одной пачке декодирования
+            max_queue: Размер очереди записей для async for; при переполнении
+                отбрасываются самые старые записи
+            max_frames: Размер очереди кадров перед декодированием; при
+                переполнении отбрасываются самые старые кадры
+            json_backend: Декодер JSON (по умолчанию - самый быстрый из установленных)
+        """
+        if batch_size < 1 or max_queue < 1 or max_frames < 1:
+            raise ValueError("batch_size, max_queue and max_frames must be >= 1")
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.max_frames = max_frames
+        self._json: Optional[JSONBackend] = load_backend(json_backend) if json_backend else None
+        # Очереди создаются в start(), внутри event loop приемника
+        self._frames: Optional[asyncio.Queue] = None
+        self._records: Optional[asyncio.Queue] = None
+        self._callbacks: List[RecordCallback] = []
+        self._states: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._sockets: set = set()
+        self._runner: Optional[web.AppRunner] = None
+        self._decoder: Optional[asyncio.Task] = None
+        self.stats = StreamStats()
+
+    async def __aenter__(self) -> "TelemetryReceiver":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    @property
+    def url(self) -> str:
+        """Адрес websocket-эндпоинта"""
+        return f"ws://{self.host}:{self.port}{self.path}"
+
+    async def start(self):
+        """Запустить сервер и задачу декодирования"""
+        self._frames = asyncio.Queue(self.max_frames)
+        self._records = asyncio.Queue(self.max_queue)
+        app = web.Application()
+        app.router.add_get(self.path, self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._decoder = asyncio.get_running_loop().create_task(self._decode_loop())
+
+    async def stop(self, timeout: float = 5.0):
+        """
+        Закрыть соединения, декодировать принятые кадры и остановить сервер
+
+        Args:
+            timeout: Сколько секунд ждать декодирования принятых кадров;
+                если задача декодирования завершилась с ошибкой, не ждем
+        """
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._decoder is not None:
+            drained = asyncio.ensure_future(self._frames.join())
+            await asyncio.wait({drained, self._decoder}, timeout=timeout,
+                               return_when=asyncio.FIRST_COMPLETED)
+            drained.cancel()
+            self._decoder.cancel()
+            try:
+                await self._decoder
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                self.stats.errors += 1
+            self._decoder = None
+            # Завершаем async for после уже принятых записей
+            self._enqueue(None)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def on_record(self, callback: RecordCallback) -> RecordCallback:
+        """
+        Вызывать callback(record) для каждой принятой записи
+
+        Вызовы выполняются в задаче декодирования и не должны блокироваться.
+        Исключения callback учитываются в stats.errors и не прерывают прием.
+        """
+        self._callbacks.append(callback)
+        return callback
+
+    def state(self, vin: str) -> Optional[VehicleData]:
+        """Последнее известное по потоку состояние автомобиля"""
+        sections = self._states.get(vin)
+        if sections is None:
+            return None
+        return VehicleData.from_dict(dict(sections, vin=vin))
+
+    def __aiter__(self) -> AsyncIterator[TelemetryRecord]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[TelemetryRecord]:
+        while True:
+            record = await self._records.get()
+            if record is None:
+                return
+            yield record
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+        self.stats.connections += 1
+        try:
+            async for message in ws:
+                if message.type in (aiohttp.WSMsgType.BINARY, aiohttp.WSMsgType.TEXT):
+                    self.stats.frames += 1
+                    self._put_frame(message.data)
+        finally:
+            self._sockets.discard(ws)
+        return ws
+
+    def _put_frame(self, frame: Union[bytes, str]):
+        if self._frames.full():
+            self._frames.get_nowait()
+            self._frames.task_done()
+            self.stats.dropped_frames += 1
+        self._frames.put_nowait(frame)
+
+    async def _decode_loop(self):
+        while True:
+            frames = [await self._frames.get()]
+            while len(frames) < self.batch_size and not self._frames.empty():
+                frames.append(self._frames.get_nowait())
+            try:
+                self._dispatch(self._decode(frames))
+            finally:
+                for _ in frames:
+                    self._frames.task_done()
+
+    def _decode(self, frames: List[Union[bytes, str]]) -> List[TelemetryRecord]:
+        """Декодировать пачку кадров одним вызовом; при ошибке - по одному кадру"""
+        self.stats.batches += 1
+        loads = (self._json or get_backend()).loads
+        raw = [f.encode() if isinstance(f, str) else f for f in frames]
+        try:
+            items = loads(b"[" + b",".join(raw) + b"]")
+        except Exception:
+            # Бэкенды бросают разные типы ошибок разбора
+            items = []
+            for frame in raw:
+                try:
+                    items.append(loads(frame))
+                except Exception:
+                    self.stats.errors += 1
+
+        records = []
+        for item in _flatten(items):
+            try:
+                records.append(TelemetryRecord.from_dict(item))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                self.stats.errors += 1
+        return records
+
+    def _dispatch(self, records: List[TelemetryRecord]):
+        for record in records:
+            self.stats.records += 1
+            state = self._states.setdefault(record.vin, {})
+            for name, section in record.sections().items():
+                state[name] = dict(state.get(name) or {}, **section)
+            for callback in self._callbacks:
+                try:
+                    callback(record)
+                except Exception:
+                    self.stats.errors += 1
+            self._enqueue(record)
+
+    def _enqueue(self, record: Optional[TelemetryRecord]):
+        if self._records.full():
+            self._records.get_nowait()
+            self.stats.dropped += 1
+        self._records.put_nowait(record)
+
+
+def _flatten(items: Iterable[Any]) -> Iterable[Any]:
+    for item in items:
+        if isinstance(item, list):
+            yield from item
+        else:
+            yield item
+
+
+def make_record(vin: str, created_at: Optional[float] = None, **values: Any) -> Dict[str, Any]:
+    """
+    Собрать запись в формате Fleet Telemetry JSON
+
+    Args:
+        vin: VIN автомобиля
+        created_at: Время записи (секунды UNIX, по умолчанию текущее)
+        **values: Поля телеметрии, например BatteryLevel=80, Location=(55.7, 37.6)
+    """
+    data = []
+    for key, value in values.items():
+        if key == "Location":
+            wrapped = {"locationValue": {"latitude": value[0], "longitude": value[1]}}
+        elif isinstance(value, bool):
+            wrapped = {"booleanValue": value}
+        elif isinstance(value, (int, float)):
+            wrapped = {"doubleValue": value}
+        else:
+            wrapped = {"stringValue": value}
+        data.append({"key": key, "value": wrapped})
+    created = datetime.fromtimestamp(time.time() if created_at is None else created_at, timezone.utc)
+    return {
+        "vin": vin,
+        "createdAt": created.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "data": data,
+    }
+
+
+class TelemetrySender:
+    """
+    Локальная замена автомобиля: отправляет записи в TelemetryReceiver
+
+    Используется в тестах и замерах пропускной способности.
+    """
+
+    def __init__(self, url: str, json_backend: Optional[str] = None):
+        """
+        Args:
+            url: Адрес приемника (TelemetryReceiver.url)
+            json_backend: Кодировщик JSON (по умолчанию - самый быстрый из установленных)
+        """
+        self.url = url
+        self._json: Optional[JSONBackend] = load_backend(json_backend) if json_backend else None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+
+    async def __aenter__(self) -> "TelemetrySender":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def connect(self):
+        """Открыть websocket-соединение"""
+        self._session = aiohttp.ClientSession()
+        self._ws = await self._session.ws_connect(self.url)
+
+    async def send(self, records: Union[Dict[str, Any], List[Dict[str, Any]]]):
+        """Отправить запись или массив записей одним кадром"""
+        await self._ws.send_bytes((self._json or get_backend()).dumps(records))
+
+    async def close(self):
+        """Закрыть соединение"""
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,419 @@
+"""
+Telemetry Store - колоночное хранилище истории состояния автомобилей
+"""
+
+import bisect
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple
+
+
+# Колонки хранилища; timestamp - секунды UNIX, отсутствующее значение - NaN
+COLUMNS = (
+    "timestamp",
+    "battery_level",
+    "charge_rate",
+    "speed",
+    "power",
+    "latitude",
+    "longitude",
+    "odometer",
+)
+
+# Раздел vehicle_data, из которого берется каждая колонка
+COLUMN_SECTIONS = {
+    "battery_level": "charge_state",
+    "charge_rate": "charge_state",
+    "speed": "drive_state",
+    "power": "drive_state",
+    "latitude": "drive_state",
+    "longitude": "drive_state",
+    "odometer": "vehicle_state",
+}
+
+_MAGIC = b"TLM1"
+# magic, число колонок, емкость сегмента в строках, заполнено строк
+_HEADER = struct.Struct("<4sIQQ")
+_HEADER_SIZE = 64
+_ITEM = array("d").itemsize
+_VEHICLE_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+@dataclass
+class Bucket:
+    """Агрегаты одной колонки за интервал downsample"""
+    start: float
+    count: int
+    min: float
+    max: float
+    mean: float
+
+
+class _Segment:
+    """
+    Файл сегмента: заголовок и колонки float64 фиксированной емкости подряд
+
+    Колонка хранится непрерывно, поэтому чтение одной колонки за интервал -
+    это один срез отображенной памяти без разбора строк.
+    """
+
+    __slots__ = ("path", "capacity", "rows", "_map", "_columns")
+
+    def __init__(self, path: str, capacity: int, create: bool = False):
+        self.path = path
+        size = _HEADER_SIZE + len(COLUMNS) * capacity * _ITEM
+        if create:
+            with open(path, "wb") as f:
+                f.truncate(size)
+                f.write(_HEADER.pack(_MAGIC, len(COLUMNS), capacity, 0))
+        # mmap держит собственную копию дескриптора, файл сразу закрывается
+        with open(path, "r+b") as f:
+            self._map = mmap.mmap(f.fileno(), 0)
+        magic, ncols, self.capacity, self.rows = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or ncols != len(COLUMNS):
+            self.close()
+            raise ValueError(f"Not a telemetry segment: {path}")
+        data = memoryview(self._map)[_HEADER_SIZE:]
+        step = self.capacity * _ITEM
+        self._columns = [
+            data[i * step:(i + 1) * step].cast("d") for i in range(len(COLUMNS))
+        ]
+
+    @property
+    def full(self) -> bool:
+        return self.rows >= self.capacity
+
+    @property
+    def first(self) -> float:
+        return self._columns[0][0]
+
+    @property
+    def last(self) -> float:
+        return self._columns[0][self.rows - 1]
+
+    def append(self, row: Sequence[float]):
+        for column, value in zip(self._columns, row):
+            column[self.rows] = value
+        self.rows += 1
+        # Число строк пишется после данных: недописанная строка не видна при открытии
+        _HEADER.pack_into(self._map, 0, _MAGIC, len(COLUMNS), self.capacity, self.rows)
+
+    def bounds(self, start: float, end: float) -> Tuple[int, int]:
+        """Индексы строк [lo, hi) с timestamp в [start, end)"""
+        ts = self._columns[0]
+        return (
+            bisect.bisect_left(ts, start, 0, self.rows),
+            bisect.bisect_left(ts, end, 0, self.rows),
+        )
+
+    def column(self, index: int) -> memoryview:
+        return self._columns[index]
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        for column in getattr(self, "_columns", ()):
+            column.release()
+        self._columns = []
+        self._map.close()
+
+
+class TelemetryStore:
+    """
+    Append-only хранилище телеметрии по автомобилям на mmap-сегментах
+
+    Для каждого автомобиля строки пишутся в сегменты фиксированной емкости
+    (по файлу на сегмент). Файлы отображаются в память, поэтому объем
+    истории ограничен диском, а не RAM: страницы старых сегментов
+    выгружаются ОС. Время в пределах автомобиля должно не убывать.
+
+    Каждое отображение держит дескриптор файла, поэтому открытыми
+    остаются сегменты не более чем max_open_segments (кроме сегментов
+    текущего автомобиля): давно не использованные автомобили закрываются
+    и открываются снова при следующем обращении.
+    """
+
+    def __init__(self, path: str, segment_rows: int = 65536, max_open_segments: int = 256):
+        """
+        Открыть или создать хранилище
+
+        Args:
+            path: Каталог хранилища
+            segment_rows: Строк в одном файле сегмента
+            max_open_segments: Сколько сегментов держать отображенными одновременно
+        """
+        if segment_rows < 1:
+            raise ValueError("segment_rows must be >= 1")
+        if max_open_segments < 1:
+            raise ValueError("max_open_segments must be >= 1")
+        self.path = path
+        self.segment_rows = segment_rows
+        self.max_open_segments = max_open_segments
+        self._lock = threading.Lock()
+        # Открытые сегменты по автомобилям; конец - использованные последними
+        self._segments: "OrderedDict[str, List[_Segment]]" = OrderedDict()
+        os.makedirs(path, exist_ok=True)
+
+    def __enter__(self) -> "TelemetryStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def vehicles(self) -> List[str]:
+        """ID автомобилей, для которых есть записи"""
+        return sorted(
+            name for name in os.listdir(self.path)
+            if os.path.isdir(os.path.join(self.path, name))
+        )
+
+    def append(self, vehicle_id: str, timestamp: float, **values: Optional[float]):
+        """
+        Добавить строку телеметрии
+
+        Args:
+            vehicle_id: ID автомобиля
+            timestamp: Время замера (секунды UNIX)
+            **values: Значения колонок из COLUMNS; отсутствующие сохраняются как NaN
+
+        Raises:
+            ValueError: Неизвестная колонка или время меньше последней записи
+        """
+        unknown = [name for name in values if name not in COLUMN_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown telemetry columns: {', '.join(unknown)}")
+        row = [float(timestamp)] + [
+            math.nan if values.get(name) is None else float(values[name])
+            for name in COLUMNS[1:]
+        ]
+
+        with self._lock:
+            if not self._append(vehicle_id, timestamp, row):
+                raise ValueError(
+                    f"Timestamp {timestamp} is older than the last record for {vehicle_id}"
+                )
+
+    def record(self, vehicle_id: str, data: Any, timestamp: Optional[float] = None) -> bool:
+        """
+        Сохранить состояние из ответа API
+
+        Args:
+            vehicle_id: ID автомобиля
+            data: Ответ vehicle_data (словарь или VehicleData) с разделами
+                charge_state/drive_state/vehicle_state
+            timestamp: Время замера (по умолчанию - поле timestamp раздела или текущее)
+
+        Returns:
+            True если строка записана; False если в ответе нет колонок
+            хранилища или замер старше уже записанного
+        """
+        if hasattr(data, "to_dict"):
+            data = data.to_dict()
+        values: Dict[str, Optional[float]] = {}
+        stamps = []
+        for section in ("charge_state", "drive_state", "vehicle_state"):
+            state = data.get(section)
+            if not state:
+                continue
+            for name, source in COLUMN_SECTIONS.items():
+                if source == section:
+                    values[name] = state.get(name)
+            if state.get("timestamp") is not None:
+                stamps.append(state.get("timestamp") / 1000.0)
+        if not values:
+            return False
+        if timestamp is None:
+            timestamp = max(stamps) if stamps else time.time()
+        row = [float(timestamp)] + [
+            math.nan if values.get(name) is None else float(values[name])
+            for name in COLUMNS[1:]
+        ]
+        # Проверка времени и запись под одной блокировкой: иначе параллельный
+        # record мог бы записать более новую строку между ними
+        with self._lock:
+            return self._append(vehicle_id, timestamp, row)
+
+    def query(
+        self,
+        vehicle_id: str,
+        start: float = -math.inf,
+        end: float = math.inf,
+        columns: Optional[Iterable[str]] = None
+    ) -> Dict[str, array]:
+        """
+        Строки автомобиля за интервал времени
+
+        Args:
+            vehicle_id: ID автомобиля
+            start: Начало интервала (включительно)
+            end: Конец интервала (не включая)
+            columns: Нужные колонки (по умолчанию все); timestamp возвращается всегда
+
+        Returns:
+            Словарь колонка -> array('d') одинаковой длины
+        """
+        names = ["timestamp"] + [c for c in (columns or COLUMNS[1:]) if c != "timestamp"]
+        indexes = [self._column_index(name) for name in names]
+        result = {name: array("d") for name in names}
+        with self._lock:
+            for segment, lo, hi in self._ranges(vehicle_id, start, end):
+                for name, index in zip(names, indexes):
+                    result[name].frombytes(segment.column(index)[lo:hi].cast("B"))
+        return result
+
+    def downsample(
+        self,
+        vehicle_id: str,
+        column: str,
+        bucket: float,
+        start: float = -math.inf,
+        end: float = math.inf
+    ) -> List[Bucket]:
+        """
+        Агрегаты колонки по интервалам фиксированной длины
+
+        Args:
+            vehicle_id: ID автомобиля
+            column: Колонка из COLUMNS
+            bucket: Длина интервала в секундах
+            start: Начало диапазона
+            end: Конец диапазона
+
+        Returns:
+            Непустые интервалы по возрастанию времени; NaN не учитываются
+        """
+        if bucket <= 0:
+            raise ValueError("bucket must be > 0")
+        data = self.query(vehicle_id, start, end, columns=[column])
+        timestamps, values = data["timestamp"], data[column]
+
+        buckets: List[Bucket] = []
+        lo = 0
+        while lo < len(timestamps):
+            bucket_start = timestamps[lo] - timestamps[lo] % bucket
+            hi = bisect.bisect_left(timestamps, bucket_start + bucket, lo)
+            chunk = [v for v in values[lo:hi] if not math.isnan(v)]
+            if chunk:
+                buckets.append(Bucket(
+                    start=bucket_start,
+                    count=len(chunk),
+                    min=min(chunk),
+                    max=max(chunk),
+                    mean=math.fsum(chunk) / len(chunk)
+                ))
+            lo = hi
+        return buckets
+
+    def prune(self, before: float) -> int:
+        """
+        Удалить сегменты, все записи которых старше before
+
+        Returns:
+            Число удаленных сегментов
+        """
+        removed = 0
+        with self._lock:
+            for vehicle_id in self.vehicles():
+                segments = self._load(vehicle_id)
+                # Последний сегмент остается: в него продолжается запись
+                while len(segments) > 1 and segments[0].last < before:
+                    segment = segments.pop(0)
+                    segment.close()
+                    os.remove(segment.path)
+                    removed += 1
+        return removed
+
+    def flush(self):
+        """Сбросить изменения сегментов на диск"""
+        with self._lock:
+            for segments in self._segments.values():
+                for segment in segments:
+                    segment.flush()
+
+    def close(self):
+        """Закрыть файлы сегментов"""
+        with self._lock:
+            for segments in self._segments.values():
+                for segment in segments:
+                    segment.close()
+            self._segments.clear()
+
+    def _column_index(self, name: str) -> int:
+        try:
+            return COLUMNS.index(name)
+        except ValueError:
+            raise ValueError(f"Unknown telemetry column: {name}") from None
+
+    def _vehicle_dir(self, vehicle_id: str) -> str:
+        if not _VEHICLE_ID.match(str(vehicle_id)) or vehicle_id in (".", ".."):
+            raise ValueError(f"Invalid vehicle id: {vehicle_id!r}")
+        return os.path.join(self.path, str(vehicle_id))
+
+    def _append(self, vehicle_id: str, timestamp: float, row: List[float]) -> bool:
+        """Записать строку (под self._lock); False, если время меньше последней записи"""
+        segments = self._load(vehicle_id)
+        if segments and segments[-1].rows and timestamp < segments[-1].last:
+            return False
+        if not segments or segments[-1].full:
+            self._evict(1, keep=vehicle_id)
+            segments.append(self._new_segment(vehicle_id, len(segments)))
+        segments[-1].append(row)
+        return True
+
+    def _load(self, vehicle_id: str) -> List[_Segment]:
+        segments = self._segments.get(vehicle_id)
+        if segments is not None:
+            self._segments.move_to_end(vehicle_id)
+            return segments
+        directory = self._vehicle_dir(vehicle_id)
+        names = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+        self._evict(len(names))
+        segments = []
+        try:
+            for name in names:
+                if name.endswith(".seg"):
+                    segments.append(_Segment(os.path.join(directory, name), self.segment_rows))
+        except BaseException:
+            for segment in segments:
+                segment.close()
+            raise
+        self._segments[vehicle_id] = segments
+        return segments
+
+    def _evict(self, needed: int, keep: Optional[str] = None):
+        """Закрыть давно не использованные автомобили (кроме keep), чтобы открыть еще needed сегментов"""
+        open_segments = sum(len(segments) for segments in self._segments.values())
+        while open_segments + needed > self.max_open_segments:
+            oldest = next((v for v in self._segments if v != keep), None)
+            if oldest is None:
+                break
+            segments = self._segments.pop(oldest)
+            for segment in segments:
+                segment.flush()
+                segment.close()
+            open_segments -= len(segments)
+
+    def _new_segment(self, vehicle_id: str, index: int) -> _Segment:
+        directory = self._vehicle_dir(vehicle_id)
+        os.makedirs(directory, exist_ok=True)
+        if self._segments[vehicle_id]:
+            index = int(os.path.basename(self._segments[vehicle_id][-1].path)[:-4]) + 1
+        path = os.path.join(directory, f"{index:08d}.seg")
+        return _Segment(path, self.segment_rows, create=True)
+
+    def _ranges(self, vehicle_id: str, start: float, end: float) -> Iterable[Tuple[_Segment, int, int]]:
+        for segment in self._load(vehicle_id):
+            if not segment.rows or segment.last < start or segment.first >= end:
+                continue
+            lo, hi = segment.bounds(start, end)
+            if hi > lo:
+                yield segment, lo, hi
@@ -2,15 +2,55 @@
 Tesla API Client - модуль для работы с Tesla API
 """
 
+import logging
+import socket
+import threading
+import weakref
 import requests
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, Callable, Iterator, List, Sequence, Tuple, Union
+from dataclasses import dataclass, field
 from datetime import datetime
 
+from .cache import COMPOSITE_ENDPOINTS, MISS, ResponseCache
+from .delta import DeltaEngine
+from .json_backend import JSONBackend, get_backend, load_backend
+from .models import VehicleData
+from .singleflight import SingleFlight
+from .telemetry_store import TelemetryStore
+from .ratelimit import Priority, RateLimiter, parse_retry_after, priority_scope
+from .wake import VehicleAsleepError, WakeManager
+
+
+logger = logging.getLogger(__name__)
+
+# Можно ли будить автомобиль ради чтений в текущем потоке/задаче (при auto_wake)
+_wake_allowed: ContextVar[bool] = ContextVar("tesla_wake_allowed", default=True)
+
+
+@contextmanager
+def _wake_scope(allowed: bool) -> Iterator[None]:
+    token = _wake_allowed.set(allowed)
+    try:
+        yield
+    finally:
+        _wake_allowed.reset(token)
+
 
 @dataclass
 class TeslaVehicle:
     """Модель данных автомобиля Tesla"""
+    __slots__ = (
+        "id", "vin", "display_name", "color", "tokens", "state",
+        "in_service", "id_s", "vehicle_id",
+    )
+    
     id: int
     vin: str
     display_name: str
@@ -22,24 +62,516 @@ class TeslaVehicle:
     vehicle_id: int
 
 
+@dataclass
+class TransportStats:
+    """Статистика пула HTTP-соединений клиента"""
+    transport: str
+    opened: int
+    reused: int
+    idle: int
+    requests: int
+
+
+@dataclass
+class FleetResult:
+    """Результат опроса одного автомобиля в TeslaAPIClient.get_fleet_data"""
+    vehicle_id: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[Exception] = None
+    
+    @property
+    def ok(self) -> bool:
+        """True если все запрошенные данные получены без ошибок"""
+        return self.error is None
+
+
+# Разделы ответа vehicle_data, которые можно запросить фильтром endpoints
+VEHICLE_DATA_ENDPOINTS = (
+    "charge_state",
+    "climate_state",
+    "closures_state",
+    "drive_state",
+    "gui_settings",
+    "location_data",
+    "vehicle_config",
+    "vehicle_state",
+)
+
+# Разделы, из которых собирается get_vehicle_summary
+SUMMARY_ENDPOINTS = ("charge_state", "drive_state", "location_data", "vehicle_state")
+
+# Разделы состояния, которые меняет каждая команда (сбрасываются в кеше)
+COMMAND_INVALIDATES = {
+    "lock_doors": ("vehicle_state", "closures_state"),
+    "start_climate": ("climate_state",),
+    "set_temps": ("climate_state",),
+    "stop_climate": ("climate_state",),
+}
+
+# Эндпоинты, доступные для get_fleet_data, помимо разделов vehicle_data,
+# и методы клиента, которые их читают
+FLEET_ENDPOINTS = {
+    "data": "get_vehicle_data",
+    "vehicle_data": "get_vehicle_state",
+}
+
+
+def _endpoints_params(endpoints: Optional[Sequence[str]]) -> Optional[Dict[str, str]]:
+    """Query-параметры фильтра разделов для запроса vehicle_data"""
+    if endpoints is None:
+        return None
+    unknown = [e for e in endpoints if e not in VEHICLE_DATA_ENDPOINTS]
+    if unknown:
+        raise ValueError(f"Unknown vehicle_data endpoints: {', '.join(unknown)}")
+    return {"endpoints": ";".join(endpoints)}
+
+
+def _section_name(endpoint: str) -> str:
+    # location_data не отдельный объект: он добавляет координаты в drive_state
+    return "drive_state" if endpoint == "location_data" else endpoint
+
+
+def _parse_vehicle(v: Dict[str, Any]) -> TeslaVehicle:
+    """Собрать TeslaVehicle из элемента ответа /api/1/vehicles"""
+    return TeslaVehicle(
+        id=v.get("id"),
+        vin=v.get("vin"),
+        display_name=v.get("display_name"),
+        color=v.get("color"),
+        tokens=v.get("tokens", []),
+        state=v.get("state"),
+        in_service=v.get("in_service", False),
+        id_s=v.get("id_s"),
+        vehicle_id=v.get("vehicle_id")
+    )
+
+
+def _format_summary(vehicle_data: Dict[str, Any]) -> str:
+    """Отформатировать текстовую сводку из ответа vehicle_data"""
+    charge_state = vehicle_data.get("charge_state") or {}
+    drive_state = vehicle_data.get("drive_state") or {}
+    vehicle_state = vehicle_data.get("vehicle_state") or {}
+    return f"""
+🚗 Tesla Vehicle Summary:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+📋 Basic Info:
+  • Name: {vehicle_data.get('display_name', 'N/A')}
+  • VIN: {vehicle_data.get('vin', 'N/A')}
+  • Color: {vehicle_data.get('color', 'N/A')}
+  • State: {vehicle_data.get('state', 'N/A')}
+
+🔋 Battery & Charge:
+  • Battery Level: {charge_state.get('battery_level', 'N/A')}%
+  • Charging State: {charge_state.get('charging_state', 'N/A')}
+  • Charge Rate: {charge_state.get('charge_rate', 'N/A')} km/h
+  • Time to Full Charge: {charge_state.get('time_to_full_charge', 'N/A')} hours
+  • Range: {charge_state.get('battery_range', 'N/A')} km
+
+📍 Location:
+  • Latitude: {drive_state.get('latitude', 'N/A')}
+  • Longitude: {drive_state.get('longitude', 'N/A')}
+  • Speed: {drive_state.get('speed', 'N/A')} km/h
+  • Power: {drive_state.get('power', 'N/A')} kW
+
+🔧 Vehicle Info:
+  • Odometer: {vehicle_state.get('odometer', 'N/A')} km
+  • Software Version: {vehicle_state.get('software_update', {}).get('version', 'N/A')}
+  • Locked: {vehicle_state.get('locked', 'N/A')}
+  • Sentry Mode: {vehicle_state.get('sentry_mode', 'N/A')}
+  • Summon Standby: {vehicle_state.get('summon_standby', 'N/A')}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+
+def _counting_pool(pool_cls: type, on_connect: Callable[[], None]) -> type:
+    """Подкласс пула urllib3, сообщающий о каждом установленном соединении"""
+    
+    class CountingConnection(pool_cls.ConnectionCls):
+        def connect(self):
+            super().connect()
+            on_connect()
+    
+    class CountingPool(pool_cls):
+        ConnectionCls = CountingConnection
+    
+    return CountingPool
+
+
+class _PoolAdapter(HTTPAdapter):
+    """HTTPAdapter с TCP keep-alive и счетчиком открытых соединений"""
+    
+    def __init__(self, keep_alive: bool = True, **kwargs: Any):
+        self.keep_alive = keep_alive
+        self.connections_opened = 0
+        self._count_lock = threading.Lock()
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args: Any, **kwargs: Any):
+        if self.keep_alive:
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool(pool_cls, self._connection_opened)
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+    
+    def _connection_opened(self):
+        with self._count_lock:
+            self.connections_opened += 1
+
+
 class TeslaAPIClient:
     """Клиент для работы с Tesla API"""
     
-    def __init__(self, access_token: str, base_url: str = "https://owner-api.teslamotors.com"):
+    def __init__(
+        self,
+        access_token: str,
+        base_url: str = "https://owner-api.teslamotors.com",
+        max_workers: int = 8,
+        cache: Optional[ResponseCache] = None,
+        auto_wake: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 3,
+        pool_maxsize: Optional[int] = None,
+        pool_connections: int = 4,
+        keep_alive: bool = True,
+        timeout: Union[float, Tuple[float, float]] = (3.05, 30.0),
+        connect_retries: int = 2,
+        http2: bool = False,
+        json_backend: Optional[str] = None,
+        telemetry: Optional[TelemetryStore] = None,
+        delta: Optional[DeltaEngine] = None
+    ):
         """
         Инициализация Tesla API клиента
         
         Args:
             access_token: OAuth токен доступа
             base_url: Базовый URL API
+            max_workers: Размер пула потоков (и соединений) для get_fleet_data
+            cache: Кеш ответов для методов чтения (по умолчанию отключен)
+            auto_wake: Будить спящий автомобиль перед командами и чтениями
+            rate_limiter: Ограничитель частоты запросов (по умолчанию отключен)
+            max_retries: Сколько раз повторять запрос после 429 при включенном ограничителе
+            pool_maxsize: Соединений на хост в пуле (по умолчанию max_workers)
+            pool_connections: Сколько пулов разных хостов держать открытыми
+            keep_alive: Держать соединения открытыми (TCP keep-alive); False - Connection: close
+            timeout: Таймаут запроса: секунды или (connect, read)
+            connect_retries: Повторы при ошибках соединения и 502/503/504 для GET
+            http2: Использовать HTTP/2 через httpx (нужен пакет httpx[http2])
+            json_backend: Декодер ответов: "orjson", "msgspec" или "json"
+                (по умолчанию - самый быстрый из установленных)
+            telemetry: Хранилище, в которое пишется каждое полученное из API
+                состояние зарядки/движения/автомобиля (по умолчанию не пишется)
+            delta: Движок изменений, которому передается каждый полученный
+                из API ответ автомобиля (по умолчанию не используется)
         """
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        
         self.access_token = access_token
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.max_workers = max_workers
+        self.cache = cache
+        # Одинаковые одновременные чтения разделяют один HTTP-запрос
+        self._inflight = SingleFlight()
+        self.wake_manager: Optional[WakeManager] = WakeManager(self) if auto_wake else None
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.http2 = http2
+        self.telemetry = telemetry
+        self.delta = delta
+        self._json: Optional[JSONBackend] = load_backend(json_backend) if json_backend else None
+        headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
-        })
+        }
+        if not keep_alive:
+            headers["Connection"] = "close"
+        pool_maxsize = pool_maxsize or max_workers
+        if http2:
+            self.session = self._build_http2_session(headers, pool_maxsize, keep_alive)
+        else:
+            self.session = self._build_session(
+                headers, pool_maxsize, pool_connections, keep_alive, connect_retries
+            )
+    
+    def _build_session(
+        self,
+        headers: Dict[str, str],
+        pool_maxsize: int,
+        pool_connections: int,
+        keep_alive: bool,
+        connect_retries: int
+    ) -> requests.Session:
+        """Создать requests.Session с настроенным пулом соединений"""
+        session = requests.Session()
+        session.headers.update(headers)
+        # Сессия используется из нескольких потоков: API авторизуется токеном,
+        # поэтому cookie не сохраняем - единственное изменяемое состояние сессии
+        # остается в пуле urllib3, который потокобезопасен. pool_block не дает
+        # открывать лишние одноразовые соединения сверх pool_maxsize.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        # 429 обрабатывает ограничитель частоты, здесь только сбои соединения
+        # и ответы балансировщика для идемпотентных GET
+        retry = Retry(
+            total=connect_retries,
+            connect=connect_retries,
+            read=0,
+            status=connect_retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            backoff_factor=0.3,
+            raise_on_status=False,
+            respect_retry_after_header=False
+        )
+        adapter = _PoolAdapter(
+            keep_alive=keep_alive,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+            max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def _build_http2_session(self, headers: Dict[str, str], pool_maxsize: int, keep_alive: bool) -> Any:
+        """Создать httpx.Client с HTTP/2: все запросы мультиплексируются в одно соединение"""
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("http2=True requires the httpx[http2] package") from e
+        
+        timeout = self.timeout
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self._h2_requests = 0
+        self._h2_connections: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        
+        def on_response(response: Any):
+            self._h2_requests += 1
+            for connection in self._h2_pool_connections():
+                self._h2_connections.add(connection)
+        
+        session = httpx.Client(
+            http2=True,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_maxsize if keep_alive else 0
+            ),
+            event_hooks={"response": [on_response]}
+        )
+        session.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+    
+    def _h2_pool_connections(self) -> List[Any]:
+        pool = getattr(getattr(self.session, "_transport", None), "_pool", None)
+        return list(getattr(pool, "connections", []))
+    
+    def transport_stats(self) -> TransportStats:
+        """
+        Получить статистику пула соединений
+        
+        Returns:
+            TransportStats: сколько соединений открыто за все время, сколько
+            запросов ушло по уже открытым соединениям и сколько соединений
+            сейчас простаивает в пуле
+        """
+        if self.http2:
+            idle = sum(1 for c in self._h2_pool_connections() if c.is_idle())
+            opened = len(self._h2_connections)
+            return TransportStats(
+                transport="http/2",
+                opened=opened,
+                reused=max(0, self._h2_requests - opened),
+                idle=idle,
+                requests=self._h2_requests
+            )
+        
+        opened = requests_sent = idle = 0
+        # Один адаптер смонтирован и на http://, и на https://
+        adapters = {id(a): a for a in self.session.adapters.values()}.values()
+        for adapter in adapters:
+            opened += getattr(adapter, "connections_opened", 0)
+            manager = getattr(adapter, "poolmanager", None)
+            if manager is None:
+                continue
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                requests_sent += pool.num_requests
+                if pool.pool is not None:
+                    idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        return TransportStats(
+            transport="http/1.1",
+            opened=opened,
+            reused=max(0, requests_sent - opened),
+            idle=idle,
+            requests=requests_sent
+        )
+    
+    def _request(
+        self,
+        method: str,
+        url: str,
+        kind: str = "read",
+        priority: Optional[Priority] = None,
+        **kwargs: Any
+    ) -> requests.Response:
+        """HTTP-запрос через ограничитель частоты с повтором после 429"""
+        if not self.http2:
+            kwargs.setdefault("timeout", self.timeout)
+        if self.rate_limiter is None:
+            return getattr(self.session, method)(url, **kwargs)
+        
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(kind, priority)
+            response = getattr(self.session, method)(url, **kwargs)
+            retry_after = None
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.rate_limiter.on_response(kind, response.status_code, retry_after)
+            if response.status_code != 429:
+                break
+        return response
+    
+    def _read(
+        self,
+        vehicle_id: Optional[str],
+        endpoint: str,
+        sections: Optional[Sequence[str]] = None,
+        empty: Callable[[], Any] = dict,
+        decode: Optional[Callable[[bytes], Any]] = None
+    ) -> Any:
+        """GET-запрос к эндпоинту автомобиля (или аккаунта при vehicle_id=None) через кеш и single-flight"""
+        key: Tuple[Any, ...] = (vehicle_id, endpoint, tuple(sections) if sections is not None else None)
+        if decode is not None:
+            key += (decode,)
+        if self.cache is not None:
+            value = self.cache.get(key)
+            if value is not MISS:
+                return value
+        
+        # Чтение без пробуждения не должно разделять запрос с будящим
+        flight_key = key if _wake_allowed.get() else key + ("no-wake",)
+        return self._inflight.do(
+            flight_key, lambda: self._fetch(key, vehicle_id, endpoint, sections, empty, decode)
+        )
+    
+    def _fetch(
+        self,
+        key: Any,
+        vehicle_id: Optional[str],
+        endpoint: str,
+        sections: Optional[Sequence[str]],
+        empty: Callable[[], Any],
+        decode: Optional[Callable[[bytes], Any]] = None
+    ) -> Any:
+        # Команда, выполненная во время запроса, делает его ответ устаревшим
+        generation = self.cache.generation(vehicle_id) if self.cache is not None else None
+        if vehicle_id is None:
+            url = f"{self.base_url}/api/1/{endpoint}"
+        else:
+            if not self._ensure_awake(vehicle_id):
+                raise VehicleAsleepError(vehicle_id)
+            url = f"{self.base_url}/api/1/vehicles/{vehicle_id}/{endpoint}"
+        response = self._request("get", url, params=_endpoints_params(sections))
+        if vehicle_id is not None:
+            self._track_state(vehicle_id, response.status_code)
+        response.raise_for_status()
+        if decode is not None:
+            value = decode(response.content)
+        else:
+            value = self._decode(response).get("response")
+            if value is None:
+                value = empty()
+        
+        if self.cache is not None:
+            content = response.content
+            self.cache.set(key, value, size=len(content) if isinstance(content, bytes) else None,
+                           generation=generation)
+        if vehicle_id is None and endpoint == "vehicles":
+            self._track_vehicle_list(value)
+        if vehicle_id is not None and (self.telemetry is not None or self.delta is not None):
+            self._observe(vehicle_id, endpoint, value)
+        return value
+    
+    def _observe(self, vehicle_id: str, endpoint: str, value: Any):
+        """
+        Передать свежий (не из кеша) ответ в хранилище телеметрии и движок изменений
+
+        Ошибки наблюдателей (диск, подписчики) только логируются: чтение из
+        API, которое уже удалось, не должно из-за них завершаться ошибкой.
+        """
+        if endpoint not in COMPOSITE_ENDPOINTS:
+            value = {_section_name(endpoint): value}
+        if self.telemetry is not None:
+            try:
+                self.telemetry.record(vehicle_id, value)
+            except Exception:
+                logger.exception("Failed to record telemetry for vehicle %s", vehicle_id)
+        if self.delta is not None:
+            try:
+                # Ответ может содержать не все разделы (фильтр endpoints или один раздел)
+                self.delta.update(vehicle_id, value, partial=True)
+            except Exception:
+                logger.exception("Failed to update delta engine for vehicle %s", vehicle_id)
+    
+    def _decode(self, response: Any) -> Any:
+        """Декодировать тело ответа прямо из байтов выбранным бэкендом JSON"""
+        content = response.content
+        if not isinstance(content, (bytes, bytearray)):
+            return response.json()
+        return (self._json or get_backend()).loads(content)
+    
+    def _ensure_awake(self, vehicle_id: str) -> bool:
+        """Разбудить автомобиль, если включен auto_wake; False если он так и не проснулся"""
+        if self.wake_manager is None:
+            return True
+        if not _wake_allowed.get():
+            # Будить нельзя: не опрашиваем автомобиль, о котором известно, что он спит
+            return self.wake_manager.known_state(vehicle_id) != "asleep"
+        return self.wake_manager.ensure_awake(vehicle_id).online
+    
+    def _track_state(self, vehicle_id: str, status_code: int):
+        """Запомнить состояние автомобиля по коду ответа (408 - автомобиль спит)"""
+        if self.wake_manager is None:
+            return
+        if status_code == 408:
+            self.wake_manager.mark_asleep(vehicle_id)
+        elif status_code == 200:
+            self.wake_manager.mark_online(vehicle_id)
+    
+    def _track_vehicle_list(self, vehicles: List[Dict[str, Any]]):
+        """
+        Запомнить состояния автомобилей из свежего (не из кеша) списка
+
+        Ответ из кеша может быть старше online_grace: отметка по нему
+        выдала бы давно уснувший автомобиль за проснувшийся.
+        """
+        if self.wake_manager is None:
+            return
+        for vehicle in vehicles:
+            state = vehicle.get("state")
+            if state == "online":
+                self.wake_manager.mark_online(vehicle.get("id_s"))
+            elif state in ("asleep", "offline"):
+                self.wake_manager.mark_asleep(vehicle.get("id_s"))
+    
+    def _invalidate(self, vehicle_id: str, command: str):
+        """Сбросить закешированные разделы, которые меняет команда"""
+        sections = COMMAND_INVALIDATES.get(command)
+        if self.cache is not None and sections:
+            self.cache.invalidate(vehicle_id, sections)
     
     def get_vehicles(self) -> List[TeslaVehicle]:
         """
@@ -48,26 +580,37 @@ class TeslaAPIClient:
         Returns:
             Список объектов TeslaVehicle
         """
-        response = self.session.get(f"{self.base_url}/api/1/vehicles")
-        response.raise_for_status()
+        return [_parse_vehicle(v) for v in self._read(None, "vehicles", empty=list)]
+    
+    def get_vehicle(self, vehicle_id: str) -> TeslaVehicle:
+        """
+        Получить краткую информацию об автомобиле (не будит автомобиль)
         
-        data = response.json()
-        vehicles = []
-        for v in data.get("response", []):
-            vehicle = TeslaVehicle(
-                id=v.get("id"),
-                vin=v.get("vin"),
-                display_name=v.get("display_name"),
-                color=v.get("color"),
-                tokens=v.get("tokens", []),
-                state=v.get("state"),
-                in_service=v.get("in_service", False),
-                id_s=v.get("id_s"),
-                vehicle_id=v.get("vehicle_id")
-            )
-            vehicles.append(vehicle)
+        Args:
+            vehicle_id: ID автомобиля
+            
+        Returns:
+            Объект TeslaVehicle с актуальным полем state
+        """
+        response = self._request("get", f"{self.base_url}/api/1/vehicles/{vehicle_id}")
+        response.raise_for_status()
+        return _parse_vehicle(self._decode(response).get("response") or {})
+    
+    def wake_up(self, vehicle_id: str) -> Dict[str, Any]:
+        """
+        Отправить автомобилю запрос на пробуждение
         
-        return vehicles
+        Args:
+            vehicle_id: ID автомобиля
+            
+        Returns:
+            Словарь с данными автомобиля (поле state - состояние после запроса)
+        """
+        response = self._request(
+            "post", f"{self.base_url}/api/1/vehicles/{vehicle_id}/wake_up", kind="command"
+        )
+        response.raise_for_status()
+        return self._decode(response).get("response") or {}
     
     def get_vehicle_data(self, vehicle_id: str) -> Dict[str, Any]:
         """
@@ -79,27 +622,66 @@ class TeslaAPIClient:
         Returns:
             Словарь с данными автомобиля
         """
-        response = self.session.get(
-            f"{self.base_url}/api/1/vehicles/{vehicle_id}/data"
-        )
-        response.raise_for_status()
-        return response.json().get("response", {})
+        return self._read(vehicle_id, "data")
     
-    def get_vehicle_state(self, vehicle_id: str) -> Dict[str, Any]:
+    def get_vehicle_state(
+        self,
+        vehicle_id: str,
+        endpoints: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
         """
         Получить текущее состояние автомобиля
         
         Args:
             vehicle_id: ID автомобиля
+            endpoints: Разделы vehicle_data для запроса (по умолчанию все)
             
         Returns:
             Словарь с состоянием автомобиля
         """
-        response = self.session.get(
-            f"{self.base_url}/api/1/vehicles/{vehicle_id}/vehicle_data"
-        )
-        response.raise_for_status()
-        return response.json().get("response", {})
+        return self._read(vehicle_id, "vehicle_data", sections=endpoints)
+    
+    def get_vehicle_sections(
+        self,
+        vehicle_id: str,
+        sections: Sequence[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Получить несколько разделов состояния одним запросом vehicle_data
+        
+        Args:
+            vehicle_id: ID автомобиля
+            sections: Разделы из VEHICLE_DATA_ENDPOINTS
+            
+        Returns:
+            Словарь {раздел: данные раздела}; отсутствующий в ответе раздел - пустой словарь
+        """
+        data = self.get_vehicle_state(vehicle_id, endpoints=sections)
+        return {
+            section: data.get(_section_name(section)) or {}
+            for section in sections
+        }
+    
+    def get_vehicle_model(
+        self,
+        vehicle_id: str,
+        endpoints: Optional[Sequence[str]] = None
+    ) -> VehicleData:
+        """
+        Получить состояние автомобиля в компактном виде
+        
+        В отличие от get_vehicle_state ответ не декодируется в словари:
+        разделы разбираются в типизированные модели при первом обращении.
+        
+        Args:
+            vehicle_id: ID автомобиля
+            endpoints: Разделы vehicle_data для запроса (по умолчанию все)
+            
+        Returns:
+            VehicleData с ленивыми моделями charge_state, drive_state,
+            climate_state и vehicle_state
+        """
+        return self._read(vehicle_id, "vehicle_data", sections=endpoints, decode=VehicleData)
     
     def get_charge_state(self, vehicle_id: str) -> Dict[str, Any]:
         """
@@ -111,11 +693,7 @@ class TeslaAPIClient:
         Returns:
             Словарь с состоянием зарядки
         """
-        response = self.session.get(
-            f"{self.base_url}/api/1/vehicles/{vehicle_id}/charge_state"
-        )
-        response.raise_for_status()
-        return response.json().get("response", {})
+        return self._read(vehicle_id, "charge_state")
     
     def get_climate_state(self, vehicle_id: str) -> Dict[str, Any]:
         """
@@ -127,11 +705,7 @@ class TeslaAPIClient:
         Returns:
             Словарь с состоянием климат-контроля
         """
-        response = self.session.get(
-            f"{self.base_url}/api/1/vehicles/{vehicle_id}/climate_state"
-        )
-        response.raise_for_status()
-        return response.json().get("response", {})
+        return self._read(vehicle_id, "climate_state")
     
     def get_drive_state(self, vehicle_id: str) -> Dict[str, Any]:
         """
@@ -143,11 +717,64 @@ class TeslaAPIClient:
         Returns:
             Словарь с данными о движении
         """
-        response = self.session.get(
-            f"{self.base_url}/api/1/vehicles/{vehicle_id}/drive_state"
-        )
-        response.raise_for_status()
-        return response.json().get("response", {})
+        return self._read(vehicle_id, "drive_state")
+    
+    def get_fleet_data(
+        self,
+        vehicle_ids: Sequence[str],
+        endpoints: Sequence[str] = ("vehicle_data",),
+        max_workers: Optional[int] = None,
+        wake: bool = True
+    ) -> List[FleetResult]:
+        """
+        Параллельно получить данные для множества автомобилей
+        
+        Args:
+            vehicle_ids: Список ID автомобилей
+            endpoints: Какие данные читать: разделы VEHICLE_DATA_ENDPOINTS
+                (читаются одним запросом) и/или ключи FLEET_ENDPOINTS
+            max_workers: Число потоков (по умолчанию self.max_workers)
+            wake: Будить спящие автомобили (при auto_wake); при False спящий
+                автомобиль попадает в результат с ошибкой VehicleAsleepError
+                или ошибкой HTTP 408
+            
+        Returns:
+            Список FleetResult в порядке vehicle_ids; ошибки по отдельным
+            автомобилям сохраняются в FleetResult.error, а не выбрасываются
+        """
+        unknown = [
+            e for e in endpoints
+            if e not in FLEET_ENDPOINTS and e not in VEHICLE_DATA_ENDPOINTS
+        ]
+        if unknown:
+            raise ValueError(f"Unknown fleet endpoints: {', '.join(unknown)}")
+        
+        vehicle_ids = list(vehicle_ids)
+        if not vehicle_ids:
+            return []
+        
+        workers = min(max_workers or self.max_workers, len(vehicle_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                lambda vehicle_id: self._fetch_fleet_entry(vehicle_id, endpoints, wake),
+                vehicle_ids
+            ))
+    
+    def _fetch_fleet_entry(self, vehicle_id: str, endpoints: Sequence[str], wake: bool = True) -> FleetResult:
+        result = FleetResult(vehicle_id=vehicle_id)
+        # Разделы vehicle_data читаем одним отфильтрованным запросом
+        sections = [e for e in endpoints if e in VEHICLE_DATA_ENDPOINTS]
+        try:
+            # Массовый опрос уступает интерактивным запросам и командам
+            with priority_scope(Priority.BULK), _wake_scope(wake):
+                if sections:
+                    result.data.update(self.get_vehicle_sections(vehicle_id, sections))
+                for endpoint in endpoints:
+                    if endpoint in FLEET_ENDPOINTS:
+                        result.data[endpoint] = getattr(self, FLEET_ENDPOINTS[endpoint])(vehicle_id)
+        except Exception as e:
+            result.error = e
+        return result
     
     def get_vehicle_summary(self, vehicle_id: str) -> str:
         """
@@ -160,43 +787,8 @@ class TeslaAPIClient:
             Форматированная строка с информацией
         """
         try:
-            vehicle_data = self.get_vehicle_data(vehicle_id)
-            charge_state = self.get_charge_state(vehicle_id)
-            drive_state = self.get_drive_state(vehicle_id)
-            
-            summary = f"""
-🚗 Tesla Vehicle Summary:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-📋 Basic Info:
-  • Name: {vehicle_data.get('display_name', 'N/A')}
-  • VIN: {vehicle_data.get('vin', 'N/A')}
-  • Color: {vehicle_data.get('color', 'N/A')}
-  • State: {vehicle_data.get('state', 'N/A')}
-
-🔋 Battery & Charge:
-  • Battery Level: {charge_state.get('battery_level', 'N/A')}%
-  • Charging State: {charge_state.get('charging_state', 'N/A')}
-  • Charge Rate: {charge_state.get('charge_rate', 'N/A')} km/h
-  • Time to Full Charge: {charge_state.get('time_to_full_charge', 'N/A')} hours
-  • Range: {vehicle_data.get('battery_range', 'N/A')} km
-
-📍 Location:
-  • Latitude: {drive_state.get('latitude', 'N/A')}
-  • Longitude: {drive_state.get('longitude', 'N/A')}
-  • Speed: {drive_state.get('speed', 'N/A')} km/h
-  • Power: {drive_state.get('power', 'N/A')} kW
-
-🔧 Vehicle Info:
-  • Odometer: {vehicle_data.get('odometer', 'N/A')} km
-  • Software Version: {vehicle_data.get('software_update', {}).get('version', 'N/A')}
-  • Locked: {vehicle_data.get('locked', 'N/A')}
-  • Sentry Mode: {vehicle_data.get('sentry_mode', 'N/A')}
-  • Summon Standby: {vehicle_data.get('summon_standby', 'N/A')}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
-            return summary
+            vehicle_data = self.get_vehicle_state(vehicle_id, endpoints=SUMMARY_ENDPOINTS)
+            return _format_summary(vehicle_data)
         except Exception as e:
             return f"Error getting vehicle summary: {str(e)}"
     
@@ -211,8 +803,12 @@ class TeslaAPIClient:
             True если успешно
         """
         try:
-            response = self.session.post(
-                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/honk_horn"
+            if not self._ensure_awake(vehicle_id):
+                return False
+            response = self._request(
+                "post",
+                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/honk_horn",
+                kind="command"
             )
             return response.status_code == 200
         except Exception:
@@ -230,13 +826,20 @@ class TeslaAPIClient:
             True если успешно
         """
         try:
+            if not self._ensure_awake(vehicle_id):
+                return False
             command = "lock" if lock else "unlock"
-            response = self.session.post(
-                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/{command}_doors"
+            response = self._request(
+                "post",
+                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/{command}_doors",
+                kind="command",
+                priority=Priority.HIGH
             )
-            return response.json().get("response", False)
+            return self._decode(response).get("response", False)
         except Exception:
             return False
+        finally:
+            self._invalidate(vehicle_id, "lock_doors")
     
     def start_climate(self, vehicle_id: str, temperature: float = 22.0) -> bool:
         """
@@ -250,18 +853,61 @@ class TeslaAPIClient:
             True если успешно
         """
         try:
-            response = self.session.post(
+            if not self._ensure_awake(vehicle_id):
+                return False
+            response = self._request(
+                "post",
                 f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/set_temps",
-                json={"driver_temp": temperature, "passenger_temp": temperature}
+                json={"driver_temp": temperature, "passenger_temp": temperature},
+                kind="command"
             )
             if response.status_code == 200:
-                response = self.session.post(
-                    f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/auto_condition_air"
+                response = self._request(
+                    "post",
+                    f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/auto_condition_air",
+                    kind="command"
                 )
-                return response.json().get("response", False)
+                return self._decode(response).get("response", False)
+            return False
+        except Exception:
             return False
+        finally:
+            self._invalidate(vehicle_id, "start_climate")
+    
+    def set_temps(
+        self,
+        vehicle_id: str,
+        driver_temp: float,
+        passenger_temp: Optional[float] = None
+    ) -> bool:
+        """
+        Установить температуру климат-контроля, не включая его
+        
+        Args:
+            vehicle_id: ID автомобиля
+            driver_temp: Температура водителя в градусах Цельсия
+            passenger_temp: Температура пассажира (по умолчанию как у водителя)
+            
+        Returns:
+            True если успешно
+        """
+        try:
+            if not self._ensure_awake(vehicle_id):
+                return False
+            response = self._request(
+                "post",
+                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/set_temps",
+                json={
+                    "driver_temp": driver_temp,
+                    "passenger_temp": driver_temp if passenger_temp is None else passenger_temp
+                },
+                kind="command"
+            )
+            return self._decode(response).get("response", False)
         except Exception:
             return False
+        finally:
+            self._invalidate(vehicle_id, "set_temps")
     
     def stop_climate(self, vehicle_id: str) -> bool:
         """
@@ -274,12 +920,18 @@ class TeslaAPIClient:
             True если успешно
         """
         try:
-            response = self.session.post(
-                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/auto_condition_air_off"
+            if not self._ensure_awake(vehicle_id):
+                return False
+            response = self._request(
+                "post",
+                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/auto_condition_air_off",
+                kind="command"
             )
-            return response.json().get("response", False)
+            return self._decode(response).get("response", False)
         except Exception:
             return False
+        finally:
+            self._invalidate(vehicle_id, "stop_climate")
     
     def flash_lights(self, vehicle_id: str) -> bool:
         """
@@ -292,9 +944,13 @@ class TeslaAPIClient:
             True если успешно
         """
         try:
-            response = self.session.post(
-                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/flash_lights"
+            if not self._ensure_awake(vehicle_id):
+                return False
+            response = self._request(
+                "post",
+                f"{self.base_url}/api/1/vehicles/{vehicle_id}/command/flash_lights",
+                kind="command"
             )
-            return response.json().get("response", False)
+            return self._decode(response).get("response", False)
         except Exception:
             return False
@@ -0,0 +1,59 @@
+"""
+Tokens - оценка числа токенов текста для бюджетов промпта
+"""
+
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+
+def _heuristic(text: str) -> int:
+    # Для моделей GPT английский текст дает около 4 символов на токен,
+    # кириллица - около 2: ее слова разбиваются на более мелкие части
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 2)
+
+
+@lru_cache(maxsize=8)
+def _encoder(model: Optional[str]) -> Optional[Callable[[str], Any]]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Файл BPE скачивается при первом обращении; без сети - оценка по символам
+        return None
+    return encoding.encode
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Число токенов текста
+
+    Если установлен tiktoken и кодировка модели загружается, считается
+    точно для модели; иначе - оценка по числу символов (с запасом для
+    кириллицы).
+
+    Args:
+        text: Текст
+        model: Модель OpenAI (например, "gpt-4")
+
+    Returns:
+        Число токенов
+    """
+    if not text:
+        return 0
+    encode = _encoder(model)
+    if encode is None:
+        return _heuristic(text)
+    return len(encode(text))
+
+
+def count_message_tokens(message: Dict[str, Any], model: Optional[str] = None) -> int:
+    """Токены сообщения chat.completions с учетом служебной разметки (~4 на сообщение)"""
+    return count_tokens(message.get("content") or "", model) + 4
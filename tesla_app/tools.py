@@ -0,0 +1,155 @@
+"""
+Tools - команды Tesla в виде схем function calling для LLM
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterable, List, Mapping
+
+from .commands import SUPERSEDE_GROUPS
+
+
+# Что можно спросить у get_status
+STATUS_ASPECTS = ("battery", "location", "odometer", "climate", "security", "all")
+
+# Допустимая температура климата Tesla, °C
+TEMPERATURE_RANGE = (15.0, 28.0)
+
+
+def _tool(name: str, description: str, properties: Optional[Dict[str, Any]] = None,
+          required: Iterable[str] = ()) -> Dict[str, Any]:
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties or {},
+                "required": list(required),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+# Схемы инструментов для chat.completions(tools=...)
+TOOLS: List[Dict[str, Any]] = [
+    _tool("honk", "Посигналить клаксоном"),
+    _tool("flash_lights", "Мигнуть фарами"),
+    _tool("lock", "Заблокировать двери автомобиля"),
+    _tool("unlock", "Разблокировать двери автомобиля"),
+    _tool(
+        "start_climate", "Включить климат-контроль (при необходимости с температурой)",
+        {"temperature": {
+            "type": "number",
+            "description": "Температура в градусах Цельсия",
+            "minimum": TEMPERATURE_RANGE[0],
+            "maximum": TEMPERATURE_RANGE[1],
+        }},
+    ),
+    _tool("stop_climate", "Выключить климат-контроль"),
+    _tool(
+        "get_status", "Показать состояние автомобиля",
+        {"what": {"type": "string", "enum": list(STATUS_ASPECTS), "description": "Что показать"}},
+    ),
+]
+
+TOOL_NAMES = tuple(tool["function"]["name"] for tool in TOOLS)
+
+
+@dataclass
+class ToolCall:
+    """Проверенный вызов инструмента"""
+    command: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    confidence: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь в формате ответа parse_command"""
+        return {"command": self.command, "parameters": dict(self.parameters), "confidence": self.confidence}
+
+
+def validate_call(name: str, arguments: Any) -> ToolCall:
+    """
+    Проверить вызов инструмента, который вернула модель
+
+    Args:
+        name: Имя инструмента
+        arguments: Аргументы - JSON-строка (как в ответе API) или словарь
+
+    Returns:
+        ToolCall с приведенными параметрами
+
+    Raises:
+        ValueError: Неизвестный инструмент или недопустимые аргументы
+    """
+    if name not in TOOL_NAMES:
+        raise ValueError(f"Unknown tool: {name}")
+    if isinstance(arguments, str):
+        try:
+            arguments = json.loads(arguments) if arguments.strip() else {}
+        except ValueError as e:
+            raise ValueError(f"Invalid arguments for {name}: {e}") from None
+    if not isinstance(arguments, dict):
+        raise ValueError(f"Arguments for {name} must be an object")
+
+    parameters: Dict[str, Any] = {}
+    if name == "start_climate" and arguments.get("temperature") is not None:
+        temperature = arguments["temperature"]
+        if isinstance(temperature, bool) or not isinstance(temperature, (int, float, str)):
+            raise ValueError(f"Invalid temperature: {temperature!r}")
+        try:
+            temperature = float(temperature)
+        except ValueError:
+            raise ValueError(f"Invalid temperature: {temperature!r}") from None
+        low, high = TEMPERATURE_RANGE
+        if not low <= temperature <= high:
+            raise ValueError(f"Temperature out of range: {temperature}")
+        parameters["temperature"] = temperature
+    elif name == "get_status":
+        what = arguments.get("what", "all")
+        if what not in STATUS_ASPECTS:
+            raise ValueError(f"Invalid status aspect: {what!r}")
+        parameters["what"] = what
+    return ToolCall(name, parameters)
+
+
+def _resource(command: str) -> str:
+    # Команды одной группы (lock/unlock, start/stop_climate) меняют одно состояние
+    return SUPERSEDE_GROUPS.get(command, command)
+
+
+def execution_plan(calls: Iterable[Mapping[str, Any]]) -> List[List[Mapping[str, Any]]]:
+    """
+    Разбить команды на этапы для параллельного выполнения
+
+    Команды одного этапа не зависят друг от друга и могут выполняться
+    одновременно; этапы выполняются по порядку. Команда попадает в этап
+    после последней конфликтующей с ней команды: той же группы
+    (lock и unlock, start_climate и stop_climate) или повтора той же
+    команды. get_status конфликтует со всеми, чтобы показать состояние
+    после предыдущих команд.
+
+    Args:
+        calls: Команды в порядке запроса (словари с ключом "command")
+
+    Returns:
+        Список этапов; внутри этапа сохраняется порядок запроса
+    """
+    stages: List[List[Mapping[str, Any]]] = []
+    # Ресурс -> номер последнего этапа, где он используется
+    last: Dict[str, int] = {}
+    barrier = -1
+    for call in calls:
+        command = call.get("command")
+        if command == "get_status":
+            index = max([barrier] + list(last.values())) + 1
+            barrier = index
+        else:
+            index = max(barrier, last.get(_resource(command), -1)) + 1
+            last[_resource(command)] = index
+        if index == len(stages):
+            stages.append([])
+        stages[index].append(call)
+    return stages
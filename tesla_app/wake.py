@@ -0,0 +1,152 @@
+"""
+Wake Manager - пробуждение спящих автомобилей перед командами и чтениями
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Callable, TYPE_CHECKING
+
+from .singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from .tesla_client import TeslaAPIClient
+
+
+class VehicleAsleepError(Exception):
+    """Автомобиль не проснулся за отведенное время"""
+
+    def __init__(self, vehicle_id: str):
+        super().__init__(f"Vehicle {vehicle_id} did not wake up")
+        self.vehicle_id = vehicle_id
+
+
+@dataclass
+class WakeResult:
+    """Результат ожидания готовности автомобиля"""
+    vehicle_id: str
+    online: bool
+    latency: float
+    woke: bool = False
+    attempts: int = 0
+
+
+class WakeManager:
+    """
+    Будит автомобиль и ждет, пока он перейдет в состояние online
+
+    После wake_up состояние опрашивается через дешевый GET /vehicles/{id}
+    с экспоненциальной задержкой до истечения timeout. Одновременные
+    операции с одним автомобилем разделяют одну попытку пробуждения.
+    """
+
+    def __init__(
+        self,
+        client: "TeslaAPIClient",
+        timeout: float = 60.0,
+        initial_delay: float = 1.0,
+        max_delay: float = 8.0,
+        backoff: float = 2.0,
+        online_grace: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Инициализация менеджера пробуждения
+
+        Args:
+            client: Tesla API клиент
+            timeout: Максимальное время ожидания пробуждения в секундах
+            initial_delay: Первая пауза между опросами состояния
+            max_delay: Максимальная пауза между опросами
+            backoff: Множитель паузы после каждого опроса
+            online_grace: Сколько секунд считать автомобиль online без проверки
+            clock: Источник времени (для тестов)
+            sleep: Функция ожидания (для тестов)
+        """
+        self.client = client
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.online_grace = online_grace
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        # vehicle_id -> (состояние, время последнего подтверждения)
+        self._known: Dict[str, tuple] = {}
+        self._flight = SingleFlight()
+
+    def mark_online(self, vehicle_id: str):
+        """Отметить, что автомобиль только что ответил"""
+        self._set_state(vehicle_id, "online")
+
+    def mark_asleep(self, vehicle_id: str):
+        """Отметить, что автомобиль спит или недоступен"""
+        self._set_state(vehicle_id, "asleep")
+
+    def known_state(self, vehicle_id: str) -> Optional[str]:
+        """Последнее известное состояние автомобиля"""
+        with self._lock:
+            entry = self._known.get(vehicle_id)
+        return entry[0] if entry else None
+
+    def ensure_awake(self, vehicle_id: str) -> WakeResult:
+        """
+        Дождаться, пока автомобиль будет online, разбудив его при необходимости
+
+        Args:
+            vehicle_id: ID автомобиля
+
+        Returns:
+            WakeResult с признаком готовности и измеренной задержкой пробуждения
+        """
+        with self._lock:
+            entry = self._known.get(vehicle_id)
+        if entry and entry[0] == "online" and self._clock() - entry[1] < self.online_grace:
+            return WakeResult(vehicle_id=vehicle_id, online=True, latency=0.0)
+
+        return self._flight.do(vehicle_id, lambda: self._wake(vehicle_id))
+
+    def _set_state(self, vehicle_id: str, state: str):
+        with self._lock:
+            self._known[vehicle_id] = (state, self._clock())
+
+    def _wake(self, vehicle_id: str) -> WakeResult:
+        started = self._clock()
+        if self.known_state(vehicle_id) != "asleep":
+            if self.client.get_vehicle(vehicle_id).state == "online":
+                self.mark_online(vehicle_id)
+                return WakeResult(vehicle_id=vehicle_id, online=True, latency=0.0)
+
+        deadline = started + self.timeout
+        delay = self.initial_delay
+        state = self.client.wake_up(vehicle_id).get("state")
+        attempts = 1
+        while state != "online":
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                self.mark_asleep(vehicle_id)
+                return WakeResult(
+                    vehicle_id=vehicle_id,
+                    online=False,
+                    latency=self._clock() - started,
+                    woke=True,
+                    attempts=attempts
+                )
+            self._sleep(min(delay, remaining))
+            delay = min(delay * self.backoff, self.max_delay)
+            state = self.client.get_vehicle(vehicle_id).state
+            if state == "asleep":
+                # Запрос на пробуждение мог потеряться - повторяем его
+                state = self.client.wake_up(vehicle_id).get("state")
+                attempts += 1
+
+        self.mark_online(vehicle_id)
+        return WakeResult(
+            vehicle_id=vehicle_id,
+            online=True,
+            latency=self._clock() - started,
+            woke=True,
+            attempts=attempts
+        )
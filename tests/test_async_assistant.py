@@ -0,0 +1,150 @@
+"""
+Тесты асинхронного AI ассистента
+"""
+
+import asyncio
+import os
+import unittest
+from unittest.mock import Mock
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.async_assistant import AsyncAIAssistant, Conversation
+
+
+class FakeCompletions:
+    """Заглушка chat.completions AsyncOpenAI: отвечает эхом с задержкой"""
+
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        self.calls.append(messages)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise ConnectionError("upstream down")
+        finally:
+            self.active -= 1
+        answer = "re: " + messages[-1]["content"]
+        if stream:
+            return self._stream(answer)
+        return Mock(
+            choices=[Mock(message=Mock(content=answer))],
+            usage=Mock(total_tokens=len(messages) * 10)
+        )
+
+    async def _stream(self, answer):
+        for word in answer.split(" "):
+            yield Mock(choices=[Mock(delta=Mock(content=word + " "))])
+        yield Mock(choices=[])
+
+
+def make_assistant(**kwargs):
+    completions = FakeCompletions(**{k: kwargs.pop(k) for k in ("delay", "fail") if k in kwargs})
+    client = Mock()
+    client.chat.completions = completions
+    return AsyncAIAssistant(client=client, **kwargs), completions
+
+
+class TestAsyncAIAssistant(unittest.TestCase):
+    """Тесты AsyncAIAssistant"""
+
+    def test_concurrency_cap(self):
+        """Запросы выполняются параллельно, но не больше max_concurrency"""
+        assistant, completions = make_assistant(max_concurrency=4)
+
+        responses = asyncio.run(assistant.generate_many([f"q{i}" for i in range(20)]))
+
+        self.assertEqual([r.content for r in responses], [f"re: q{i}" for i in range(20)])
+        self.assertEqual(completions.max_active, 4)
+
+    def test_sessions_are_isolated(self):
+        """У каждой сессии своя история; запросы разных сессий идут одновременно"""
+        assistant, completions = make_assistant(delay=0.02)
+
+        async def scenario():
+            alice, bob = assistant.session("alice"), assistant.session("bob")
+            await asyncio.gather(
+                assistant.generate_response("hi from alice", alice),
+                assistant.generate_response("hi from bob", bob),
+            )
+            await assistant.generate_response("again", alice)
+            return alice, bob
+
+        alice, bob = asyncio.run(scenario())
+
+        self.assertEqual(completions.max_active, 2)
+        self.assertEqual([m["content"] for m in alice.history],
+                         ["hi from alice", "re: hi from alice", "again", "re: again"])
+        self.assertEqual(len(bob.history), 2)
+        # Последний запрос alice содержит только ее историю
+        self.assertNotIn("hi from bob", [m["content"] for m in completions.calls[-1]])
+        self.assertIs(assistant.session("alice"), alice)
+
+    def test_conversation_turns_are_ordered(self):
+        """Одновременные запросы одного разговора попадают в историю по очереди"""
+        assistant, _ = make_assistant()
+        conversation = Conversation()
+
+        async def scenario():
+            await asyncio.gather(*(
+                assistant.generate_response(f"q{i}", conversation) for i in range(3)
+            ))
+
+        asyncio.run(scenario())
+        self.assertEqual(
+            [m["content"] for m in conversation.history],
+            ["q0", "re: q0", "q1", "re: q1", "q2", "re: q2"]
+        )
+
+    def test_stateless_call_and_error(self):
+        """Запрос без разговора не оставляет истории; ошибка становится текстом ответа"""
+        assistant, _ = make_assistant(fail=True)
+        conversation = Conversation()
+
+        response = asyncio.run(assistant.generate_response("hi", conversation))
+
+        self.assertIn("upstream down", response.content)
+        self.assertEqual(response.tokens_used, 0)
+        self.assertEqual(conversation.history, [])
+
+    def test_stream_response(self):
+        """Поток выдает фрагменты и после завершения пополняет историю"""
+        assistant, _ = make_assistant()
+        conversation = Conversation()
+
+        async def scenario():
+            return [d async for d in assistant.stream_response("как дела", conversation)]
+
+        deltas = asyncio.run(scenario())
+
+        self.assertEqual("".join(deltas), "re: как дела ")
+        self.assertEqual(conversation.history[-1]["content"], "re: как дела ")
+        self.assertFalse(conversation.lock.locked())
+
+    def test_session_eviction_and_history_limit(self):
+        """Давние сессии вытесняются, история ограничена бюджетом токенов"""
+        assistant, _ = make_assistant(max_sessions=2)
+        first = assistant.session("a")
+        assistant.session("b")
+        assistant.session("c")
+        self.assertIsNot(assistant.session("a"), first)
+
+        conversation = Conversation(budget=100, summary_budget=60)
+        for i in range(21):
+            conversation.add("user", str(i))
+        self.assertEqual([m["content"] for m in conversation.history], [str(i) for i in range(13, 21)])
+        self.assertIn("Пользователь: 12", conversation.summary)
+        self.assertLessEqual(conversation.tokens, 100)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,209 @@
+"""
+Тесты пакетных ответов AI для многих автомобилей
+"""
+
+import json
+import os
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.batch import context_window, plan_batches, run_batches
+from tesla_app.ai_assistant import AIAssistant
+from tesla_app.tesla_client import TeslaVehicle
+
+
+class FakeCompletions:
+    """chat.completions, отвечающий report по ID из запроса"""
+
+    def __init__(self, delay=0.0, drop=(), fail=()):
+        self.delay = delay
+        self.drop = set(drop)
+        self.fail = set(fail)
+        self.calls = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls.append(kwargs)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            prompt = kwargs["messages"][-1]["content"]
+            ids = [line[4:] for line in prompt.splitlines() if line.startswith("### ")]
+            if self.fail & set(ids):
+                raise ConnectionError("reset")
+            vehicles = [{"id": i, "text": f"advice {i}"} for i in ids if i not in self.drop]
+            function = Mock(arguments=json.dumps({"vehicles": vehicles}))
+            function.name = "report"
+            return Mock(
+                choices=[Mock(message=Mock(tool_calls=[Mock(function=function)]))],
+                usage=Mock(total_tokens=100 * len(ids)),
+            )
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_client(**kwargs):
+    completions = FakeCompletions(**kwargs)
+    return Mock(chat=Mock(completions=completions)), completions
+
+
+class TestPlanBatches(unittest.TestCase):
+    """Тесты plan_batches"""
+
+    def test_fits_capacity(self):
+        sizes = [(str(i), 100) for i in range(10)]
+        batches = plan_batches(sizes, capacity=1000, output_tokens=150)
+        self.assertEqual([len(b) for b in batches], [4, 4, 2])
+        self.assertEqual(sum(batches, []), [str(i) for i in range(10)])
+
+    def test_output_limit(self):
+        sizes = [(str(i), 10) for i in range(10)]
+        batches = plan_batches(sizes, capacity=10 ** 6, output_tokens=100, max_output_tokens=300)
+        self.assertEqual([len(b) for b in batches], [3, 3, 3, 1])
+
+    def test_oversized_vehicle_alone(self):
+        batches = plan_batches([("a", 10), ("b", 5000), ("c", 10)], capacity=1000, output_tokens=100)
+        self.assertEqual(batches, [["a"], ["b"], ["c"]])
+
+    def test_context_window(self):
+        self.assertEqual(context_window("gpt-4"), 8192)
+        self.assertEqual(context_window("gpt-4o-mini"), 128000)
+        self.assertEqual(context_window("unknown-model"), 8192)
+
+
+class TestRunBatches(unittest.TestCase):
+    """Тесты run_batches"""
+
+    def test_results_and_stats(self):
+        client, completions = make_client()
+        contexts = {str(i): "charge: battery_level=80" for i in range(30)}
+
+        result = run_batches(client, "gpt-4", "Дай совет", contexts)
+
+        self.assertEqual(result.results["7"], "advice 7")
+        self.assertEqual(len(result.results), 30)
+        self.assertEqual(result.errors, {})
+        # Ответ ограничен MAX_OUTPUT_TOKENS: 16 автомобилей на запрос
+        self.assertEqual(result.stats.batches, 2)
+        self.assertEqual(len(completions.calls), 2)
+        self.assertEqual(result.stats.tokens_per_vehicle, 100)
+        self.assertGreater(result.stats.vehicles_per_second, 0)
+
+    def test_small_window_splits(self):
+        client, completions = make_client()
+        contexts = {str(i): "x " * 400 for i in range(6)}
+
+        result = run_batches(client, "gpt-4", "Дай совет", contexts, window=2000)
+
+        self.assertEqual(len(result.results), 6)
+        self.assertGreater(len(completions.calls), 1)
+
+    def test_concurrency_bounded(self):
+        client, completions = make_client(delay=0.05)
+        contexts = {str(i): "charge: battery_level=80" for i in range(8)}
+
+        run_batches(client, "gpt-4", "Дай совет", contexts, max_concurrency=2, output_tokens=2048)
+
+        self.assertEqual(len(completions.calls), 4)
+        self.assertEqual(completions.peak, 2)
+
+    def test_missing_and_failed(self):
+        """Пропущенные моделью и упавшие пакеты попадают в errors"""
+        client, _ = make_client(drop={"1"}, fail={"3"})
+        contexts = {str(i): "charge: battery_level=80" for i in range(4)}
+
+        result = run_batches(client, "gpt-4", "Дай совет", contexts, output_tokens=2048)
+
+        self.assertEqual(sorted(result.results), ["0"])
+        self.assertIn("No answer", result.errors["1"])
+        self.assertIn("reset", result.errors["3"])
+        self.assertEqual(result.stats.failed, 3)
+
+
+class TestAdviceBatch(unittest.TestCase):
+    """AIAssistant.get_advice_batch"""
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_get_advice_batch(self, mock_openai_class):
+        client, completions = make_client()
+        mock_openai_class.return_value = client
+        assistant = AIAssistant(api_key="test_key")
+        vehicles = {i: {"charge_state": {"battery_level": 50 + i}} for i in range(3)}
+
+        result = assistant.get_advice_batch(vehicles)
+
+        self.assertEqual(len(completions.calls), 1)
+        self.assertIn("battery_level=52", completions.calls[0]["messages"][-1]["content"])
+        self.assertEqual(result.results["2"], "advice 2")
+        self.assertEqual(assistant.conversation_history, [])
+
+
+class TestCLIFleetAdvice(unittest.TestCase):
+    """advice all опрашивает только автомобили в сети"""
+
+    def test_advice_all(self):
+        from tesla_app.cli.main import TeslaAICLI
+        from tesla_app.batch import BatchResult
+
+        tesla = Mock()
+        tesla.get_fleet_data.return_value = [Mock(vehicle_id="1", data={"charge_state": {}}, error=None)]
+        ai = Mock()
+        ai.get_advice_batch.return_value = BatchResult(results={"1": "Зарядите"})
+        cli = TeslaAICLI(tesla, ai)
+        cli.registry.refreshed = True
+        cli.registry.updated_at = time.time()
+        cli.vehicles = [
+            Mock(id_s="1", state="online", display_name="A"),
+            Mock(id_s="2", state="asleep", display_name="B"),
+        ]
+
+        with patch('tesla_app.cli.main.console'), patch('tesla_app.cli.main._print_markdown') as printed:
+            cli.do_advice("all")
+
+        tesla.get_vehicles.assert_not_called()
+        self.assertEqual(tesla.get_fleet_data.call_args.args[0], ["1"])
+        self.assertIs(tesla.get_fleet_data.call_args.kwargs["wake"], False)
+        ai.get_advice_batch.assert_called_once_with({"1": {"charge_state": {}}})
+        printed.assert_called_once()
+
+    def test_stale_registry_refreshed(self):
+        """Устаревший реестр обновляется до выбора автомобилей в сети"""
+        from tesla_app.cli.main import TeslaAICLI
+        from tesla_app.batch import BatchResult
+
+        tesla = Mock()
+        tesla.get_vehicles.return_value = [
+            TeslaVehicle(id=1, vin="VIN1", display_name="A", color=None, tokens=[],
+                         state="asleep", in_service=False, id_s="1", vehicle_id=1),
+            TeslaVehicle(id=2, vin="VIN2", display_name="B", color=None, tokens=[],
+                         state="online", in_service=False, id_s="2", vehicle_id=2),
+        ]
+        tesla.get_fleet_data.return_value = [Mock(vehicle_id="2", data={"charge_state": {}}, error=None)]
+        ai = Mock()
+        ai.get_advice_batch.return_value = BatchResult(results={"2": "Зарядите"})
+        cli = TeslaAICLI(tesla, ai)
+        # Сохраненный реестр: первый автомобиль был в сети, второй спал
+        cli.vehicles = [
+            Mock(id_s="1", state="online", display_name="A"),
+            Mock(id_s="2", state="asleep", display_name="B"),
+        ]
+
+        with patch('tesla_app.cli.main.console'), patch('tesla_app.cli.main._print_markdown'):
+            cli.do_advice("all")
+
+        tesla.get_vehicles.assert_called_once()
+        self.assertEqual(tesla.get_fleet_data.call_args.args[0], ["2"])
+        self.assertFalse(cli.registry.is_stale)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,165 @@
+"""
+Тесты кеша ответов Tesla API
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.cache import MISS, ResponseCache
+from tesla_app.tesla_client import TeslaAPIClient
+
+
+class FakeClock:
+    """Управляемый источник времени"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    """Тесты ResponseCache"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(clock=self.clock)
+
+    def test_ttl_per_endpoint(self):
+        """Тест: drive_state истекает раньше charge_state"""
+        self.cache.set(("v1", "drive_state", None), {"speed": 10})
+        self.cache.set(("v1", "charge_state", None), {"battery_level": 80})
+
+        self.clock.now = 10.0
+
+        self.assertIs(self.cache.get(("v1", "drive_state", None)), MISS)
+        self.assertEqual(self.cache.get(("v1", "charge_state", None)), {"battery_level": 80})
+
+    def test_composite_ttl_is_minimum(self):
+        """Тест: TTL отфильтрованного vehicle_data - минимальный по разделам"""
+        self.assertEqual(self.cache.ttl_for("vehicle_data", ("charge_state", "drive_state")), 5.0)
+        self.assertEqual(self.cache.ttl_for("vehicle_data", ("charge_state",)), 60.0)
+
+    def test_lru_eviction_by_entries(self):
+        """Тест вытеснения давно использованных записей"""
+        cache = ResponseCache(max_entries=2, clock=self.clock)
+        cache.set(("v1", "charge_state", None), {"a": 1})
+        cache.set(("v2", "charge_state", None), {"a": 2})
+        cache.get(("v1", "charge_state", None))
+        cache.set(("v3", "charge_state", None), {"a": 3})
+
+        self.assertIsNot(cache.get(("v1", "charge_state", None)), MISS)
+        self.assertIs(cache.get(("v2", "charge_state", None)), MISS)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_eviction_by_bytes(self):
+        """Тест ограничения суммарного объема"""
+        cache = ResponseCache(max_bytes=100, clock=self.clock)
+        cache.set(("v1", "charge_state", None), {}, size=60)
+        cache.set(("v2", "charge_state", None), {}, size=60)
+
+        self.assertEqual(cache.stats.entries, 1)
+        self.assertEqual(cache.stats.bytes, 60)
+
+    def test_invalidate_sections(self):
+        """Тест сброса разделов и составных ответов с ними"""
+        self.cache.set(("v1", "climate_state", None), {})
+        self.cache.set(("v1", "charge_state", None), {})
+        self.cache.set(("v1", "vehicle_data", None), {})
+        self.cache.set(("v1", "vehicle_data", ("charge_state",)), {})
+        self.cache.set(("v2", "climate_state", None), {})
+
+        self.cache.invalidate("v1", ["climate_state"])
+
+        self.assertIs(self.cache.get(("v1", "climate_state", None)), MISS)
+        self.assertIs(self.cache.get(("v1", "vehicle_data", None)), MISS)
+        self.assertIsNot(self.cache.get(("v1", "vehicle_data", ("charge_state",))), MISS)
+        self.assertIsNot(self.cache.get(("v1", "charge_state", None)), MISS)
+        self.assertIsNot(self.cache.get(("v2", "climate_state", None)), MISS)
+
+    def test_generation_skips_stale_set(self):
+        """Тест: ответ, полученный до сброса, не попадает в кеш"""
+        generation = self.cache.generation("v1")
+        other = self.cache.generation("v2")
+        self.cache.invalidate("v1", ["vehicle_state"])
+
+        self.cache.set(("v1", "vehicle_state", None), {"locked": True}, generation=generation)
+        self.cache.set(("v2", "vehicle_state", None), {"locked": True}, generation=other)
+
+        self.assertIs(self.cache.get(("v1", "vehicle_state", None)), MISS)
+        self.assertIsNot(self.cache.get(("v2", "vehicle_state", None)), MISS)
+
+        generation = self.cache.generation("v2")
+        self.cache.clear()
+        self.cache.set(("v2", "vehicle_state", None), {}, generation=generation)
+        self.assertIs(self.cache.get(("v2", "vehicle_state", None)), MISS)
+
+    def test_stats(self):
+        """Тест счетчиков попаданий и промахов"""
+        self.cache.get(("v1", "charge_state", None))
+        self.cache.set(("v1", "charge_state", None), {"battery_level": 80})
+        self.cache.get(("v1", "charge_state", None))
+
+        stats = self.cache.stats
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+
+class TestClientCache(unittest.TestCase):
+    """Тесты кеша в TeslaAPIClient"""
+
+    def setUp(self):
+        self.client = TeslaAPIClient("test_token", cache=ResponseCache())
+        self.client.session = Mock()
+        self.client.session.get.return_value.json.return_value = {"response": {"locked": True}}
+        self.client.session.get.return_value.content = b'{"response": {"locked": true}}'
+        self.client.session.post.return_value.json.return_value = {"response": True}
+
+    def test_repeated_read_served_from_cache(self):
+        """Тест: повторное чтение не делает HTTP-запрос"""
+        first = self.client.get_vehicle_state("v1")
+        second = self.client.get_vehicle_state("v1")
+
+        self.assertEqual(first, second)
+        self.client.session.get.assert_called_once()
+        self.assertEqual(self.client.cache.stats.hits, 1)
+
+    def test_command_invalidates_state(self):
+        """Тест: блокировка дверей сбрасывает закешированное состояние"""
+        self.client.get_vehicle_state("v1")
+        self.client.lock_doors("v1", lock=False)
+        self.client.get_vehicle_state("v1")
+
+        self.assertEqual(self.client.session.get.call_count, 2)
+
+    def test_command_during_read_not_cached(self):
+        """Тест: чтение, начатое до команды, не кладет в кеш старое состояние"""
+        response = self.client.session.get.return_value
+
+        def get_during_unlock(*args, **kwargs):
+            self.client.lock_doors("v1", lock=False)
+            return response
+
+        self.client.session.get.side_effect = get_during_unlock
+        self.client.get_vehicle_state("v1")
+        self.client.session.get.side_effect = None
+        self.client.get_vehicle_state("v1")
+
+        self.assertEqual(self.client.session.get.call_count, 2)
+
+    def test_honk_keeps_cache(self):
+        """Тест: бибикание не меняет состояние и не сбрасывает кеш"""
+        self.client.get_vehicle_state("v1")
+        self.client.honk_horn("v1")
+        self.client.get_vehicle_state("v1")
+
+        self.client.session.get.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
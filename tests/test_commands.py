@@ -0,0 +1,165 @@
+"""
+Тесты планировщика команд
+"""
+
+import threading
+import time
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.commands import CommandScheduler
+
+
+class RecordingClient:
+    """Клиент, записывающий вызовы; первая команда каждой машины ждет сигнала"""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.gate = threading.Event()
+        self.active = 0
+        self.max_active = 0
+
+    def _record(self, *call):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.gate.wait(1)
+        time.sleep(0.005)
+        with self.lock:
+            self.calls.append(call)
+            self.active -= 1
+        return True
+
+    def honk_horn(self, vehicle_id):
+        return self._record(vehicle_id, "honk")
+
+    def lock_doors(self, vehicle_id, lock=True):
+        return self._record(vehicle_id, "lock" if lock else "unlock")
+
+    def set_temps(self, vehicle_id, driver_temp, passenger_temp=None):
+        return self._record(vehicle_id, "set_temps", driver_temp)
+
+    def start_climate(self, vehicle_id, temperature=22.0):
+        return self._record(vehicle_id, "start_climate", temperature)
+
+    def flash_lights(self, vehicle_id):
+        raise ConnectionError("timeout")
+
+
+class TestCommandScheduler(unittest.TestCase):
+    """Тесты CommandScheduler"""
+
+    def setUp(self):
+        self.client = RecordingClient()
+        self.scheduler = CommandScheduler(self.client, max_workers=4)
+
+    def tearDown(self):
+        self.client.gate.set()
+        self.scheduler.shutdown()
+
+    def test_fifo_per_vehicle(self):
+        """Тест: команды одного автомобиля выполняются по порядку и не параллельно"""
+        futures = [self.scheduler.submit("v1", "honk") for _ in range(3)]
+        futures.append(self.scheduler.submit("v1", "lock"))
+        self.client.gate.set()
+
+        self.assertTrue(all(f.result(timeout=2) for f in futures))
+        self.assertEqual(
+            [c[1] for c in self.client.calls],
+            ["honk", "honk", "honk", "lock"]
+        )
+        self.assertEqual(self.client.max_active, 1)
+
+    def test_parallel_across_vehicles(self):
+        """Тест: команды разным автомобилям выполняются параллельно"""
+        futures = [self.scheduler.submit(f"v{i}", "honk") for i in range(4)]
+        while self.client.active < 4:
+            time.sleep(0.001)
+        self.client.gate.set()
+
+        for future in futures:
+            future.result(timeout=2)
+        self.assertEqual(self.client.max_active, 4)
+
+    def test_lock_unlock_collapse(self):
+        """Тест: из lock -> unlock отправляется только unlock"""
+        first = self.scheduler.submit("v1", "honk")
+        lock = self.scheduler.submit("v1", "lock")
+        unlock = self.scheduler.submit("v1", "unlock")
+        self.client.gate.set()
+
+        self.assertTrue(unlock.result(timeout=2))
+        first.result(timeout=2)
+        self.assertTrue(lock.cancelled())
+        self.assertEqual([c[1] for c in self.client.calls], ["honk", "unlock"])
+        self.assertEqual(self.scheduler.stats.superseded, 1)
+
+    def test_set_temps_merge(self):
+        """Тест: повторные set_temps сливаются в один запрос с последней температурой"""
+        self.scheduler.submit("v1", "honk")
+        a = self.scheduler.submit("v1", "set_temps", driver_temp=20.0)
+        b = self.scheduler.submit("v1", "set_temps", driver_temp=23.0)
+        self.client.gate.set()
+
+        self.assertTrue(a.result(timeout=2))
+        self.assertTrue(b.result(timeout=2))
+        self.assertEqual(self.client.calls[-1], ("v1", "set_temps", 23.0))
+        self.assertEqual(len(self.client.calls), 2)
+        self.assertEqual(self.scheduler.stats.merged, 1)
+
+    def test_set_temps_not_merged_across_climate(self):
+        """Тест: set_temps не сливается через стоящую между ними команду климата"""
+        self.scheduler.submit("v1", "honk")
+        self.scheduler.submit("v1", "set_temps", driver_temp=20.0)
+        self.scheduler.submit("v1", "start_climate", temperature=22.0)
+        last = self.scheduler.submit("v1", "set_temps", driver_temp=25.0)
+        self.client.gate.set()
+
+        self.assertTrue(last.result(timeout=2))
+        self.assertEqual(self.client.calls[1:], [
+            ("v1", "set_temps", 20.0),
+            ("v1", "start_climate", 22.0),
+            ("v1", "set_temps", 25.0),
+        ])
+        self.assertEqual(self.scheduler.stats.merged, 0)
+
+    def test_error_goes_to_future(self):
+        """Тест: ошибка команды передается в future, очередь продолжает работу"""
+        failed = self.scheduler.submit("v1", "flash_lights")
+        after = self.scheduler.submit("v1", "honk")
+        self.client.gate.set()
+
+        with self.assertRaises(ConnectionError):
+            failed.result(timeout=2)
+        self.assertTrue(after.result(timeout=2))
+        self.assertEqual(self.scheduler.pending(), 0)
+
+    def test_unknown_command(self):
+        """Тест: неизвестная команда отклоняется сразу"""
+        with self.assertRaises(ValueError):
+            self.scheduler.submit("v1", "self_destruct")
+
+    def test_shutdown_with_queued_commands(self):
+        """Тест: очередь, ожидавшая при shutdown, выполняется до конца"""
+        first = self.scheduler.submit("v1", "honk")
+        queued = [
+            self.scheduler.submit("v1", "set_temps", driver_temp=21.0),
+            self.scheduler.submit("v1", "lock"),
+        ]
+        threading.Timer(0.05, self.client.gate.set).start()
+        self.scheduler.shutdown()
+
+        self.assertTrue(first.done())
+        for future in queued:
+            self.assertTrue(future.done())
+            self.assertTrue(future.result())
+        with self.assertRaises(RuntimeError):
+            self.scheduler.submit("v1", "honk")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
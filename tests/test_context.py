@@ -0,0 +1,103 @@
+"""
+Тесты компактного контекста автомобиля
+"""
+
+import os
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.context import build_context, relevant_topics
+from tesla_app.models import VehicleData
+from tesla_app.ai_assistant import AIAssistant, build_messages
+from tests.test_models import make_vehicle_data
+
+
+class TestBuildContext(unittest.TestCase):
+    """Тесты build_context"""
+
+    def setUp(self):
+        self.data = make_vehicle_data()
+
+    def test_relevant_topics(self):
+        """Темы определяются по словам запроса"""
+        self.assertEqual(relevant_topics("Сколько заряда в батарее?"), ["charge"])
+        # Больше совпавших слов - выше тема
+        self.assertEqual(relevant_topics("Где машина и закрыты ли двери?"), ["security", "location"])
+        self.assertEqual(relevant_topics("привет"), [])
+
+    def test_compact_format(self):
+        """Формат key=value по темам, без None, вложенных структур и лишних разделов"""
+        context = build_context(self.data, query="какой заряд?")
+
+        lines = context.text.splitlines()
+        self.assertTrue(lines[0].startswith("charge: battery_level=80 battery_range=250.5"))
+        self.assertIn("charging_state=Charging", lines[0])
+        self.assertNotIn("speed=", context.text)
+        self.assertNotIn("gui_settings", context.text)
+        self.assertEqual(context.topics[0], "charge")
+
+    def test_pruned_by_relevance(self):
+        """Для темы запроса - все поля, для остальных - только главное"""
+        context = build_context(self.data, query="какая температура в салоне?")
+        text = context.text
+
+        self.assertIn("outside_temp=10", text)
+        self.assertIn("battery_level=80", text)
+        self.assertNotIn("charge_limit_soc", text)
+        self.assertNotIn("odometer", build_context(self.data, query="где машина").text.split("vehicle:")[0])
+
+    def test_generic_query_includes_all_topics(self):
+        """Запрос без темы (рекомендации) получает все поля в пределах бюджета"""
+        context = build_context(self.data, query="дай совет")
+        self.assertEqual(context.topics, ["charge", "climate", "location", "security", "vehicle"])
+        self.assertIn("charge_limit_soc=90", context.text)
+
+    def test_budget_and_savings(self):
+        """Контекст укладывается в бюджет и меньше str(vehicle_data)"""
+        for budget in (20, 60, 300):
+            context = build_context(self.data, budget=budget)
+            self.assertLessEqual(context.tokens, budget)
+            self.assertGreater(context.saved, 0)
+            self.assertEqual(context.saved, context.full_tokens - context.tokens)
+
+    def test_explicit_topics_and_models(self):
+        """Явный список тем и VehicleData на входе"""
+        context = build_context(VehicleData.from_dict(self.data), topics=["security"])
+        self.assertEqual(context.topics, ["security"])
+        self.assertTrue(context.text.startswith("security: locked=true sentry_mode=false"))
+
+    def test_unknown_data(self):
+        """Данные без разделов vehicle_data дают пустой контекст"""
+        self.assertEqual(build_context({"foo": 1}).text, "")
+        self.assertEqual(build_context(None).text, "")
+
+
+class TestAssistantContext(unittest.TestCase):
+    """Промпты ассистента используют компактный контекст"""
+
+    def test_build_messages(self):
+        """Словарь состояния в промпте заменяется компактным контекстом"""
+        messages = build_messages("какой заряд?", [], vehicle_context=make_vehicle_data())
+        system = messages[0]["content"]
+        self.assertIn("battery_level=80", system)
+        self.assertNotIn("{'", system)
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_prompts_report_savings(self, mock_openai_class):
+        create = mock_openai_class.return_value.chat.completions.create
+        create.return_value = Mock(choices=[Mock(message=Mock(content="ok"))], usage=None)
+        assistant = AIAssistant(api_key="test_key")
+
+        assistant.get_advice(make_vehicle_data())
+        prompt = create.call_args.kwargs["messages"][-1]["content"]
+
+        self.assertIn("charge: battery_level=80", prompt)
+        self.assertNotIn("'vehicle_config'", prompt)
+        self.assertGreater(assistant.tokens_saved, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,141 @@
+"""
+Тесты движка изменений vehicle_data
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.delta import DeltaEngine, FieldChange, diff
+from tesla_app.models import VehicleData
+from tesla_app.tesla_client import TeslaAPIClient
+
+
+def snapshot(battery_level=80, speed=None, locked=True, timestamp=1):
+    return {
+        "id": 1,
+        "charge_state": {"battery_level": battery_level, "timestamp": timestamp},
+        "drive_state": {"speed": speed, "timestamp": timestamp},
+        "vehicle_state": {"locked": locked, "tpms": [2.9, 2.9, 2.9, 2.9]},
+    }
+
+
+class TestDiff(unittest.TestCase):
+    """Тесты функции diff"""
+
+    def test_nested_changes(self):
+        """Изменения выдаются по путям листьев"""
+        old = snapshot()
+        new = snapshot(battery_level=79, locked=False)
+
+        self.assertEqual(diff(old, new), [
+            FieldChange("charge_state.battery_level", 80, 79),
+            FieldChange("vehicle_state.locked", True, False),
+        ])
+
+    def test_added_and_removed(self):
+        """Появившиеся и пропавшие поля и разделы"""
+        old = {"a": {"x": 1}, "b": 2}
+        new = {"a": {"x": 1, "y": 3}, "c": {"z": 4}}
+
+        self.assertEqual(diff(old, new), [
+            FieldChange("a.y", None, 3),
+            FieldChange("c.z", None, 4),
+            FieldChange("b", 2, None),
+        ])
+
+    def test_lists_compared_whole(self):
+        """Списки сравниваются целиком"""
+        old, new = {"l": [1, 2]}, {"l": [1, 3]}
+        self.assertEqual(diff(old, new), [FieldChange("l", [1, 2], [1, 3])])
+
+    def test_equal(self):
+        """Одинаковые ответы не дают изменений"""
+        self.assertEqual(diff(snapshot(), snapshot()), [])
+
+
+class TestDeltaEngine(unittest.TestCase):
+    """Тесты DeltaEngine"""
+
+    def test_first_update_returns_all_fields(self):
+        """Первый снимок выдает все поля, повторный - только изменения"""
+        engine = DeltaEngine()
+
+        first = engine.update("v1", snapshot())
+        self.assertIn(FieldChange("charge_state.battery_level", None, 80), first)
+
+        self.assertEqual(engine.update("v1", snapshot()), [])
+        self.assertEqual(
+            engine.update("v1", snapshot(speed=50)),
+            [FieldChange("drive_state.speed", None, 50)]
+        )
+
+    def test_ignore_patterns(self):
+        """Игнорируемые поля не выдаются"""
+        engine = DeltaEngine(ignore=["*.timestamp"])
+        engine.update("v1", snapshot())
+
+        self.assertEqual(engine.update("v1", snapshot(timestamp=2)), [])
+
+    def test_partial_update(self):
+        """Частичный ответ сравнивается и сливается только по своим разделам"""
+        engine = DeltaEngine()
+        engine.update("v1", snapshot())
+
+        changes = engine.update("v1", {"charge_state": {"battery_level": 70, "timestamp": 1}}, partial=True)
+
+        self.assertEqual(changes, [FieldChange("charge_state.battery_level", 80, 70)])
+        self.assertEqual(engine.snapshot("v1")["vehicle_state"]["locked"], True)
+
+    def test_subscriptions(self):
+        """Подписчик получает только свои поля и только при их изменении"""
+        engine = DeltaEngine()
+        charge = Mock()
+        locked = Mock()
+        engine.subscribe(["charge_state"], charge)
+        subscription = engine.subscribe(["*.locked"], locked)
+        engine.update("v1", snapshot())
+        charge.reset_mock()
+        locked.reset_mock()
+
+        engine.update("v1", snapshot(speed=10))
+        charge.assert_not_called()
+        locked.assert_not_called()
+
+        engine.update("v1", snapshot(battery_level=79, locked=False))
+        charge.assert_called_once_with("v1", [FieldChange("charge_state.battery_level", 80, 79)])
+        locked.assert_called_once_with("v1", [FieldChange("vehicle_state.locked", True, False)])
+
+        subscription.unsubscribe()
+        engine.update("v1", snapshot(locked=True))
+        locked.assert_called_once()
+
+    def test_accepts_vehicle_data(self):
+        """VehicleData сравнивается как словарь"""
+        engine = DeltaEngine()
+        engine.update("v1", VehicleData.from_dict(snapshot()))
+
+        self.assertEqual(
+            engine.update("v1", VehicleData.from_dict(snapshot(battery_level=60))),
+            [FieldChange("charge_state.battery_level", 80, 60)]
+        )
+
+    def test_client_feeds_engine(self):
+        """Клиент передает в движок ответы отдельных разделов"""
+        engine = DeltaEngine()
+        changes = Mock()
+        engine.subscribe(["charge_state.battery_level"], changes)
+        client = TeslaAPIClient("token", delta=engine)
+        client.session = Mock()
+        client.session.get.return_value.json.return_value = {"response": {"battery_level": 70}}
+
+        client.get_charge_state("v1")
+
+        changes.assert_called_once_with("v1", [FieldChange("charge_state.battery_level", None, 70)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
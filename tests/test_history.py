@@ -0,0 +1,105 @@
+"""
+Тесты истории разговора с бюджетом токенов
+"""
+
+import os
+import unittest
+from unittest.mock import patch
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app import tokens
+from tesla_app.history import ChatHistory, local_summary
+
+
+class TestChatHistory(unittest.TestCase):
+    """Тесты ChatHistory"""
+
+    def setUp(self):
+        # Оценка без tiktoken, чтобы размеры не зависели от окружения
+        patcher = patch.object(tokens, "_encoder", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_short_messages_kept(self):
+        """Пока бюджет не превышен, сообщения хранятся без сводки"""
+        history = ChatHistory(budget=200)
+        for i in range(10):
+            history.add("user", f"q{i}")
+            history.add("assistant", f"a{i}")
+
+        self.assertEqual(len(history), 20)
+        self.assertEqual(history.summary, "")
+        self.assertEqual(history.as_messages(), history.messages)
+
+    def test_fold_into_summary(self):
+        """Сверх бюджета старые сообщения сворачиваются в сводку"""
+        history = ChatHistory(budget=120, summary_budget=60)
+        for i in range(20):
+            history.add("user", f"Вопрос {i}")
+            history.add("assistant", f"Ответ {i}. Подробности не нужны.")
+            self.assertLessEqual(history.tokens, 120)
+
+        self.assertEqual(history.messages[-1]["content"], "Ответ 19. Подробности не нужны.")
+        # Свернута пара целиком: история начинается с вопроса
+        self.assertEqual(history.messages[0]["role"], "user")
+        # В сводку попадает только первое предложение ответа
+        self.assertIn("Ассистент: Ответ", history.summary)
+        self.assertNotIn("Подробности", history.summary)
+
+        messages = history.as_messages()
+        self.assertEqual(messages[0]["role"], "system")
+        self.assertIn(history.summary, messages[0]["content"])
+        self.assertEqual(messages[1:], history.messages)
+
+    def test_oversized_message(self):
+        """Одно длинное сообщение не раздувает историю"""
+        history = ChatHistory(budget=100, summary_budget=50)
+        history.add("user", "Расскажи все")
+        history.add("assistant", "Начало ответа. " + "текст " * 200)
+
+        self.assertLessEqual(history.tokens, 100)
+        self.assertIn("Начало ответа", history.summary)
+
+    def test_custom_summarizer(self):
+        """Сводку может строить внешняя функция, например LLM"""
+        calls = []
+
+        def summarizer(previous, messages):
+            calls.append(len(messages))
+            return f"{previous}+{len(messages)}"
+
+        history = ChatHistory(budget=50, summary_budget=30, summarizer=summarizer)
+        for i in range(10):
+            history.add("user", f"message {i}")
+
+        self.assertTrue(calls)
+        self.assertTrue(history.summary.startswith("+"))
+
+    def test_clear(self):
+        """clear удаляет сообщения и сводку"""
+        history = ChatHistory(budget=50, summary_budget=30)
+        for i in range(10):
+            history.add("user", f"message {i}")
+        history.clear()
+
+        self.assertEqual(history.as_messages(), [])
+        self.assertEqual(history.tokens, 0)
+
+    def test_invalid_budget(self):
+        """Сводка должна быть меньше бюджета"""
+        with self.assertRaises(ValueError):
+            ChatHistory(budget=100, summary_budget=100)
+
+    def test_local_summary(self):
+        """Локальная сводка - строка на сообщение с ролью"""
+        summary = local_summary("Ранее", [
+            {"role": "user", "content": "Какой заряд?"},
+            {"role": "assistant", "content": "80%. Хватит на 300 км."},
+        ])
+        self.assertEqual(summary, "Ранее\nПользователь: Какой заряд?\nАссистент: 80%.")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
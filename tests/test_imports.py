@@ -0,0 +1,89 @@
+"""
+Тесты времени импорта пакета
+
+Импорт измеряется в отдельном процессе через python -X importtime:
+модули, уже загруженные в процессе тестов, иначе не учитывались бы.
+"""
+
+import os
+import subprocess
+import unittest
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджет импорта в миллисекундах; с запасом относительно медленных CI-машин
+IMPORT_BUDGET_MS = {
+    "tesla_app": 50,
+    "tesla_app.tesla_client": 400,
+    "tesla_app.cli.main": 500,
+}
+
+# Тяжелые зависимости, которые не должны загружаться без обращения к ним
+HEAVY_MODULES = ("openai", "pydantic", "httpx", "aiohttp", "rich.markdown")
+
+
+def import_profile(module: str):
+    """
+    Импортировать модуль в чистом процессе
+
+    Returns:
+        (время импорта модуля в мс, множество загруженных модулей)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    elapsed = None
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            elapsed = int(cumulative) / 1000.0
+    return elapsed, loaded
+
+
+class TestImportTime(unittest.TestCase):
+    """Тесты бюджета времени импорта"""
+
+    def test_no_heavy_dependencies(self):
+        """Пакет, клиент и CLI не загружают openai, aiohttp и разметку rich"""
+        for module in IMPORT_BUDGET_MS:
+            with self.subTest(module=module):
+                _, loaded = import_profile(module)
+                self.assertEqual([m for m in HEAVY_MODULES if m in loaded], [])
+
+    def test_budget(self):
+        """Время импорта в пределах бюджета (лучшая из трех попыток)"""
+        for module, budget in IMPORT_BUDGET_MS.items():
+            with self.subTest(module=module):
+                elapsed = min(import_profile(module)[0] for _ in range(3))
+                self.assertLess(elapsed, budget, f"import {module} took {elapsed:.1f} ms")
+
+    def test_lazy_exports(self):
+        """Экспортируемые имена доступны и загружают свой модуль при обращении"""
+        code = (
+            "import sys, tesla_app\n"
+            "assert 'tesla_app.streaming' not in sys.modules\n"
+            "from tesla_app import TelemetryRecord, TeslaAPIClient\n"
+            "assert 'tesla_app.streaming' in sys.modules\n"
+            "assert set(tesla_app.__all__) <= set(dir(tesla_app))\n"
+            "assert all(getattr(tesla_app, name) for name in tesla_app.__all__)\n"
+            "try:\n"
+            "    tesla_app.missing\n"
+            "except AttributeError:\n"
+            "    pass\n"
+            "else:\n"
+            "    raise SystemExit('missing attribute did not raise')\n"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
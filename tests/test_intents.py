@@ -0,0 +1,175 @@
+"""
+Тесты локального распознавания команд
+"""
+
+import json
+import os
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.intents import DEFAULT_THRESHOLD, classify, classify_all, split_clauses
+from tesla_app.ai_assistant import AIAssistant
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_corpus.jsonl")
+
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def tool_response(*calls):
+    """Ответ chat.completions с вызовами инструментов (имя, JSON аргументов)"""
+    tool_calls = []
+    for name, arguments in calls:
+        function = Mock(arguments=arguments)
+        function.name = name
+        tool_calls.append(Mock(function=function))
+    return Mock(choices=[Mock(message=Mock(content=None, tool_calls=tool_calls))], usage=None)
+
+
+class TestClassify(unittest.TestCase):
+    """Тесты intents.classify"""
+
+    def test_corpus(self):
+        """Команды корпуса распознаются уверенно, запросы вне домена - нет"""
+        for case in load_corpus():
+            intent = classify(case["text"])
+            with self.subTest(text=case["text"]):
+                if case["command"] == "unknown":
+                    self.assertLess(intent.confidence, DEFAULT_THRESHOLD)
+                elif case["command"] != "unknown_ok":
+                    self.assertEqual(intent.command, case["command"])
+                    self.assertGreaterEqual(intent.confidence, DEFAULT_THRESHOLD)
+                    if "parameters" in case:
+                        self.assertEqual(intent.parameters, case["parameters"])
+
+    def test_lock_questions_are_not_commands(self):
+        """Вопрос о замках не выполняет lock/unlock без LLM"""
+        for text in ("is the car unlocked?", "машина открыта?", "двери закрыты?", "is the car locked?"):
+            with self.subTest(text=text):
+                intents = classify_all(text)
+                self.assertNotIn(intents[0].command, ("lock", "unlock"))
+                self.assertEqual(intents[0].parameters, {"what": "security"})
+
+    def test_temperature(self):
+        """Температура извлекается из запроса и переводится из °F"""
+        self.assertEqual(classify("включи климат на 22,5°").parameters, {"temperature": 22.5})
+        self.assertEqual(classify("set climate to 70 F").parameters, {"temperature": 21.1})
+        self.assertEqual(classify("включи климат").parameters, {})
+
+    def test_typos(self):
+        """Одна опечатка в основе допускается, но с меньшей уверенностью"""
+        exact, typo = classify("разблокируй"), classify("разблакируй")
+        self.assertEqual(typo.command, "unlock")
+        self.assertLess(typo.confidence, exact.confidence)
+
+    def test_unknown(self):
+        """Пустой и бессмысленный запрос"""
+        for text in ("", "   ", "12345", "абракадабра"):
+            self.assertEqual(classify(text).command, "unknown")
+            self.assertEqual(classify(text).confidence, 0.0)
+
+    def test_to_dict(self):
+        """Результат в формате parse_command"""
+        parsed = classify("включи климат на 23 градуса").to_dict()
+        self.assertEqual(parsed["command"], "start_climate")
+        self.assertEqual(parsed["parameters"], {"temperature": 23.0})
+        self.assertGreaterEqual(parsed["confidence"], DEFAULT_THRESHOLD)
+
+
+class TestClassifyAll(unittest.TestCase):
+    """Тесты распознавания нескольких команд в одном запросе"""
+
+    def test_split_clauses(self):
+        self.assertEqual(split_clauses("заблокируй машину и включи климат на 21"),
+                         ["заблокируй машину", "включи климат на 21"])
+        self.assertEqual(split_clauses("lock the car, then honk"), ["lock the car", "honk"])
+        self.assertEqual(split_clauses("побибикай, а потом мигни фарами"), ["побибикай", "мигни фарами"])
+        self.assertEqual(split_clauses("включи климат на 21,5 градуса"), ["включи климат на 21,5 градуса"])
+
+    def test_multiple_commands(self):
+        intents = classify_all("заблокируй машину и включи климат на 21")
+        self.assertEqual([(i.command, i.parameters) for i in intents],
+                         [("lock", {}), ("start_climate", {"temperature": 21.0})])
+        self.assertTrue(all(i.confidence >= DEFAULT_THRESHOLD for i in intents))
+
+    def test_unrecognized_part_falls_back_to_whole(self):
+        """Часть без команды - запрос распознается целиком"""
+        intents = classify_all("открой, пожалуйста, машину")
+        self.assertEqual([i.command for i in intents], ["unlock"])
+
+    def test_status_questions_merged(self):
+        intents = classify_all("какой заряд и где машина?")
+        self.assertEqual([(i.command, i.parameters) for i in intents], [("get_status", {"what": "all"})])
+
+
+class TestParseCommandFastPath(unittest.TestCase):
+    """parse_command обращается к LLM только при низкой уверенности"""
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_local_command_skips_llm(self, mock_openai_class):
+        assistant = AIAssistant(api_key="test_key")
+
+        parsed = assistant.parse_command("заблокируй машину", {})
+
+        self.assertEqual(parsed["command"], "lock")
+        mock_openai_class.return_value.chat.completions.create.assert_not_called()
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_unsure_falls_back_to_llm(self, mock_openai_class):
+        create = mock_openai_class.return_value.chat.completions.create
+        create.return_value = tool_response()
+        assistant = AIAssistant(api_key="test_key")
+
+        parsed = assistant.parse_command("открой багажник", {})
+
+        create.assert_called_once()
+        self.assertEqual(parsed["command"], "unknown")
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_fast_path_can_be_disabled(self, mock_openai_class):
+        create = mock_openai_class.return_value.chat.completions.create
+        create.return_value = tool_response(("lock", "{}"))
+        assistant = AIAssistant(api_key="test_key", intent_threshold=None)
+
+        assistant.parse_command("заблокируй машину", {})
+
+        create.assert_called_once()
+
+
+class TestCLIFastPath(unittest.TestCase):
+    """CLI выполняет распознанные команды без AI и без чтения состояния"""
+
+    def test_default_without_ai(self):
+        from tesla_app.cli.main import TeslaAICLI
+
+        tesla = Mock()
+        cli = TeslaAICLI(tesla)
+        cli.current_vehicle = Mock(id_s="1")
+
+        with patch('tesla_app.cli.main.console'):
+            cli.default("включи климат на 21 градус")
+
+        tesla.start_climate.assert_called_once_with("1", temperature=21.0)
+        tesla.get_vehicle_state.assert_not_called()
+
+    def test_default_multiple_commands(self):
+        from tesla_app.cli.main import TeslaAICLI
+
+        tesla = Mock()
+        cli = TeslaAICLI(tesla)
+        cli.current_vehicle = Mock(id_s="1")
+
+        with patch('tesla_app.cli.main.console'):
+            cli.default("заблокируй машину и включи климат на 21")
+
+        tesla.lock_doors.assert_called_once_with("1", lock=True)
+        tesla.start_climate.assert_called_once_with("1", temperature=21.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
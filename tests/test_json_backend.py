@@ -0,0 +1,63 @@
+"""
+Тесты выбора бэкенда JSON
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.json_backend import BACKENDS, load_backend
+from tesla_app.tesla_client import TeslaAPIClient
+
+
+class TestJSONBackend(unittest.TestCase):
+    """Тесты json_backend"""
+
+    def test_backends_roundtrip(self):
+        """Все установленные бэкенды декодируют bytes и кодируют в bytes"""
+        payload = {"response": {"battery_level": 80, "car_version": "2024.2.7 ✓"}}
+        for name in BACKENDS:
+            try:
+                backend = load_backend(name)
+            except ImportError:
+                continue
+            with self.subTest(backend=name):
+                encoded = backend.dumps(payload)
+                self.assertIsInstance(encoded, bytes)
+                self.assertEqual(backend.loads(encoded), payload)
+
+    def test_auto_falls_back_to_stdlib(self):
+        """Без orjson и msgspec выбирается стандартный json"""
+        def missing():
+            raise ImportError
+
+        with patch.dict(BACKENDS, {"orjson": missing, "msgspec": missing}):
+            self.assertEqual(load_backend().name, "json")
+
+    def test_unknown_backend(self):
+        """Неизвестное имя бэкенда - ValueError"""
+        with self.assertRaises(ValueError):
+            load_backend("yaml")
+
+
+class TestClientDecoding(unittest.TestCase):
+    """Тесты декодирования ответов клиентом"""
+
+    def test_decodes_raw_content(self):
+        """Ответ декодируется из байтов тела, а не через response.json()"""
+        client = TeslaAPIClient("token", json_backend="json")
+        response = Mock(status_code=200, content=b'{"response": {"battery_level": 80}}')
+        client.session.request = Mock(return_value=response)
+
+        with patch.object(client._json, "loads", wraps=client._json.loads) as loads:
+            self.assertEqual(client.get_charge_state("1"), {"battery_level": 80})
+
+        loads.assert_called_once_with(response.content)
+        response.json.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
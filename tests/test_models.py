@@ -0,0 +1,149 @@
+"""
+Тесты компактных моделей состояния автомобиля
+"""
+
+import json
+import tracemalloc
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.models import ChargeState, DriveState, VehicleData
+from tesla_app.tesla_client import TeslaAPIClient, TeslaVehicle
+
+
+def make_vehicle_data(i: int = 0):
+    """Ответ vehicle_data, похожий на настоящий"""
+    return {
+        "id": 1000 + i,
+        "vin": f"5YJ3E1EA{i:09d}",
+        "state": "online",
+        "charge_state": {
+            "battery_level": 80, "battery_range": 250.5, "est_battery_range": 230.1,
+            "charging_state": "Charging", "charge_limit_soc": 90, "charge_rate": 30.0,
+            "charger_power": 11, "charger_voltage": 240, "charger_actual_current": 48,
+            "time_to_full_charge": 1.5, "charge_port_door_open": True,
+            "timestamp": 1700000000000 + i, "charge_port_latch": "Engaged",
+            "scheduled_charging_mode": "Off", "battery_heater_on": False,
+        },
+        "drive_state": {
+            "latitude": 55.75 + i / 1e4, "longitude": 37.61, "heading": 90, "speed": None,
+            "power": 0, "shift_state": None, "gps_as_of": 1700000000, "timestamp": 1700000000000,
+        },
+        "climate_state": {
+            "inside_temp": 21.5, "outside_temp": 10.0, "driver_temp_setting": 22.0,
+            "passenger_temp_setting": 22.0, "is_climate_on": False, "fan_status": 0,
+            "seat_heater_left": 0, "seat_heater_right": 0,
+        },
+        "vehicle_state": {
+            "locked": True, "odometer": 12345.6, "sentry_mode": False,
+            "car_version": "2024.2.7", "df": 0, "dr": 0, "pf": 0, "pr": 0, "ft": 0, "rt": 0,
+            "tpms_pressure_fl": 2.9, "tpms_pressure_fr": 2.9,
+        },
+        "gui_settings": {"gui_distance_units": "km/hr", "gui_temperature_units": "C"},
+        "vehicle_config": {"car_type": "model3", "trim_badging": "74d", "wheel_type": "Pinwheel18"},
+    }
+
+
+class TestStateModels(unittest.TestCase):
+    """Тесты моделей разделов"""
+
+    def test_models_use_slots(self):
+        """Модели не создают __dict__ на экземпляр"""
+        data = VehicleData.from_dict(make_vehicle_data())
+        for model in (data.charge_state, data.drive_state, data.climate_state, data.vehicle_state):
+            self.assertFalse(hasattr(model, "__dict__"))
+        self.assertFalse(hasattr(data, "__dict__"))
+        self.assertFalse(hasattr(TeslaVehicle(1, "VIN", "Car", None, [], "online", False, "1", 1), "__dict__"))
+
+    def test_typed_fields(self):
+        """Известные поля доступны как атрибуты"""
+        data = VehicleData.from_dict(make_vehicle_data())
+        self.assertEqual(data.charge_state.battery_level, 80)
+        self.assertEqual(data.drive_state.latitude, 55.75)
+        self.assertTrue(data.vehicle_state.locked)
+        self.assertEqual(data.climate_state.inside_temp, 21.5)
+
+    def test_sections_decoded_lazily(self):
+        """Раздел разбирается в модель при первом обращении и переиспользуется"""
+        data = VehicleData.from_dict(make_vehicle_data())
+        self.assertIsNone(data._charge_state)
+        self.assertIsNone(data._drive_state)
+
+        charge = data.charge_state
+        self.assertIs(data.charge_state, charge)
+        self.assertIs(data._drive_state, data.drive_state)
+
+    def test_dict_access_compatible(self):
+        """Доступ как к словарю работает и для полей вне модели"""
+        raw = make_vehicle_data()
+        data = VehicleData.from_dict(raw)
+
+        self.assertEqual(data["charge_state"], raw["charge_state"])
+        self.assertEqual(data.get("vin"), raw["vin"])
+        self.assertEqual(data.to_dict(), raw)
+        self.assertIn("gui_settings", data)
+        self.assertEqual(data.charge_state["charge_port_latch"], "Engaged")
+        self.assertEqual(data.charge_state.get("battery_level"), 80)
+        self.assertEqual(data.drive_state.get("speed", "N/A"), "N/A")
+        self.assertEqual(data.charge_state.to_dict(), raw["charge_state"])
+
+    def test_missing_section(self):
+        """Отсутствующий раздел дает модель с пустыми полями"""
+        data = VehicleData.from_dict({"id": 1})
+        self.assertIsNone(data.charge_state.battery_level)
+        self.assertEqual(data.charge_state.to_dict(), {})
+
+    def test_standalone_model(self):
+        """Модель можно создать без исходного ответа"""
+        charge = ChargeState.from_dict({"battery_level": 50, "unknown": 1})
+        self.assertEqual(charge.battery_level, 50)
+        self.assertNotIn("unknown", charge)
+        self.assertEqual(charge, ChargeState(battery_level=50))
+        self.assertNotEqual(charge, DriveState())
+
+    def test_smaller_than_dict(self):
+        """Ответ в виде VehicleData занимает меньше памяти, чем дерево словарей"""
+        payloads = [json.dumps({"response": make_vehicle_data(i)}).encode() for i in range(200)]
+
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            dicts = [json.loads(p)["response"] for p in payloads]
+            dict_bytes = tracemalloc.get_traced_memory()[0] - base
+            del dicts
+
+            base = tracemalloc.get_traced_memory()[0]
+            models = [VehicleData(bytes(bytearray(p))) for p in payloads]
+            for data in models:
+                data.charge_state, data.drive_state
+            model_bytes = tracemalloc.get_traced_memory()[0] - base
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(model_bytes, dict_bytes / 2)
+
+
+class TestClientModels(unittest.TestCase):
+    """Тесты получения моделей через клиент"""
+
+    def test_get_vehicle_model(self):
+        """get_vehicle_model возвращает VehicleData из тела ответа"""
+        client = TeslaAPIClient(access_token="token")
+        body = json.dumps({"response": make_vehicle_data()}).encode()
+        response = Mock(status_code=200, content=body)
+        client.session.request = Mock(return_value=response)
+
+        data = client.get_vehicle_model("1", endpoints=["charge_state"])
+
+        self.assertIsInstance(data, VehicleData)
+        self.assertEqual(data.charge_state.battery_level, 80)
+        params = client.session.request.call_args[1]["params"]
+        self.assertEqual(params, {"endpoints": "charge_state"})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,161 @@
+"""
+Тесты кеша разобранных команд
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.parse_cache import ParseCache, normalize
+from tesla_app.ai_assistant import AIAssistant
+
+
+def tool_response(*calls):
+    """Ответ chat.completions с вызовами инструментов (имя, JSON аргументов)"""
+    tool_calls = []
+    for name, arguments in calls:
+        function = Mock(arguments=arguments)
+        function.name = name
+        tool_calls.append(Mock(function=function))
+    return Mock(choices=[Mock(message=Mock(content=None, tool_calls=tool_calls))], usage=None)
+
+
+class TestNormalize(unittest.TestCase):
+    """Тесты нормализации запроса"""
+
+    def test_equivalent_phrases(self):
+        """Регистр, пунктуация, пробелы и слова-связки не влияют на ключ"""
+        variants = [
+            "Открой багажник",
+            "  открой   багажник!!! ",
+            "ну открой багажник, пожалуйста",
+            "пожалуйста, открой-ка багажник",
+        ]
+        self.assertEqual({normalize(v) for v in variants}, {"открой багажник"})
+        self.assertEqual(normalize("Please, open the TRUNK now"), normalize("open the trunk"))
+
+    def test_meaning_preserved(self):
+        """Числа и порядок значимых слов сохраняются"""
+        self.assertNotEqual(normalize("климат 21,5"), normalize("климат 22"))
+        self.assertEqual(normalize("климат 21,5"), normalize("климат 21.5"))
+        self.assertNotEqual(normalize("открой окна"), normalize("окна открой не"))
+
+    def test_question_kept(self):
+        """Вопрос и команда из тех же слов - разные ключи"""
+        self.assertNotEqual(normalize("машина открыта?"), normalize("машина открыта"))
+        self.assertEqual(normalize("Машина открыта??"), normalize("машина открыта ?"))
+        self.assertEqual(normalize("машина открыта?"), "машина открыта ?")
+
+
+class TestParseCache(unittest.TestCase):
+    """Тесты ParseCache"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "cache", "parse.json")
+        self.now = [1000.0]
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def make(self, **kwargs):
+        return ParseCache(self.path, clock=lambda: self.now[0], **kwargs)
+
+    def test_hit_and_stats(self):
+        """Попадание по нормализованному ключу и доля попаданий"""
+        cache = self.make()
+        cache.set("Открой багажник", {"command": "open_trunk", "parameters": {}})
+
+        self.assertIsNone(cache.get("открой окна"))
+        self.assertEqual(cache.get("ну открой багажник!")["command"], "open_trunk")
+        self.assertIsNone(cache.get("открой багажник", model="other"))
+
+        stats = cache.stats
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 2, 1))
+        self.assertAlmostEqual(stats.hit_rate, 1 / 3)
+
+    def test_values_are_copies(self):
+        """Изменение результата не портит кеш"""
+        cache = self.make()
+        cache.set("x", {"command": "a", "parameters": {}})
+        cache.get("x")["parameters"]["temperature"] = 30
+        self.assertEqual(cache.get("x")["parameters"], {})
+
+    def test_lru_and_ttl(self):
+        """Вытеснение самых давних записей и истечение TTL"""
+        cache = self.make(max_entries=2, ttl=60)
+        cache.set("a", {"command": "a"})
+        cache.set("b", {"command": "b"})
+        cache.get("a")
+        cache.set("c", {"command": "c"})
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+
+        self.now[0] += 61
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats.evictions, 2)
+
+    def test_persistence(self):
+        """Записи переживают перезапуск; истекшие не загружаются"""
+        cache = self.make(ttl=60)
+        cache.set("a", {"command": "a"})
+        self.now[0] += 30
+        cache.set("b", {"command": "b"})
+
+        self.now[0] += 40
+        reloaded = self.make(ttl=60)
+        self.assertEqual(len(reloaded), 1)
+        self.assertEqual(reloaded.get("b"), {"command": "b"})
+
+    def test_corrupt_file(self):
+        """Поврежденный файл не мешает работе"""
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("not json")
+        cache = self.make()
+        self.assertEqual(len(cache), 0)
+        cache.set("a", {"command": "a"})
+        self.assertEqual(len(self.make()), 1)
+
+
+class TestParseCommandCache(unittest.TestCase):
+    """parse_command не обращается к сети для повторных запросов"""
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_repeated_phrase_skips_llm(self, mock_openai_class):
+        create = mock_openai_class.return_value.chat.completions.create
+        create.return_value = tool_response(("flash_lights", "{}"), ("honk", "{}"))
+        assistant = AIAssistant(api_key="test_key", parse_cache=ParseCache())
+        state = Mock(return_value={"charge_state": {}})
+
+        first = assistant.parse_commands("Подай знак", state)
+        second = assistant.parse_commands("ну подай знак, пожалуйста", state)
+
+        self.assertEqual([c["command"] for c in first], ["flash_lights", "honk"])
+        self.assertEqual(first, second)
+        create.assert_called_once()
+        # Состояние автомобиля нужно только для обращения к LLM
+        state.assert_called_once()
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_unknown_not_cached(self, mock_openai_class):
+        create = mock_openai_class.return_value.chat.completions.create
+        create.return_value = tool_response()
+        cache = ParseCache()
+        assistant = AIAssistant(api_key="test_key", parse_cache=cache)
+
+        assistant.parse_command("абракадабра", {})
+        assistant.parse_command("абракадабра", {})
+
+        self.assertEqual(create.call_count, 2)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,176 @@
+"""
+Тесты адаптивного планировщика опроса
+"""
+
+import time
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.cache import ResponseCache
+from tesla_app.polling import PollScheduler, classify
+from tesla_app.tesla_client import TeslaAPIClient, TeslaVehicle
+
+
+class FakeClock:
+    """Управляемый источник времени"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_vehicle(vehicle_id, state="online"):
+    return TeslaVehicle(
+        id=1, vin="VIN", display_name=vehicle_id, color=None, tokens=[],
+        state=state, in_service=False, id_s=vehicle_id, vehicle_id=1
+    )
+
+
+DRIVING = {"drive_state": {"shift_state": "D", "speed": 60}, "charge_state": {}}
+CHARGING = {"drive_state": {"shift_state": None}, "charge_state": {"charging_state": "Charging"}}
+PARKED = {"drive_state": {"shift_state": "P", "speed": None}, "charge_state": {"charging_state": "Disconnected"}}
+
+
+class TestClassify(unittest.TestCase):
+    """Тесты определения активности"""
+
+    def test_classify(self):
+        self.assertEqual(classify(DRIVING), "driving")
+        self.assertEqual(classify(CHARGING), "charging")
+        self.assertEqual(classify(PARKED), "parked")
+        self.assertEqual(classify({}), "parked")
+
+
+class TestPollScheduler(unittest.TestCase):
+    """Тесты PollScheduler"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.client = Mock()
+        self.client.wake_manager = None
+        self.client.cache = None
+        self.states = {}
+        self.client.get_vehicle_state.side_effect = lambda vid, endpoints: self.states[vid]
+
+    def make_scheduler(self, vehicles, **kwargs):
+        self.client.get_vehicles.return_value = vehicles
+        kwargs.setdefault("max_rps", 1000)
+        return PollScheduler(self.client, max_workers=0, clock=self.clock, **kwargs)
+
+    def polled(self):
+        ids = [c.args[0] for c in self.client.get_vehicle_state.call_args_list]
+        self.client.get_vehicle_state.reset_mock()
+        return ids
+
+    def test_interval_follows_activity(self):
+        """Едущий автомобиль опрашивается чаще стоящего"""
+        self.states = {"drive": DRIVING, "charge": CHARGING, "park": PARKED}
+        scheduler = self.make_scheduler([make_vehicle(v) for v in self.states])
+
+        scheduler.tick()
+        self.assertEqual(sorted(self.polled()), ["charge", "drive", "park"])
+        self.assertEqual(scheduler.activity("drive"), "driving")
+
+        self.clock.now += 5
+        scheduler.tick()
+        self.assertEqual(self.polled(), ["drive"])
+
+        self.clock.now += 10
+        scheduler.tick()
+        self.assertEqual(sorted(self.polled()), ["charge", "drive"])
+
+        self.clock.now += 105
+        scheduler.tick()
+        self.assertIn("park", self.polled())
+
+    def test_asleep_vehicles_never_polled(self):
+        """Спящий автомобиль проверяется только списком и опрашивается после пробуждения"""
+        self.states = {"a": PARKED}
+        scheduler = self.make_scheduler([make_vehicle("a", "asleep")], list_interval=60)
+
+        scheduler.tick()
+        self.clock.now += 30
+        scheduler.tick()
+        self.assertEqual(self.polled(), [])
+        self.assertEqual(scheduler.activity("a"), "asleep")
+
+        self.client.get_vehicles.return_value = [make_vehicle("a", "online")]
+        self.clock.now += 30
+        scheduler.tick()
+        self.assertEqual(self.polled(), ["a"])
+        self.client.wake_up.assert_not_called()
+
+    def test_vehicle_falls_asleep(self):
+        """408 при опросе переводит автомобиль в спящие без повторных опросов"""
+        response = Mock(status_code=408)
+        self.client.get_vehicle_state.side_effect = requests.HTTPError(response=response)
+        scheduler = self.make_scheduler([make_vehicle("a")], list_interval=1e9)
+
+        scheduler.tick()
+        self.clock.now += 200
+        scheduler.tick()
+
+        self.assertEqual(len(self.polled()), 1)
+        self.assertEqual(scheduler.stats.fell_asleep, 1)
+        self.assertEqual(scheduler.activity("a"), "asleep")
+
+    def test_long_parked_becomes_idle(self):
+        """После idle_after стоянки интервал увеличивается"""
+        self.states = {"a": PARKED}
+        scheduler = self.make_scheduler([make_vehicle("a")], idle_after=200, list_interval=1e9)
+
+        for _ in range(3):
+            scheduler.tick()
+            self.clock.now += 120
+        self.assertEqual(scheduler.activity("a"), "idle")
+
+    def test_rate_cap(self):
+        """Общий лимит запросов в секунду ограничивает число опросов"""
+        self.states = {f"v{i}": PARKED for i in range(100)}
+        scheduler = self.make_scheduler([make_vehicle(v) for v in self.states], max_rps=10)
+
+        wait = scheduler.tick()
+
+        # 10 токенов всплеска: один на список, 9 на опросы
+        self.assertEqual(len(self.polled()), 9)
+        self.assertGreater(wait, 0)
+        self.clock.now += 1.0
+        scheduler.tick()
+        self.assertEqual(len(self.polled()), 10)
+
+    def test_scales_to_large_fleet(self):
+        """10 000 автомобилей планируются без линейных проходов на каждый опрос"""
+        self.states = {f"v{i}": PARKED for i in range(10000)}
+        self.client.get_vehicle_state.side_effect = None
+        self.client.get_vehicle_state.return_value = PARKED
+        scheduler = self.make_scheduler([make_vehicle(v) for v in self.states], max_rps=1e6)
+
+        started = time.perf_counter()
+        scheduler.tick()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(scheduler.stats.polls, 10000)
+        self.assertEqual(scheduler.scheduled(), 10000)
+        self.assertLess(elapsed, 5.0)
+
+    def test_requires_client_without_auto_wake(self):
+        """Клиент с auto_wake разбудил бы спящие автомобили"""
+        with self.assertRaises(ValueError):
+            PollScheduler(TeslaAPIClient("token", auto_wake=True))
+
+    def test_requires_client_without_cache(self):
+        """Клиент с кешем отдавал бы список автомобилей до 300 с давности"""
+        with self.assertRaises(ValueError):
+            PollScheduler(TeslaAPIClient("token", cache=ResponseCache()))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+"""
+Тесты ограничителя частоты запросов
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.ratelimit import (
+    Priority,
+    RateLimiter,
+    current_priority,
+    parse_retry_after,
+    priority_scope,
+)
+from tesla_app.tesla_client import TeslaAPIClient
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Тесты RateLimiter"""
+
+    def test_burst_then_rate(self):
+        """Тест: всплеск проходит сразу, дальше - со скоростью бюджета"""
+        limiter = RateLimiter(read_rate=100.0, read_burst=5.0)
+
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire("read")
+        burst = time.monotonic() - started
+        for _ in range(5):
+            limiter.acquire("read")
+        total = time.monotonic() - started
+
+        self.assertLess(burst, 0.02)
+        self.assertGreaterEqual(total, 0.04)
+
+    def test_budgets_are_separate(self):
+        """Тест: исчерпанный бюджет чтений не задерживает команды"""
+        limiter = RateLimiter(read_rate=1.0, read_burst=1.0, command_burst=1.0)
+        limiter.acquire("read")
+
+        self.assertLess(limiter.acquire("command", timeout=0.01), 0.01)
+        with self.assertRaises(TimeoutError):
+            limiter.acquire("read", timeout=0.01)
+
+    def test_priority_lanes(self):
+        """Тест: команда безопасности обгоняет ожидающий массовый опрос"""
+        limiter = RateLimiter(command_rate=50.0, command_burst=1.0)
+        limiter.acquire("command")
+        order = []
+
+        def worker(name, priority):
+            limiter.acquire("command", priority)
+            order.append(name)
+
+        threads = [
+            threading.Thread(target=worker, args=(f"bulk{i}", Priority.BULK))
+            for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.005)
+        urgent = threading.Thread(target=worker, args=("lock", Priority.HIGH))
+        urgent.start()
+        for thread in threads + [urgent]:
+            thread.join(2)
+
+        self.assertLessEqual(order.index("lock"), 1)
+
+    def test_priority_scope(self):
+        """Тест: приоритет по умолчанию берется из контекста"""
+        self.assertEqual(current_priority(), Priority.NORMAL)
+        with priority_scope(Priority.BULK):
+            self.assertEqual(current_priority(), Priority.BULK)
+        self.assertEqual(current_priority(), Priority.NORMAL)
+
+    def test_throttle_adapts(self):
+        """Тест: 429 вдвое снижает скорость и блокирует бюджет на Retry-After"""
+        limiter = RateLimiter(read_rate=10.0, read_burst=1.0)
+
+        limiter.on_response("read", 429, retry_after=0.05)
+
+        self.assertEqual(limiter.current_rate("read"), 5.0)
+        self.assertGreaterEqual(limiter.acquire("read"), 0.04)
+        for _ in range(1000):
+            limiter.on_response("read", 200)
+        self.assertEqual(limiter.current_rate("read"), 10.0)
+
+    def test_parse_retry_after(self):
+        """Тест разбора Retry-After в секундах и в виде HTTP-даты"""
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(
+            parse_retry_after("Thu, 01 Jan 1970 00:00:30 GMT", now=10.0),
+            20.0
+        )
+
+
+class TestClientRateLimit(unittest.TestCase):
+    """Тесты ограничителя в TeslaAPIClient"""
+
+    def test_retry_after_429(self):
+        """Тест: после 429 клиент ждет Retry-After и повторяет запрос"""
+        limiter = RateLimiter()
+        client = TeslaAPIClient("test_token", rate_limiter=limiter)
+        client.session = Mock()
+        throttled = Mock(status_code=429, headers={"Retry-After": "0.02"})
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = {"response": {"battery_level": 80}}
+        client.session.get.side_effect = [throttled, ok]
+
+        self.assertEqual(client.get_charge_state("v1"), {"battery_level": 80})
+        self.assertEqual(client.session.get.call_count, 2)
+        self.assertEqual(limiter.throttled_count, 1)
+        self.assertLess(limiter.current_rate("read"), 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
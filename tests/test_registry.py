@@ -0,0 +1,149 @@
+"""
+Тесты реестра автомобилей и быстрого старта CLI
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.registry import VehicleRegistry, default_path
+from tesla_app.tesla_client import TeslaVehicle
+from tesla_app.cli.main import TeslaAICLI
+
+
+def make_vehicle(i, name=None, state="online"):
+    return TeslaVehicle(
+        id=100 + i, vin=f"5YJ3E1EA{i:09d}", display_name=name or f"Car {i}", color=None,
+        tokens=["secret"], state=state, in_service=False, id_s=f"{100 + i}", vehicle_id=i
+    )
+
+
+class TestVehicleRegistry(unittest.TestCase):
+    """Тесты VehicleRegistry"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "sub", "vehicles.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_indexes(self):
+        """Поиск по id, id_s, VIN и имени"""
+        registry = VehicleRegistry()
+        registry.update([make_vehicle(i) for i in range(1000)])
+
+        self.assertEqual(registry.by_id(105).display_name, "Car 5")
+        self.assertEqual(registry.by_id_s("105").id, 105)
+        self.assertEqual(registry.by_vin("5yj3e1ea000000007").id, 107)
+        self.assertEqual(registry.by_name("car 9").id, 109)
+        self.assertEqual(registry.find("Car 3").id, 103)
+        self.assertEqual(registry.find("5YJ3E1EA000000004").id, 104)
+        self.assertEqual(registry.find(106).id, 106)
+        self.assertIsNone(registry.find("nope"))
+
+    def test_persistence(self):
+        """Реестр переживает перезапуск; токены стриминга не сохраняются"""
+        registry = VehicleRegistry(self.path)
+        registry.update([make_vehicle(1), make_vehicle(2)])
+
+        loaded = VehicleRegistry(self.path)
+        self.assertTrue(loaded.load())
+
+        self.assertEqual([v.id_s for v in loaded], ["101", "102"])
+        self.assertEqual(loaded.by_vin(make_vehicle(2).vin).display_name, "Car 2")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertNotIn("secret", f.read())
+
+    def test_missing_or_corrupt_file(self):
+        """Отсутствующий или поврежденный файл не мешает старту"""
+        self.assertFalse(VehicleRegistry(self.path).load())
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{broken")
+        self.assertFalse(VehicleRegistry(self.path).load())
+
+    def test_staleness(self):
+        """Данные с диска устаревшие, пока не подтверждены API; затем - по max_age"""
+        now = [1000.0]
+        VehicleRegistry(self.path, clock=lambda: now[0]).update([make_vehicle(1)])
+
+        registry = VehicleRegistry(self.path, max_age=60, clock=lambda: now[0])
+        registry.load()
+        self.assertTrue(registry.is_stale)
+
+        registry.update([make_vehicle(1)])
+        self.assertFalse(registry.is_stale)
+        now[0] += 61
+        self.assertTrue(registry.is_stale)
+
+    def test_default_path_hides_token(self):
+        """Путь зависит от токена, но не содержит его"""
+        path = default_path("my-token")
+        self.assertNotIn("my-token", path)
+        self.assertNotEqual(path, default_path("other-token"))
+
+
+class TestCLIStartup(unittest.TestCase):
+    """Тесты старта CLI с сохраненным реестром"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "vehicles.json")
+        VehicleRegistry(self.path).update([make_vehicle(1, "Old name"), make_vehicle(2)])
+        self.release = threading.Event()
+        self.client = Mock()
+
+        def get_vehicles():
+            self.release.wait(5)
+            return [make_vehicle(1, "New name"), make_vehicle(2), make_vehicle(3)]
+
+        self.client.get_vehicles.side_effect = get_vehicles
+
+    def tearDown(self):
+        self.release.set()
+        shutil.rmtree(self.dir)
+
+    def test_starts_from_cache_and_refreshes(self):
+        """preloop не ждет API, приглашение отмечает устаревшие данные"""
+        cli = TeslaAICLI(self.client, registry=VehicleRegistry(self.path))
+
+        with patch("tesla_app.cli.main.console"):
+            started = time.perf_counter()
+            cli.preloop()
+            elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.1)
+        self.assertEqual(cli.current_vehicle.display_name, "Old name")
+        self.assertEqual(cli.prompt, cli.stale_prompt)
+
+        self.release.set()
+        cli._refresh_thread.join()
+        cli.postcmd(False, "")
+
+        self.assertEqual(len(cli.vehicles), 3)
+        self.assertEqual(cli.current_vehicle.display_name, "New name")
+        self.assertEqual(cli.prompt, TeslaAICLI.prompt)
+
+    def test_select_uses_registry(self):
+        """select находит автомобиль по индексу, VIN и имени"""
+        cli = TeslaAICLI(self.client, registry=VehicleRegistry(self.path))
+        with patch("tesla_app.cli.main.console"):
+            cli.preloop()
+            cli.do_select("2")
+            self.assertEqual(cli.current_vehicle.id_s, "102")
+            cli.do_select(make_vehicle(1).vin)
+            self.assertEqual(cli.current_vehicle.id_s, "101")
+            cli.do_select("car 2")
+            self.assertEqual(cli.current_vehicle.id_s, "102")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+"""
+Тесты объединения одинаковых одновременных запросов
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.singleflight import SingleFlight
+from tesla_app.tesla_client import TeslaAPIClient
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Тесты SingleFlight"""
+
+    def test_concurrent_calls_share_result(self):
+        """Тест: одновременные вызовы с одним ключом выполняются один раз"""
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(1)
+            return {"battery_level": 80}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(flight.do, "v1", fetch) for _ in range(8)]
+            while flight.shared < 7:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_error_is_shared(self):
+        """Тест: ошибка ведущего вызова получают все ожидающие"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fetch():
+            release.wait(1)
+            raise ConnectionError("timeout")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.do, "v1", fetch) for _ in range(4)]
+            while flight.shared < 3:
+                time.sleep(0.001)
+            release.set()
+            for future in futures:
+                with self.assertRaises(ConnectionError):
+                    future.result()
+
+    def test_sequential_calls_not_shared(self):
+        """Тест: завершенный вызов не переиспользуется"""
+        flight = SingleFlight()
+        fetch = Mock(side_effect=[1, 2])
+
+        self.assertEqual(flight.do("v1", fetch), 1)
+        self.assertEqual(flight.do("v1", fetch), 2)
+
+
+class TestClientSingleFlight(unittest.TestCase):
+    """Тесты объединения чтений в TeslaAPIClient"""
+
+    def test_identical_reads_send_one_request(self):
+        """Тест: одновременные чтения vehicle_data дают один HTTP-запрос"""
+        client = TeslaAPIClient("test_token")
+        client.session = Mock()
+
+        def get(url, **kwargs):
+            time.sleep(0.05)
+            response = Mock()
+            response.json.return_value = {"response": {"state": "online"}}
+            return response
+
+        client.session.get.side_effect = get
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: client.get_vehicle_state("v1"), range(5)))
+
+        self.assertEqual(client.session.get.call_count, 1)
+        self.assertEqual(results, [{"state": "online"}] * 5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,155 @@
+"""
+Тесты приема потоковой телеметрии
+"""
+
+import asyncio
+import json
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.delta import DeltaEngine, FieldChange
+from tesla_app.models import ChargeState
+from tesla_app.streaming import TelemetryReceiver, TelemetryRecord, TelemetrySender, make_record
+
+
+class TestTelemetryRecord(unittest.TestCase):
+    """Тесты разбора записей"""
+
+    def test_fleet_telemetry_format(self):
+        """Запись Fleet Telemetry раскладывается по разделам vehicle_data"""
+        record = TelemetryRecord.from_dict({
+            "vin": "VIN1",
+            "createdAt": "2024-01-01T00:00:00.000Z",
+            "data": [
+                {"key": "BatteryLevel", "value": {"doubleValue": 80.5}},
+                {"key": "Location", "value": {"locationValue": {"latitude": 55.7, "longitude": 37.6}}},
+                {"key": "Locked", "value": {"booleanValue": True}},
+                {"key": "Unknown", "value": {"stringValue": "x"}},
+            ],
+        })
+
+        sections = record.sections()
+        self.assertEqual(record.created_at, 1704067200.0)
+        self.assertEqual(sections["charge_state"], {"battery_level": 80.5, "timestamp": 1704067200000})
+        self.assertEqual(sections["drive_state"]["latitude"], 55.7)
+        self.assertTrue(sections["vehicle_state"]["locked"])
+        self.assertEqual(record.values["Unknown"], "x")
+        self.assertEqual(record.models()["charge_state"], ChargeState(battery_level=80.5, timestamp=1704067200000))
+
+    def test_plain_format(self):
+        """Упрощенная запись со словарем значений и временем в миллисекундах"""
+        record = TelemetryRecord.from_dict({"vin": "VIN1", "created_at": 1700000000000, "data": {"VehicleSpeed": 50}})
+
+        self.assertEqual(record.created_at, 1700000000.0)
+        self.assertEqual(record.sections()["drive_state"]["speed"], 50)
+
+
+class TestTelemetryReceiver(unittest.IsolatedAsyncioTestCase):
+    """Тесты приемника на локальном websocket"""
+
+    async def asyncSetUp(self):
+        self.receiver = TelemetryReceiver()
+        await self.receiver.start()
+
+    async def asyncTearDown(self):
+        await self.receiver.stop()
+
+    async def wait_records(self, count):
+        while self.receiver.stats.records < count:
+            await asyncio.sleep(0.005)
+
+    async def test_iterator_and_callbacks(self):
+        """Записи приходят в async for и в обратные вызовы в порядке отправки"""
+        received = []
+        self.receiver.on_record(received.append)
+
+        async with TelemetrySender(self.receiver.url) as sender:
+            await sender.send(make_record("VIN1", created_at=1, BatteryLevel=80))
+            await sender.send([make_record("VIN1", created_at=i, BatteryLevel=80 - i) for i in range(2, 5)])
+
+        iterated = []
+        async for record in self.receiver:
+            iterated.append(record)
+            if len(iterated) == 4:
+                break
+
+        self.assertEqual([r.values["BatteryLevel"] for r in received], [80, 78, 77, 76])
+        self.assertEqual([r.created_at for r in iterated], [1, 2, 3, 4])
+
+    async def test_batched_decoding(self):
+        """Пачка кадров декодируется одним вызовом, кадр может нести массив записей"""
+        frames = [json.dumps(make_record(f"VIN{i}", BatteryLevel=i)).encode() for i in range(10)]
+        frames.append(json.dumps([make_record("VIN10", BatteryLevel=10)] * 2))
+
+        records = self.receiver._decode(frames)
+
+        self.assertEqual(len(records), 12)
+        self.assertEqual(self.receiver.stats.batches, 1)
+        self.assertEqual(records[3].vin, "VIN3")
+
+    async def test_state_models(self):
+        """Поток собирает последнее состояние автомобиля в VehicleData"""
+        async with TelemetrySender(self.receiver.url) as sender:
+            await sender.send(make_record("VIN1", created_at=1, BatteryLevel=80, Location=(55.7, 37.6)))
+            await sender.send(make_record("VIN1", created_at=2, BatteryLevel=79, Locked=True))
+            await self.wait_records(2)
+
+        state = self.receiver.state("VIN1")
+        self.assertEqual(state.charge_state.battery_level, 79)
+        self.assertEqual(state.drive_state.longitude, 37.6)
+        self.assertTrue(state.vehicle_state.locked)
+        self.assertIsNone(self.receiver.state("VIN2"))
+
+    async def test_feeds_delta_engine(self):
+        """Записи можно передавать в DeltaEngine так же, как ответы REST"""
+        engine = DeltaEngine(ignore=["*.timestamp"])
+        changes = []
+        engine.subscribe(["charge_state.battery_level"], lambda vin, c: changes.extend(c))
+        self.receiver.on_record(lambda r: engine.update(r.vin, r.sections(), partial=True))
+
+        async with TelemetrySender(self.receiver.url) as sender:
+            for level in (80, 80, 79):
+                await sender.send(make_record("VIN1", BatteryLevel=level))
+            await self.wait_records(3)
+
+        self.assertEqual(changes, [
+            FieldChange("charge_state.battery_level", None, 80),
+            FieldChange("charge_state.battery_level", 80, 79),
+        ])
+
+    async def test_bad_frames_counted(self):
+        """Некорректные кадры не прерывают прием"""
+        async with TelemetrySender(self.receiver.url) as sender:
+            await sender._ws.send_bytes(b"{not json")
+            await sender.send({"data": {}})
+            await sender.send(make_record("VIN1", BatteryLevel=1))
+            await self.wait_records(1)
+
+        self.assertEqual(self.receiver.stats.errors, 2)
+
+    async def test_frame_queue_bounded(self):
+        """Без декодера очередь кадров не растет, а stop() не зависает"""
+        receiver = TelemetryReceiver(max_frames=2)
+        await receiver.start()
+        receiver._decode = lambda frames: 1 / 0
+
+        async with TelemetrySender(receiver.url) as sender:
+            await sender.send(make_record("VIN1", BatteryLevel=1))
+            while not receiver._decoder.done():
+                await asyncio.sleep(0.005)
+            for level in range(2, 5):
+                await sender.send(make_record("VIN1", BatteryLevel=level))
+            while receiver.stats.frames < 4:
+                await asyncio.sleep(0.005)
+
+        self.assertEqual(receiver._frames.qsize(), 2)
+        self.assertEqual(receiver.stats.dropped_frames, 1)
+        await asyncio.wait_for(receiver.stop(timeout=10), 1)
+        self.assertEqual(receiver.stats.errors, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,167 @@
+"""
+Тесты колоночного хранилища телеметрии
+"""
+
+import math
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.cache import ResponseCache
+from tesla_app.telemetry_store import TelemetryStore
+from tesla_app.tesla_client import TeslaAPIClient
+
+
+class TestTelemetryStore(unittest.TestCase):
+    """Тесты TelemetryStore"""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.store = TelemetryStore(self.path, segment_rows=4)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.path)
+
+    def fill(self, count=10):
+        for i in range(count):
+            self.store.append("v1", 100 + i * 10, battery_level=50 + i, speed=None if i % 2 else i)
+
+    def test_range_query_across_segments(self):
+        """Запрос по времени собирает строки из нескольких сегментов"""
+        self.fill()
+
+        result = self.store.query("v1", 115, 165, columns=["battery_level", "speed"])
+
+        self.assertEqual(list(result["timestamp"]), [120, 130, 140, 150, 160])
+        self.assertEqual(list(result["battery_level"]), [52, 53, 54, 55, 56])
+        self.assertTrue(math.isnan(result["speed"][1]))
+        self.assertEqual(len(os.listdir(os.path.join(self.path, "v1"))), 3)
+
+    def test_downsample(self):
+        """Агрегаты по интервалам без учета пропусков"""
+        self.fill()
+
+        buckets = self.store.downsample("v1", "speed", 30, start=120, end=180)
+
+        self.assertEqual([b.start for b in buckets], [120, 150])
+        self.assertEqual((buckets[0].count, buckets[0].min, buckets[0].max, buckets[0].mean), (2, 2, 4, 3))
+        self.assertEqual((buckets[1].count, buckets[1].mean), (1, 6))
+
+    def test_reopen_persists(self):
+        """Данные читаются после повторного открытия, запись продолжается"""
+        self.fill(6)
+        self.store.close()
+
+        self.store = TelemetryStore(self.path, segment_rows=4)
+        self.store.append("v1", 1000, battery_level=90)
+
+        result = self.store.query("v1")
+        self.assertEqual(len(result["timestamp"]), 7)
+        self.assertEqual(result["battery_level"][-1], 90)
+        self.assertEqual(self.store.vehicles(), ["v1"])
+
+    def test_rejects_out_of_order_and_unknown(self):
+        """Время не может убывать, колонки проверяются"""
+        self.store.append("v1", 100, battery_level=50)
+        with self.assertRaises(ValueError):
+            self.store.append("v1", 99, battery_level=50)
+        with self.assertRaises(ValueError):
+            self.store.append("v1", 101, tire_pressure=2.9)
+        with self.assertRaises(ValueError):
+            self.store.append("../x", 101, battery_level=50)
+
+    def test_prune(self):
+        """Удаляются только целиком устаревшие сегменты"""
+        self.fill()
+
+        self.assertEqual(self.store.prune(150), 1)
+
+        self.assertEqual(self.store.query("v1")["timestamp"][0], 140)
+
+    def test_record_vehicle_data(self):
+        """Ответ vehicle_data раскладывается по колонкам"""
+        recorded = self.store.record("v1", {
+            "charge_state": {"battery_level": 80, "charge_rate": 30, "timestamp": 1700000000000},
+            "drive_state": {"latitude": 55.7, "longitude": 37.6, "speed": None},
+            "vehicle_state": {"odometer": 12345.6},
+        })
+
+        self.assertTrue(recorded)
+        row = self.store.query("v1")
+        self.assertEqual(row["timestamp"][0], 1700000000)
+        self.assertEqual(row["latitude"][0], 55.7)
+        self.assertEqual(row["odometer"][0], 12345.6)
+        self.assertFalse(self.store.record("v1", {"charge_state": {"timestamp": 1}}))
+        self.assertFalse(self.store.record("v1", {"gui_settings": {}}))
+
+    def test_open_segments_bounded(self):
+        """Открытыми остаются не больше max_open_segments сегментов"""
+        store = TelemetryStore(self.path, segment_rows=4, max_open_segments=3)
+        self.addCleanup(store.close)
+        for vehicle in range(10):
+            store.append(f"car{vehicle}", 100, battery_level=vehicle)
+
+        self.assertLessEqual(sum(len(s) for s in store._segments.values()), 3)
+        # Закрытый автомобиль открывается снова при обращении
+        self.assertEqual(list(store.query("car0")["battery_level"]), [0])
+
+    def test_concurrent_record(self):
+        """Параллельные record не падают на проверке порядка времени"""
+        errors = []
+
+        def writer(offset):
+            try:
+                for i in range(200):
+                    self.store.record("v1", {"charge_state": {"battery_level": i}}, timestamp=1000 + i * 2 + offset)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        timestamps = list(self.store.query("v1")["timestamp"])
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_client_records_fresh_reads(self):
+        """Клиент пишет в хранилище ответы API, но не попадания в кеш"""
+        client = TeslaAPIClient("token", cache=ResponseCache(), telemetry=self.store)
+        client.session = Mock()
+        client.session.get.return_value.json.return_value = {"response": {
+            "battery_level": 70, "timestamp": 1700000000000
+        }}
+
+        client.get_charge_state("v1")
+        client.get_charge_state("v1")
+
+        self.assertEqual(list(self.store.query("v1")["battery_level"]), [70])
+
+    def test_observer_errors_do_not_break_reads(self):
+        """Сбой хранилища или подписчика не ломает успешное чтение"""
+        telemetry = Mock()
+        telemetry.record.side_effect = OSError(24, "Too many open files")
+        delta = Mock()
+        delta.update.side_effect = ValueError("subscriber failed")
+        client = TeslaAPIClient("token", telemetry=telemetry, delta=delta)
+        client.session = Mock()
+        client.session.get.return_value.json.return_value = {"response": {"battery_level": 70}}
+
+        with self.assertLogs("tesla_app.tesla_client", level="ERROR") as logs:
+            state = client.get_charge_state("v1")
+
+        self.assertEqual(state["battery_level"], 70)
+        self.assertEqual(len(logs.records), 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -2,15 +2,24 @@
 Тесты для Tesla AI Assistant
 """
 
+import asyncio
+import json
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch, MagicMock
 import sys
 import os
+import threading
+import time
 
 # Добавляем путь к модулям
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
 from tesla_app.tesla_client import TeslaAPIClient, TeslaVehicle
+from tesla_app.async_client import AsyncTeslaAPIClient
 from tesla_app.ai_assistant import AIAssistant, AIResponse
 
 
@@ -78,44 +87,71 @@ class TestTeslaAPIClient(unittest.TestCase):
         self.mock_session.get.assert_called_once()
     
     def test_get_vehicle_summary(self):
-        """Тест получения сводки об автомобиле"""
+        """Тест получения сводки об автомобиле одним запросом vehicle_data"""
         vehicle_data = {
             "display_name": "Model 3",
             "vin": "5YJ3E1EA1KF123456",
             "color": "White",
             "state": "online",
-            "battery_range": 400,
-            "odometer": 50000,
-            "software_update": {"version": "2024.1.1"},
-            "locked": True,
-            "sentry_mode": False,
-            "summon_standby": False
-        }
-        
-        charge_state = {
-            "battery_level": 85,
-            "charging_state": "complete",
-            "charge_rate": 0,
-            "time_to_full_charge": 0
+            "charge_state": {
+                "battery_level": 85,
+                "battery_range": 400,
+                "charging_state": "complete",
+                "charge_rate": 0,
+                "time_to_full_charge": 0
+            },
+            "drive_state": {
+                "latitude": 55.7558,
+                "longitude": 37.6173,
+                "speed": 0,
+                "power": 0
+            },
+            "vehicle_state": {
+                "odometer": 50000,
+                "software_update": {"version": "2024.1.1"},
+                "locked": True,
+                "sentry_mode": False,
+                "summon_standby": False
+            }
         }
         
-        drive_state = {
-            "latitude": 55.7558,
-            "longitude": 37.6173,
-            "speed": 0,
-            "power": 0
-        }
-        
-        # Мокаем методы
-        self.client.get_vehicle_data = Mock(return_value=vehicle_data)
-        self.client.get_charge_state = Mock(return_value=charge_state)
-        self.client.get_drive_state = Mock(return_value=drive_state)
+        self.mock_session.get.return_value.json.return_value = {"response": vehicle_data}
         
         summary = self.client.get_vehicle_summary("test_vehicle_id")
         
         self.assertIn("Model 3", summary)
         self.assertIn("85%", summary)
         self.assertIn("5YJ3E1EA1KF123456", summary)
+        self.assertIn("Range: 400 km", summary)
+        self.assertIn("Odometer: 50000 km", summary)
+        self.assertIn("2024.1.1", summary)
+        self.mock_session.get.assert_called_once()
+        url = self.mock_session.get.call_args.args[0]
+        params = self.mock_session.get.call_args.kwargs["params"]
+        self.assertTrue(url.endswith("/test_vehicle_id/vehicle_data"))
+        self.assertEqual(
+            params["endpoints"],
+            "charge_state;drive_state;location_data;vehicle_state"
+        )
+    
+    def test_get_vehicle_sections(self):
+        """Тест чтения нескольких разделов одним запросом"""
+        self.mock_session.get.return_value.json.return_value = {"response": {
+            "charge_state": {"battery_level": 70},
+            "drive_state": {"speed": 60, "latitude": 1.0}
+        }}
+        
+        sections = self.client.get_vehicle_sections(
+            "test_id", ["charge_state", "location_data", "climate_state"]
+        )
+        
+        self.mock_session.get.assert_called_once()
+        self.assertEqual(sections["charge_state"], {"battery_level": 70})
+        self.assertEqual(sections["location_data"]["latitude"], 1.0)
+        self.assertEqual(sections["climate_state"], {})
+        
+        with self.assertRaises(ValueError):
+            self.client.get_vehicle_sections("test_id", ["bogus_state"])
     
     def test_honk_horn(self):
         """Тест бибикания"""
@@ -142,6 +178,212 @@ class TestTeslaAPIClient(unittest.TestCase):
         result = self.client.start_climate("test_id", temperature=23.5)
         
         self.assertTrue(result)
+    
+    def test_get_fleet_data(self):
+        """Тест параллельного опроса парка: порядок и ошибки по автомобилям"""
+        lock = threading.Lock()
+        active = [0, 0]  # текущее и максимальное число одновременных запросов
+        
+        def get(url, **kwargs):
+            vehicle_id = url.split("/")[-2]
+            if vehicle_id == "bad":
+                raise ConnectionError("timeout")
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            response = Mock()
+            response.json.return_value = {"response": {
+                "charge_state": {"id_s": vehicle_id},
+                "drive_state": {"speed": 0}
+            }}
+            return response
+        
+        self.mock_session.get.side_effect = get
+        ids = [f"v{i}" for i in range(10)] + ["bad"]
+        
+        results = self.client.get_fleet_data(ids, endpoints=["charge_state", "drive_state"])
+        
+        self.assertEqual([r.vehicle_id for r in results], ids)
+        self.assertTrue(all(r.ok for r in results[:-1]))
+        self.assertEqual(results[3].data["charge_state"], {"id_s": "v3"})
+        self.assertEqual(set(results[3].data), {"charge_state", "drive_state"})
+        self.assertFalse(results[-1].ok)
+        self.assertIsInstance(results[-1].error, ConnectionError)
+        # Разделы vehicle_data читаются одним запросом на автомобиль
+        self.assertEqual(self.mock_session.get.call_count, len(ids))
+        # Запросы к разным автомобилям выполнялись параллельно, но в пределах пула
+        self.assertGreater(active[1], 1)
+        self.assertLessEqual(active[1], self.client.max_workers)
+    
+    def test_get_fleet_data_unknown_endpoint(self):
+        """Тест: неизвестный эндпоинт отклоняется до запросов"""
+        with self.assertRaises(ValueError):
+            self.client.get_fleet_data(["v1"], endpoints=["nope"])
+        self.mock_session.get.assert_not_called()
+    
+    def test_session_is_shareable(self):
+        """Тест: сессия не хранит cookie и пул рассчитан на все потоки"""
+        client = TeslaAPIClient("test_token", max_workers=16)
+        adapter = client.session.get_adapter("https://owner-api.teslamotors.com")
+        
+        self.assertEqual(adapter._pool_maxsize, 16)
+        self.assertEqual(len(client.session.cookies._policy.allowed_domains()), 0)
+
+
+class TestTransport(unittest.TestCase):
+    """Тесты пула соединений и статистики транспорта"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Локальный HTTP/1.1 сервер с keep-alive"""
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_GET(self):
+                body = json.dumps({"response": {"battery_level": 80}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def test_connections_reused(self):
+        """Тест: последовательные запросы идут по одному соединению"""
+        client = TeslaAPIClient("test_token", base_url=self.base_url)
+        
+        for i in range(5):
+            client.get_charge_state(f"v{i}")
+        stats = client.transport_stats()
+        
+        self.assertEqual(stats.transport, "http/1.1")
+        self.assertEqual(stats.requests, 5)
+        self.assertEqual(stats.opened, 1)
+        self.assertEqual(stats.reused, 4)
+        self.assertEqual(stats.idle, 1)
+    
+    def test_pool_size_bounds_connections(self):
+        """Тест: параллельный опрос не открывает больше pool_maxsize соединений"""
+        client = TeslaAPIClient("test_token", base_url=self.base_url, max_workers=8, pool_maxsize=2)
+        
+        results = client.get_fleet_data([f"v{i}" for i in range(20)], endpoints=["charge_state"])
+        stats = client.transport_stats()
+        
+        self.assertTrue(all(r.ok for r in results))
+        self.assertLessEqual(stats.opened, 2)
+        self.assertEqual(stats.requests, 20)
+    
+    def test_keep_alive_disabled(self):
+        """Тест: keep_alive=False закрывает соединение после каждого запроса"""
+        client = TeslaAPIClient("test_token", base_url=self.base_url, keep_alive=False)
+        
+        for i in range(3):
+            client.get_charge_state(f"v{i}")
+        
+        self.assertEqual(client.session.headers["Connection"], "close")
+        self.assertEqual(client.transport_stats().opened, 3)
+    
+    def test_http2_requires_httpx(self):
+        """Тест: HTTP/2 без httpx дает понятную ошибку"""
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            with self.assertRaises(ImportError):
+                TeslaAPIClient("test_token", http2=True)
+        else:
+            client = TeslaAPIClient("test_token", http2=True)
+            self.assertEqual(client.transport_stats().transport, "http/2")
+
+
+class TestAsyncTeslaAPIClient(unittest.IsolatedAsyncioTestCase):
+    """Тесты асинхронного Tesla API клиента на локальном сервере"""
+    
+    async def asyncSetUp(self):
+        """Поднимаем локальный сервер, имитирующий Tesla API"""
+        self.in_flight = 0
+        self.max_in_flight = 0
+        
+        async def vehicles(request):
+            return web.json_response({"response": [{
+                "id": 1, "vin": "5YJ3E1EA1KF123456", "display_name": "Model 3",
+                "color": "White", "tokens": [], "state": "online",
+                "in_service": False, "id_s": "vehicle1", "vehicle_id": 1
+            }]})
+        
+        async def charge_state(request):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return web.json_response({"response": {
+                "battery_level": 80, "vehicle": request.match_info["vid"]
+            }})
+        
+        async def command(request):
+            self.last_auth = request.headers.get("Authorization")
+            return web.json_response({"response": True})
+        
+        app = web.Application()
+        app.router.add_get("/api/1/vehicles", vehicles)
+        app.router.add_get("/api/1/vehicles/{vid}/charge_state", charge_state)
+        app.router.add_post("/api/1/vehicles/{vid}/command/{name}", command)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        
+        self.client = AsyncTeslaAPIClient(
+            "test_token",
+            base_url=str(self.server.make_url("")).rstrip("/"),
+            max_concurrency=4
+        )
+    
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+    
+    async def test_get_vehicles(self):
+        """Тест получения списка автомобилей"""
+        vehicles = await self.client.get_vehicles()
+        
+        self.assertEqual(len(vehicles), 1)
+        self.assertIsInstance(vehicles[0], TeslaVehicle)
+        self.assertEqual(vehicles[0].id_s, "vehicle1")
+    
+    async def test_concurrency_limit(self):
+        """Тест ограничения числа одновременных запросов"""
+        results = await asyncio.gather(*[
+            self.client.get_charge_state(f"v{i}") for i in range(20)
+        ])
+        
+        self.assertEqual([r["vehicle"] for r in results], [f"v{i}" for i in range(20)])
+        self.assertLessEqual(self.max_in_flight, 4)
+    
+    async def test_lock_doors(self):
+        """Тест команды блокировки с токеном авторизации"""
+        result = await self.client.lock_doors("vehicle1", lock=True)
+        
+        self.assertTrue(result)
+        self.assertEqual(self.last_auth, "Bearer test_token")
+    
+    async def test_command_error_returns_false(self):
+        """Тест: ошибка соединения в команде возвращает False"""
+        await self.server.close()
+        
+        self.assertFalse(await self.client.honk_horn("vehicle1"))
 
 
 class TestAIAssistant(unittest.TestCase):
@@ -178,19 +420,146 @@ class TestAIAssistant(unittest.TestCase):
         self.assertEqual(assistant.conversation_history[1]["role"], "assistant")
     
     def test_history_limit(self):
-        """Тест ограничения истории"""
-        assistant = AIAssistant(api_key="test_key")
+        """Тест ограничения истории бюджетом токенов"""
+        assistant = AIAssistant(api_key="test_key", history_budget=400)
         
-        # Добавляем 15 сообщений
+        # Добавляем 15 пар сообщений
         for i in range(15):
             assistant.add_to_history("user", f"Message {i}")
             assistant.add_to_history("assistant", f"Response {i}")
         
-        # История должна быть ограничена 10 последними сообщениями (5 пар)
-        self.assertEqual(len(assistant.conversation_history), 10)
+        # Короткие сообщения помещаются в бюджет и не сворачиваются
+        self.assertEqual(len(assistant.conversation_history), 30)
+        
+        # Длинный ответ вытесняет старые сообщения в сводку
+        assistant.add_to_history("user", "Расскажи подробно")
+        assistant.add_to_history("assistant", "Очень длинный ответ. " + "слово " * 60)
+        
+        self.assertLessEqual(assistant.history.tokens, 400)
+        self.assertIn("Message", assistant.history.summary)
+        self.assertNotEqual(assistant.conversation_history[0]["content"], "Message 0")
+        self.assertTrue(assistant.conversation_history[-1]["content"].startswith("Очень длинный ответ"))
+    
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_history_summary_in_prompt(self, mock_openai_class):
+        """Свернутая история уходит в запрос системным сообщением"""
+        assistant = AIAssistant(api_key="test_key", history_budget=300)
+        for i in range(50):
+            assistant.add_to_history("user", f"Message {i}")
+        
+        messages = assistant._build_messages("Привет", None, None)
+        
+        self.assertEqual(messages[1]["role"], "system")
+        self.assertIn("Краткое содержание", messages[1]["content"])
+        self.assertEqual(messages[2:-1], assistant.conversation_history)
+    
+    @staticmethod
+    def _chunks(*deltas, total_tokens=42):
+        """Фрагменты потока chat.completions с usage в последнем"""
+        chunks = [
+            Mock(choices=[Mock(delta=Mock(content=d))], usage=None) for d in deltas
+        ]
+        chunks.append(Mock(choices=[], usage=Mock(total_tokens=total_tokens)))
+        return chunks
+    
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_stream_response(self, mock_openai_class):
+        """Потоковый ответ выдает фрагменты и в конце пишет историю и токены"""
+        mock_client = mock_openai_class.return_value
+        mock_client.chat.completions.create.return_value = iter(
+            self._chunks("Заряд ", None, "80%", total_tokens=42)
+        )
+        
+        assistant = AIAssistant(api_key="test_key")
+        stream = assistant.stream_response("Какой заряд?")
+        mock_client.chat.completions.create.assert_not_called()
+        
+        deltas = []
+        for delta in stream:
+            deltas.append(delta)
+            if len(deltas) == 1:
+                # История пишется только после завершения потока
+                self.assertEqual(assistant.conversation_history, [])
+        
+        self.assertEqual(deltas, ["Заряд ", "80%"])
+        self.assertEqual(stream.response.content, "Заряд 80%")
+        self.assertEqual(stream.response.tokens_used, 42)
+        self.assertEqual(assistant.conversation_history[-1], {"role": "assistant", "content": "Заряд 80%"})
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        self.assertTrue(kwargs["stream"])
+        self.assertEqual(kwargs["messages"][-1], {"role": "user", "content": "Какой заряд?"})
+    
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_stream_response_error(self, mock_openai_class):
+        """Ошибка потока становится текстом ответа и не попадает в историю"""
+        def broken():
+            yield from self._chunks("Начало")[:1]
+            raise ConnectionError("reset")
+        
+        mock_openai_class.return_value.chat.completions.create.return_value = broken()
+        assistant = AIAssistant(api_key="test_key")
+        stream = assistant.stream_response("Привет")
+        
+        deltas = list(stream)
+        
+        self.assertEqual(deltas[0], "Начало")
+        self.assertIn("reset", deltas[-1])
+        self.assertEqual(stream.response.tokens_used, 0)
+        self.assertEqual(assistant.conversation_history, [])
+    
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_cli_chat_streams(self, mock_openai_class):
+        """CLI выводит ответ чата из потока"""
+        import io
+        from rich.console import Console
+        from tesla_app.cli.main import TeslaAICLI
+        
+        mock_openai_class.return_value.chat.completions.create.return_value = iter(
+            self._chunks("**Привет**", ", я ассистент")
+        )
+        cli = TeslaAICLI(Mock(), AIAssistant(api_key="test_key"))
+        output = io.StringIO()
+        
+        with patch('tesla_app.cli.main.console', Console(file=output, width=80)):
+            cli.do_chat("Привет")
+        
+        self.assertIn("Привет, я ассистент", output.getvalue())
+        self.assertEqual(len(cli.ai.conversation_history), 2)
+    
+    def test_cli_creates_assistant_lazily(self):
+        """CLI создает ассистента только при первой команде, которой он нужен"""
+        from tesla_app.cli.main import TeslaAICLI
+        
+        assistant = Mock()
+        assistant.stream_response.return_value = iter(())
+        factory = Mock(return_value=assistant)
+        cli = TeslaAICLI(Mock(), ai_factory=factory)
+        cli.current_vehicle = Mock(id_s="1")
+        
+        with patch('tesla_app.cli.main.console'), patch('tesla_app.cli.main._stream_markdown'):
+            cli.default("посигналь")
+            factory.assert_not_called()
+            cli.do_chat("Привет")
+            cli.do_chat("Еще раз")
+        
+        factory.assert_called_once()
+        self.assertEqual(assistant.stream_response.call_count, 2)
+    
+    def test_cli_uses_assistant_threshold(self):
+        """Порог локального распознавания в CLI - как у ассистента"""
+        from tesla_app.cli.main import TeslaAICLI
+        
+        tesla = Mock()
+        assistant = Mock(intent_threshold=0.99)
+        assistant.parse_commands.return_value = []
+        cli = TeslaAICLI(tesla, assistant)
+        cli.current_vehicle = Mock(id_s="1")
+        
+        with patch('tesla_app.cli.main.console'):
+            cli.default("посигналь")
         
-        # Проверяем, что остались последние сообщения
-        self.assertEqual(assistant.conversation_history[0]["content"], "Message 5")
+        assistant.parse_commands.assert_called_once()
+        tesla.honk_horn.assert_not_called()
 
 
 class TestIntegration(unittest.TestCase):
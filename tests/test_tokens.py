@@ -0,0 +1,52 @@
+"""
+Тесты оценки числа токенов
+"""
+
+import os
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app import tokens
+from tesla_app.tokens import count_message_tokens, count_tokens
+
+
+class TestCountTokens(unittest.TestCase):
+    """Тесты count_tokens"""
+
+    def test_heuristic(self):
+        """Без tiktoken: ~4 символа на токен латиницы, ~2 - кириллицы"""
+        with patch.object(tokens, "_encoder", return_value=None):
+            self.assertEqual(count_tokens(""), 0)
+            self.assertEqual(count_tokens("a" * 40), 10)
+            self.assertEqual(count_tokens("я" * 40), 20)
+            self.assertEqual(count_tokens("ab"), 1)
+
+    def test_encoder(self):
+        """С кодировщиком модели считаются его токены"""
+        with patch.object(tokens, "_encoder", return_value=lambda text: text.split()):
+            self.assertEqual(count_tokens("one two three", model="gpt-4"), 3)
+
+    def test_encoding_unavailable(self):
+        """Кодировка не загрузилась (нет сети) - оценка по символам"""
+        tiktoken = type(sys)("tiktoken")
+        tiktoken.get_encoding = tiktoken.encoding_for_model = Mock(side_effect=ConnectionError("offline"))
+        tokens._encoder.cache_clear()
+        try:
+            with patch.dict(sys.modules, {"tiktoken": tiktoken}):
+                self.assertIsNone(tokens._encoder("gpt-4"))
+                self.assertEqual(count_tokens("a" * 40, model="gpt-4"), 10)
+        finally:
+            tokens._encoder.cache_clear()
+
+    def test_message_overhead(self):
+        """Сообщение дороже своего текста на служебные токены"""
+        message = {"role": "user", "content": "hello world"}
+        self.assertEqual(count_message_tokens(message), count_tokens("hello world") + 4)
+        self.assertEqual(count_message_tokens({"role": "assistant", "content": None}), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,143 @@
+"""
+Тесты схем инструментов и выполнения нескольких команд
+"""
+
+import os
+import threading
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.tools import TOOLS, TOOL_NAMES, execution_plan, validate_call
+from tesla_app.ai_assistant import AIAssistant
+
+
+def tool_response(*calls):
+    """Ответ chat.completions с вызовами инструментов (имя, JSON аргументов)"""
+    tool_calls = []
+    for name, arguments in calls:
+        function = Mock(arguments=arguments)
+        function.name = name
+        tool_calls.append(Mock(function=function))
+    return Mock(choices=[Mock(message=Mock(content=None, tool_calls=tool_calls))], usage=None)
+
+
+def commands(stages):
+    return [[call["command"] for call in stage] for stage in stages]
+
+
+class TestValidateCall(unittest.TestCase):
+    """Тесты validate_call"""
+
+    def test_schemas(self):
+        """Каждая схема - функция с объектом параметров"""
+        for tool in TOOLS:
+            self.assertEqual(tool["type"], "function")
+            self.assertEqual(tool["function"]["parameters"]["type"], "object")
+        self.assertIn("start_climate", TOOL_NAMES)
+
+    def test_valid(self):
+        call = validate_call("start_climate", '{"temperature": "21.5"}')
+        self.assertEqual(call.to_dict(), {"command": "start_climate", "parameters": {"temperature": 21.5},
+                                          "confidence": 1.0})
+        self.assertEqual(validate_call("lock", "").parameters, {})
+        self.assertEqual(validate_call("get_status", {}).parameters, {"what": "all"})
+
+    def test_invalid(self):
+        for name, arguments in (
+            ("open_trunk", "{}"),
+            ("lock", "{not json"),
+            ("lock", "[1]"),
+            ("start_climate", '{"temperature": 40}'),
+            ("start_climate", '{"temperature": true}'),
+            ("get_status", '{"what": "tires"}'),
+        ):
+            with self.subTest(name=name, arguments=arguments):
+                with self.assertRaises(ValueError):
+                    validate_call(name, arguments)
+
+
+class TestExecutionPlan(unittest.TestCase):
+    """Тесты execution_plan"""
+
+    def plan(self, *names):
+        return commands(execution_plan([{"command": name} for name in names]))
+
+    def test_independent_commands_share_stage(self):
+        self.assertEqual(self.plan("lock", "start_climate", "honk"), [["lock", "start_climate", "honk"]])
+
+    def test_conflicts_keep_order(self):
+        self.assertEqual(self.plan("unlock", "honk", "lock"), [["unlock", "honk"], ["lock"]])
+        self.assertEqual(self.plan("honk", "honk"), [["honk"], ["honk"]])
+
+    def test_status_is_barrier(self):
+        self.assertEqual(self.plan("lock", "get_status", "honk"), [["lock"], ["get_status"], ["honk"]])
+
+
+class TestParseCommands(unittest.TestCase):
+    """parse_commands получает все команды за один запрос к модели"""
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_tool_calls(self, mock_openai_class):
+        create = mock_openai_class.return_value.chat.completions.create
+        create.return_value = tool_response(
+            ("lock", "{}"),
+            ("open_trunk", "{}"),
+            ("start_climate", '{"temperature": 21}'),
+        )
+        assistant = AIAssistant(api_key="test_key", intent_threshold=None)
+
+        calls = assistant.parse_commands("запри и прогрей до 21", {})
+
+        create.assert_called_once()
+        self.assertIs(create.call_args.kwargs["tools"], TOOLS)
+        # Неизвестный инструмент отброшен, порядок сохранен
+        self.assertEqual([(c["command"], c["parameters"]) for c in calls],
+                         [("lock", {}), ("start_climate", {"temperature": 21.0})])
+        # Разбор команд не попадает в историю разговора
+        self.assertEqual(assistant.conversation_history, [])
+
+    @patch('tesla_app.ai_assistant.OpenAI')
+    def test_api_error(self, mock_openai_class):
+        mock_openai_class.return_value.chat.completions.create.side_effect = ConnectionError("reset")
+        assistant = AIAssistant(api_key="test_key", intent_threshold=None)
+
+        self.assertEqual(assistant.parse_commands("запри", {}), [])
+        self.assertEqual(assistant.parse_command("запри", {})["command"], "unknown")
+
+
+class TestCLIExecution(unittest.TestCase):
+    """CLI выполняет независимые команды параллельно"""
+
+    def test_parallel_stage(self):
+        from tesla_app.cli.main import TeslaAICLI
+
+        barrier = threading.Barrier(2, timeout=5)
+        tesla = Mock()
+        # Обе команды должны выполняться одновременно, иначе барьер не пройти
+        tesla.lock_doors.side_effect = lambda *args, **kwargs: barrier.wait() is not None
+        tesla.start_climate.side_effect = lambda *args, **kwargs: barrier.wait() is not None
+        tesla.get_vehicle_summary.return_value = "summary"
+        cli = TeslaAICLI(tesla)
+        cli.current_vehicle = Mock(id_s="1")
+
+        with patch('tesla_app.cli.main.console') as console:
+            cli._execute_parsed_commands([
+                {"command": "lock", "parameters": {}},
+                {"command": "start_climate", "parameters": {"temperature": 21.0}},
+                {"command": "get_status", "parameters": {"what": "all"}},
+                {"command": "open_trunk", "parameters": {}},
+            ])
+
+        printed = [call.args[0] for call in console.print.call_args_list]
+        self.assertEqual(len(printed), 4)
+        self.assertIn("lock", printed[0])
+        self.assertIn("start_climate", printed[1])
+        self.assertEqual(printed[2], "summary")
+        self.assertIn("Неизвестная команда", printed[3])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
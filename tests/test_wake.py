@@ -0,0 +1,182 @@
+"""
+Тесты пробуждения автомобилей
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tesla_app.cache import ResponseCache
+from tesla_app.tesla_client import TeslaAPIClient, TeslaVehicle
+from tesla_app.wake import VehicleAsleepError, WakeManager
+
+
+def make_vehicle(state):
+    return TeslaVehicle(
+        id=1, vin="VIN", display_name="Model 3", color=None, tokens=[],
+        state=state, in_service=False, id_s="v1", vehicle_id=1
+    )
+
+
+class FakeClock:
+    """Время, которое двигается только через sleep"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestWakeManager(unittest.TestCase):
+    """Тесты WakeManager"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.client = Mock()
+        self.manager = WakeManager(
+            self.client, timeout=20.0, initial_delay=1.0, max_delay=4.0,
+            clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def test_online_vehicle_not_woken(self):
+        """Тест: online автомобиль не будится"""
+        self.client.get_vehicle.return_value = make_vehicle("online")
+
+        result = self.manager.ensure_awake("v1")
+
+        self.assertTrue(result.online)
+        self.assertFalse(result.woke)
+        self.client.wake_up.assert_not_called()
+
+    def test_wake_with_backoff(self):
+        """Тест: пробуждение с экспоненциальной задержкой и измерением латентности"""
+        self.client.get_vehicle.side_effect = [
+            make_vehicle("asleep"),
+            make_vehicle("waking"),
+            make_vehicle("waking"),
+            make_vehicle("online"),
+        ]
+        self.client.wake_up.return_value = {"state": "asleep"}
+
+        result = self.manager.ensure_awake("v1")
+
+        self.assertTrue(result.online)
+        self.assertTrue(result.woke)
+        self.assertEqual(self.clock.sleeps, [1.0, 2.0, 4.0])
+        self.assertEqual(result.latency, 7.0)
+        # Повторно сразу после пробуждения ничего не проверяется
+        self.assertEqual(self.manager.ensure_awake("v1").latency, 0.0)
+        self.assertEqual(self.client.get_vehicle.call_count, 4)
+
+    def test_deadline(self):
+        """Тест: по истечении таймаута автомобиль считается недоступным"""
+        self.client.get_vehicle.return_value = make_vehicle("waking")
+        self.client.wake_up.return_value = {"state": "asleep"}
+
+        result = self.manager.ensure_awake("v1")
+
+        self.assertFalse(result.online)
+        self.assertEqual(result.latency, 20.0)
+        self.assertEqual(self.manager.known_state("v1"), "asleep")
+
+    def test_concurrent_callers_share_wake(self):
+        """Тест: одновременные операции разделяют одну попытку пробуждения"""
+        release = threading.Event()
+        self.client.get_vehicle.return_value = make_vehicle("asleep")
+
+        def wake_up(vehicle_id):
+            release.wait(1)
+            return {"state": "online"}
+
+        self.client.wake_up.side_effect = wake_up
+        manager = WakeManager(self.client)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(manager.ensure_awake, "v1") for _ in range(4)]
+            while manager._flight.shared < 3:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result() for f in futures]
+
+        self.assertTrue(all(r.online for r in results))
+        self.client.wake_up.assert_called_once()
+
+
+class TestClientAutoWake(unittest.TestCase):
+    """Тесты auto_wake в TeslaAPIClient"""
+
+    def setUp(self):
+        self.client = TeslaAPIClient("test_token", auto_wake=True)
+        self.client.session = Mock()
+
+    def test_command_wakes_asleep_vehicle(self):
+        """Тест: команда спящему автомобилю сначала будит его"""
+        self.client.wake_manager.mark_asleep("v1")
+        self.client.session.post.return_value.json.return_value = {"response": {"state": "online"}}
+        self.client.session.post.return_value.status_code = 200
+
+        self.assertTrue(self.client.honk_horn("v1"))
+
+        urls = [c.args[0] for c in self.client.session.post.call_args_list]
+        self.assertTrue(urls[0].endswith("/v1/wake_up"))
+        self.assertTrue(urls[1].endswith("/v1/command/honk_horn"))
+
+    def test_vehicle_list_feeds_known_state(self):
+        """Тест: состояние из списка автомобилей избавляет от лишней проверки"""
+        self.client.session.get.return_value.json.return_value = {"response": [
+            {"id_s": "v1", "state": "online"}
+        ]}
+        self.client.get_vehicles()
+        self.client.session.post.return_value.status_code = 200
+
+        self.assertTrue(self.client.honk_horn("v1"))
+        self.client.session.get.assert_called_once()
+        self.client.session.post.assert_called_once()
+
+    def test_cached_vehicle_list_keeps_known_state(self):
+        """Тест: список автомобилей из кеша не продлевает отметку online"""
+        now = [0.0]
+        client = TeslaAPIClient("test_token", auto_wake=True, cache=ResponseCache(clock=lambda: now[0]))
+        client.session = Mock()
+        client.wake_manager = WakeManager(client, clock=lambda: now[0])
+        client.session.get.return_value.json.return_value = {"response": [
+            {"id_s": "v1", "state": "online"}
+        ]}
+        client.session.get.return_value.content = None
+        client.get_vehicles()
+
+        now[0] = 200.0
+        client.get_vehicles()
+
+        client.session.get.assert_called_once()
+        # Отметка online с t=0 истекла: перед командой состояние проверяется заново
+        client.session.get.return_value.json.return_value = {"response": {"id_s": "v1", "state": "online"}}
+        client.session.post.return_value.status_code = 200
+        self.assertTrue(client.honk_horn("v1"))
+        self.assertTrue(client.session.get.call_args.args[0].endswith("/api/1/vehicles/v1"))
+
+    def test_fleet_read_without_wake(self):
+        """Тест: опрос парка с wake=False не будит спящий автомобиль"""
+        self.client.wake_manager.mark_asleep("v1")
+
+        results = self.client.get_fleet_data(["v1"], endpoints=["charge_state"], wake=False)
+
+        self.assertIsInstance(results[0].error, VehicleAsleepError)
+        self.client.session.post.assert_not_called()
+        self.client.session.get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)